@@ -2,10 +2,15 @@
 import csv
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import List, Dict, Tuple, Optional, Set
+from typing import List, Dict, Tuple, Optional, Set, Callable, Iterable
 import os
 import sys
+import math
+import random
+import time
 from collections import deque
+from bisect import bisect_left, bisect_right
+from timeline import HOURS_PER_DAY, TimeAxis, OccupancyIndex
 
 # Thiết lập mã hóa UTF-8 cho đầu ra (tránh lỗi font trên Windows)
 if sys.platform == "win32":
@@ -33,54 +38,406 @@ class NhanSu:
         self.work_schedule = []  # danh sách (thời gian bắt đầu, kết thúc) cho các tác vụ được gán
 
 class CSPAssignment:
-    def __init__(self, nhansu: NhanSu, start_time: datetime):
+    def __init__(self, nhansu: NhanSu, start: int, end: int, time_axis: TimeAxis):
         self.nhansu = nhansu
-        self.start_time = start_time
-        self.end_time = None  # sẽ được tính khi biết thời lượng tác vụ
+        self.start = start  # mốc bắt đầu trên trục giờ làm việc
+        self.end = end      # mốc kết thúc = start + thời lượng
+        self.time_axis = time_axis
+    
+    @property
+    def start_time(self) -> datetime:
+        """Thời điểm bắt đầu (chỉ dùng khi hiển thị/xuất kết quả)"""
+        return self.time_axis.to_datetime(self.start)
+    
+    @property
+    def end_time(self) -> datetime:
+        """Thời điểm kết thúc (chỉ dùng khi hiển thị/xuất kết quả)"""
+        return self.time_axis.to_datetime(self.end, is_end=True)
+
+class DomainStore:
+    """
+    Kho miền giá trị dạng bitset, hoàn tác bằng trail (undo-log)
+    thay vì sao chép toàn bộ miền ở mỗi nút.
+    
+    - values[task_id]: bảng giá trị cố định, sắp theo mốc bắt đầu (thứ tự sinh của get_domain_values)
+    - bits[task_id]: bitset miền hiện tại, bit k = 1 nếu values[task_id][k] còn trong miền
+    - starts[task_id]: mốc bắt đầu của từng giá trị (không giảm) để tra cửa sổ thời gian
+    - emp_masks[task_id][emp_id]: mặt nạ các giá trị giao cho nhân sự emp_id
+    - trail: nhật ký (task_id, mặt nạ đã cắt) theo thứ tự thời gian; giá trị được bổ sung lại
+      (miền dồn trái) ghi (task_id, ~mặt nạ đã thêm), số âm nên undo() phân biệt được
+    - global_entries: vị trí (tăng dần) các mục trail do bộ lan truyền toàn cục cắt (edge-finding),
+      lý do của chúng là toàn bộ phép gán hiện tại chứ không riêng tác vụ vừa gán
+    """
+    def __init__(self, domains: Dict[str, List[CSPAssignment]]):
+        self.values = domains
+        self.bits: Dict[str, int] = {task_id: (1 << len(vals)) - 1 for task_id, vals in domains.items()}
+        self.starts: Dict[str, List[int]] = {task_id: [v.start for v in vals] for task_id, vals in domains.items()}
+        self.emp_masks: Dict[str, Dict[str, int]] = {}
+        for task_id, vals in domains.items():
+            masks: Dict[str, int] = {}
+            for k, value in enumerate(vals):
+                emp_id = value.nhansu.id
+                masks[emp_id] = masks.get(emp_id, 0) | (1 << k)
+            self.emp_masks[task_id] = masks
+        self.trail: List[Tuple[str, int]] = []
+        self.global_entries: List[int] = []
+    
+    def size(self, task_id: str) -> int:
+        """Số giá trị còn lại trong miền (popcount)"""
+        return self.bits.get(task_id, 0).bit_count()
+    
+    def total_size(self) -> int:
+        """Tổng số giá trị còn lại trong mọi miền"""
+        return sum(bits.bit_count() for bits in self.bits.values())
+    
+    def live_items(self, task_id: str) -> List[Tuple[int, CSPAssignment]]:
+        """Các cặp (chỉ số, giá trị) còn lại trong miền, theo thứ tự ban đầu"""
+        values = self.values.get(task_id, [])
+        bits = self.bits.get(task_id, 0)
+        items = []
+        while bits:
+            low = bits & -bits
+            k = low.bit_length() - 1
+            items.append((k, values[k]))
+            bits ^= low
+        return items
+    
+    def live_values(self, task_id: str) -> List[CSPAssignment]:
+        """Các giá trị còn lại trong miền, theo thứ tự ban đầu"""
+        return [value for _, value in self.live_items(task_id)]
+    
+    def window_mask(self, task_id: str, lo: float, hi: float) -> int:
+        """Mặt nạ các giá trị có mốc bắt đầu nằm trong [lo, hi)"""
+        starts = self.starts.get(task_id, [])
+        first = bisect_left(starts, lo)
+        last = bisect_left(starts, hi)
+        if first >= last:
+            return 0
+        return ((1 << last) - 1) ^ ((1 << first) - 1)
+    
+    def busy_mask(self, task_id: str, emp_id: str, start: int, end: int, duration: int) -> int:
+        """Mặt nạ các giá trị giao cho emp_id mà trùng với khoảng bận [start, end) của nhân sự đó"""
+        emp_mask = self.emp_masks.get(task_id, {}).get(emp_id, 0)
+        if not emp_mask:
+            return 0
+        # Giá trị bắt đầu tại x trùng [start, end) khi x < end và x + duration > start
+        return emp_mask & self.window_mask(task_id, start - duration + 1, end)
+    
+    def remove_mask(self, task_id: str, mask: int, global_reason: bool = False) -> int:
+        """Cắt mọi giá trị thuộc mask khỏi miền (một phép AND), ghi vào trail; trả về số giá trị bị cắt"""
+        removed = self.bits.get(task_id, 0) & mask
+        if not removed:
+            return 0
+        self.bits[task_id] ^= removed
+        if global_reason:
+            self.global_entries.append(len(self.trail))
+        self.trail.append((task_id, removed))
+        return removed.bit_count()
+    
+    def remove(self, task_id: str, k: int) -> int:
+        """Cắt giá trị thứ k khỏi miền và ghi vào trail"""
+        return self.remove_mask(task_id, 1 << k)
+    
+    def add_mask(self, task_id: str, mask: int) -> int:
+        """Bổ sung các giá trị thuộc mask vào miền (một phép OR), ghi vào trail; trả về số giá trị được thêm"""
+        added = mask & ~self.bits.get(task_id, 0)
+        if not added:
+            return 0
+        self.bits[task_id] |= added
+        self.trail.append((task_id, ~added))
+        return added.bit_count()
+    
+    def clear_trail(self):
+        """Bỏ nhật ký hiện tại (miền giữ nguyên, không thể undo về trước thời điểm này)"""
+        self.trail.clear()
+        self.global_entries.clear()
+    
+    def mark(self) -> int:
+        """Mốc trail hiện tại, dùng cho undo()"""
+        return len(self.trail)
+    
+    def undo(self, mark: int):
+        """Khôi phục đúng những giá trị đã bị cắt (và gỡ những giá trị đã được thêm) kể từ mốc mark"""
+        trail = self.trail
+        bits = self.bits
+        global_entries = self.global_entries
+        while global_entries and global_entries[-1] >= mark:
+            global_entries.pop()
+        while len(trail) > mark:
+            task_id, changed = trail.pop()
+            if changed >= 0:
+                bits[task_id] |= changed
+            else:
+                bits[task_id] &= changed
+
+class SolverConfig:
+    """
+    Cấu hình heuristic của mô hình Advanced (giá trị mặc định = hành vi gốc)
+    
+    - variable_order: cách phá hòa khi MRV có nhiều ứng viên
+        "priority": priority cao trước | "slack": ít độ trễ cho phép (CPM) trước | "random": ngẫu nhiên
+    - lcv_weight, soft_weight: trọng số kết hợp điểm LCV và điểm ràng buộc mềm
+    - seed: hạt giống ngẫu nhiên; khác None thì các giá trị/tác vụ hòa điểm được xáo trộn
+    - restart_schedule: None = không khởi động lại | "luby" | "geometric"
+        lần chạy thứ i được phép restart_base × luby(i) (hoặc restart_base × restart_factor^(i-1))
+        lần backtrack; hết ngân sách thì tìm kiếm bắt đầu lại với phá hòa ngẫu nhiên
+        (theo seed, mặc định 0 nên kết quả luôn tái lập được), giữ nguyên các nogood đã học
+    - symmetry_breaking: bỏ qua giá trị giao cho nhân sự tương đương (cùng kỹ năng, sức chứa và lịch bận)
+        với một nhân sự đã thử tại cùng mốc của cùng điểm lựa chọn
+    - domain_mode: "full" = mọi mốc bắt đầu theo giờ | "left_justified" = chỉ mốc sớm nhất của mỗi
+        khoảng trống trên lịch từng nhân sự cùng vài mốc neo đầu ngày; Forward Checking bổ sung mốc
+        dồn trái mới sau mỗi phép gán. Miền nhỏ hơn nhiều nhưng là heuristic: không tìm thấy lời giải
+        không chứng minh bài toán vô nghiệm
+    - disjunctive: lan truyền tài nguyên rời rạc (edge-finding, not-first/not-last) trên các tác vụ
+        chỉ một nhân sự làm được, trước tìm kiếm và trong Forward Checking
+    - energy_reasoning: so tổng giờ còn lại của từng kỹ năng với giờ trống của các nhân sự phù hợp
+        trước mỗi hạn chót, trước tìm kiếm và trong Forward Checking
+    """
+    VARIABLE_ORDERS = ("priority", "slack", "random")
+    RESTART_SCHEDULES = ("luby", "geometric")
+    DOMAIN_MODES = ("full", "left_justified")
+    
+    def __init__(self, name: str = "default", variable_order: str = "priority",
+                 lcv_weight: float = 0.7, soft_weight: float = 0.3, seed: Optional[int] = None,
+                 restart_schedule: Optional[str] = None, restart_base: int = 100, restart_factor: float = 1.5,
+                 symmetry_breaking: bool = True, domain_mode: str = "full", disjunctive: bool = True,
+                 energy_reasoning: bool = True):
+        if variable_order not in SolverConfig.VARIABLE_ORDERS:
+            raise ValueError(f"variable_order không hợp lệ: {variable_order}")
+        if restart_schedule is not None and restart_schedule not in SolverConfig.RESTART_SCHEDULES:
+            raise ValueError(f"restart_schedule không hợp lệ: {restart_schedule}")
+        if domain_mode not in SolverConfig.DOMAIN_MODES:
+            raise ValueError(f"domain_mode không hợp lệ: {domain_mode}")
+        self.name = name
+        self.variable_order = variable_order
+        self.lcv_weight = lcv_weight
+        self.soft_weight = soft_weight
+        self.seed = seed
+        self.restart_schedule = restart_schedule
+        self.restart_base = restart_base
+        self.restart_factor = restart_factor
+        self.symmetry_breaking = symmetry_breaking
+        self.domain_mode = domain_mode
+        self.disjunctive = disjunctive
+        self.energy_reasoning = energy_reasoning
 
 class CSP:
     def __init__(self, cac_tacvu: List[TacVu], cac_nhansu: List[NhanSu], 
-                 project_start_date: datetime, project_end_date: datetime):
+                 project_start_date: datetime, project_end_date: datetime,
+                 config: Optional[SolverConfig] = None):
         self.cac_tacvu = cac_tacvu
         self.cac_nhansu = cac_nhansu
+        # Cấu hình heuristic và bộ sinh ngẫu nhiên (None = tất định như bản gốc)
+        self.config = config if config is not None else SolverConfig()
+        self.rng: Optional[random.Random] = (
+            random.Random(self.config.seed)
+            if self.config.seed is not None or self.config.variable_order == "random" else None
+        )
         self.project_start_date = project_start_date
         self.project_end_date = project_end_date
+        # Biểu diễn đã biên dịch: mọi mốc thời gian là số nguyên trên trục giờ làm việc
+        self.time_axis = TimeAxis(project_start_date)
+        self.project_start = self.time_axis.to_slot(project_start_date, round_up=True)
+        self.project_end = self.time_axis.to_slot(project_end_date)
+        self.project_duration_hours = (project_end_date - project_start_date).total_seconds() / 3600
+        # Bảng tra cứu id -> chỉ số (thay cho next(...) quét tuyến tính)
+        self.task_index: Dict[str, int] = {t.id: i for i, t in enumerate(cac_tacvu)}
+        self.emp_index: Dict[str, int] = {e.id: i for i, e in enumerate(cac_nhansu)}
+        # Lớp tương đương tĩnh của nhân sự (cùng tập kỹ năng và sức chứa): chỉ số nhân sự đầu tiên
+        # của lớp, None nếu nhân sự không có ai tương đương (dùng cho phá đối xứng khi tìm kiếm)
+        self.emp_class: List[Optional[int]] = self._build_employee_classes()
+        # Mảng đặc theo chỉ số tác vụ
+        self.task_duration: List[int] = [t.duration for t in cac_tacvu]
+        self.task_deadline: List[int] = [  # mốc hạn chót (project_start_date + deadline ngày)
+            self.time_axis.to_slot(project_start_date + timedelta(days=t.deadline))
+            for t in cac_tacvu
+        ]
+        self.task_priority: List[int] = [t.priority for t in cac_tacvu]
+        self.task_skill: List[str] = [t.required_skill for t in cac_tacvu]
+        self.task_successors: List[List[int]] = [[] for _ in cac_tacvu]  # các tác vụ phụ thuộc vào tác vụ i
+        for i, tacvu in enumerate(cac_tacvu):
+            for dep_id in tacvu.dependencies:
+                if dep_id in self.task_index:
+                    self.task_successors[self.task_index[dep_id]].append(i)
+        # Theo từng kỹ năng yêu cầu: chỉ số các tác vụ cần kỹ năng đó và các nhân sự có kỹ năng đó
+        # ("" = không yêu cầu kỹ năng, mọi nhân sự đều làm được)
+        self.skill_tasks: Dict[str, List[int]] = {}
+        for i, skill in enumerate(self.task_skill):
+            self.skill_tasks.setdefault(skill, []).append(i)
+        self.skill_employees: Dict[str, List[int]] = {
+            skill: [e for e, nhansu in enumerate(cac_nhansu) if not skill or skill in nhansu.skills]
+            for skill in self.skill_tasks
+        }
+        # Nhóm năng lực: các kỹ năng có cùng tập nhân sự dùng chung một nguồn giờ làm việc nên được
+        # kiểm tra năng lực chung; skill_pool: kỹ năng -> kỹ năng đại diện, pool_skills: đại diện -> các kỹ năng
+        self.skill_pool: Dict[str, str] = {}
+        self.pool_skills: Dict[str, List[str]] = {}
+        representatives: Dict[Tuple[int, ...], str] = {}
+        for skill, employees in self.skill_employees.items():
+            representative = representatives.setdefault(tuple(employees), skill)
+            self.skill_pool[skill] = representative
+            self.pool_skills.setdefault(representative, []).append(skill)
+        # Ngược lại: các kỹ năng yêu cầu (khóa của skill_tasks) mà từng nhân sự đáp ứng
+        self.employee_skills: List[List[str]] = [[] for _ in cac_nhansu]
+        for skill, employees in self.skill_employees.items():
+            for e in employees:
+                self.employee_skills[e].append(skill)
+        # Nhân sự duy nhất có kỹ năng làm tác vụ (None nếu có từ 2 người trở lên) và ngược lại các tác vụ
+        # chỉ một nhân sự làm được, theo chỉ số nhân sự đó (dùng cho lan truyền tài nguyên rời rạc)
+        self.task_pinned_employee: List[Optional[int]] = [
+            employees[0] if len(employees) == 1 else None
+            for employees in (self.skill_employees[skill] for skill in self.task_skill)
+        ]
+        self.pinned_tasks: List[List[int]] = [[] for _ in cac_nhansu]
+        for i, emp_idx in enumerate(self.task_pinned_employee):
+            if emp_idx is not None:
+                self.pinned_tasks[emp_idx].append(i)
+        # Cửa sổ thời gian theo đường găng (CPM), tính bởi compute_time_windows() trước khi sinh miền
+        self.task_est: List[int] = [self.project_start] * len(cac_tacvu)  # mốc bắt đầu sớm nhất
+        self.task_lft: List[int] = [min(d, self.project_end) for d in self.task_deadline]  # mốc kết thúc muộn nhất
+        self.task_slack: List[int] = [0] * len(cac_tacvu)  # độ trễ cho phép (giờ làm việc)
+        self.critical_path: List[str] = []
         self.assignment: Dict[str, CSPAssignment] = {}  # ánh xạ task_id -> CSPAssignment
         self.solution_found = False
-        # domains: task_id -> list of possible CSPAssignment
+        # Lịch bận theo nhân sự, cập nhật qua assign()/unassign()
+        self.occupancy = OccupancyIndex(len(cac_nhansu))
+        # Bộ tích lũy cho ràng buộc mềm, cập nhật qua assign()/unassign()
+        self.emp_hours: List[int] = [0] * len(cac_nhansu)  # tổng giờ đã gán theo chỉ số nhân sự
+        # Sức chứa theo ngày: số giờ đã gán của từng nhân sự trong từng ngày làm việc (tác vụ không vắt
+        # qua 17h nên cả thời lượng tính vào ngày bắt đầu, như khi kiểm định kết quả)
+        self.emp_capacity: List[int] = [nhansu.daily_capacity for nhansu in cac_nhansu]
+        self.day_hours: List[List[int]] = [[0] * (self.project_end // HOURS_PER_DAY + 1) for _ in cac_nhansu]
+        self.total_assigned_hours = 0
+        self.assigned_priority = 0   # tổng priority của các tác vụ đã gán
+        self.priority_hours = 0      # tổng priority × calendar_hours(mốc bắt đầu), số nguyên nên undo chính xác
+        # Hằng số chuẩn hóa, tính một lần
+        self.max_priority = max(self.task_priority, default=1)
+        self.total_priority = sum(self.task_priority)
+        # domains: task_id -> bảng giá trị ban đầu (CSPAssignment), không bị sửa sau khi khởi tạo
         self.domains: Dict[str, List[CSPAssignment]] = {}
+        # Miền hiện tại dạng bitset trên bảng giá trị ở trên (AC-3, FC và tìm kiếm đều cắt tỉa tại đây)
+        self.domain_store: Optional[DomainStore] = None
         # Thống kê để đánh giá
         self.ac3_pruned_count = 0  # Số giá trị bị cắt bởi AC-3
         self.fc_pruned_count = 0   # Số giá trị bị cắt bởi Forward Checking
         self.backtrack_count = 0    # Số lần backtrack
-        # Pre-compute neighbor map để tránh tính lại nhiều lần
-        self.neighbor_map: Dict[str, List[TacVu]] = self._build_neighbor_map()
+        self.backjump_count = 0     # Số lần nhảy lùi vượt qua ít nhất một tầng (CBJ)
+        # Nogood đã học: (task_id, emp_id, start) -> các nogood chứa phép gán đó
+        # (mỗi nogood là bộ phép gán không thể cùng xuất hiện trong một lời giải)
+        self.nogoods: Dict[Tuple[str, str, int], List[Tuple[Tuple[str, str, int], ...]]] = {}
+        self.nogood_count = 0       # Số nogood đã học
+        self.restart_count = 0      # Số lần khởi động lại tìm kiếm
+        self.symmetry_pruned_count = 0  # Số giá trị bị bỏ qua do đối xứng giữa các nhân sự tương đương
+        self.disjunctive_pruned_count = 0  # Số giá trị bị cắt bởi lan truyền tài nguyên rời rạc (edge-finding)
+        self.energy_cut_count = 0  # Số nhánh bị cắt do cầu của một kỹ năng vượt giờ trống của nhân sự
+        self.capacity_pruned_count = 0  # Số giá trị bị cắt do nhân sự đã đủ sức chứa trong ngày
+        self.infeasibility_reason: Optional[str] = None  # Lý do vô nghiệm phát hiện trước tìm kiếm (nếu có)
+        self.best_score: Optional[float] = None  # Điểm mục tiêu tốt nhất (chế độ tối ưu)
+        # Hỗ trợ gần nhất của AC-3 (AC-2001): (task_i, task_j) -> chỉ số hỗ trợ trong miền task_j cho từng giá trị của task_i
+        self.ac3_supports: Dict[Tuple[str, str], List[int]] = {}
+        # Bản đồ hàng xóm: dựng một lần ở lần truy cập đầu tiên (O(n²) theo nhóm kỹ năng,
+        # các mô hình không dùng tới như greedy/local search không phải trả chi phí này)
+        self._neighbor_map: Optional[Dict[str, List[TacVu]]] = None
+    
+    @property
+    def neighbor_map(self) -> Dict[str, List[TacVu]]:
+        if self._neighbor_map is None:
+            self._neighbor_map = self._build_neighbor_map()
+        return self._neighbor_map
+    
+    def get_task(self, task_id: str) -> TacVu:
+        """Tra cứu tác vụ theo id trong O(1)"""
+        return self.cac_tacvu[self.task_index[task_id]]
+    
+    def assign(self, task_id: str, assignment: CSPAssignment):
+        """Gán tác vụ, cập nhật lịch bận của nhân sự và các bộ tích lũy ràng buộc mềm"""
+        self.assignment[task_id] = assignment
+        emp_idx = self.emp_index[assignment.nhansu.id]
+        self.occupancy.occupy(emp_idx, assignment.start, assignment.end)
+        task_idx = self.task_index[task_id]
+        duration = self.task_duration[task_idx]
+        priority = self.task_priority[task_idx]
+        self.emp_hours[emp_idx] += duration
+        self.day_hours[emp_idx][assignment.start // HOURS_PER_DAY] += duration
+        self.total_assigned_hours += duration
+        self.assigned_priority += priority
+        self.priority_hours += priority * self.time_axis.calendar_hours(assignment.start)
+    
+    def unassign(self, task_id: str):
+        """Bỏ gán tác vụ, giải phóng lịch bận và hoàn tác các bộ tích lũy"""
+        assignment = self.assignment.pop(task_id)
+        emp_idx = self.emp_index[assignment.nhansu.id]
+        self.occupancy.release(emp_idx, assignment.start, assignment.end)
+        task_idx = self.task_index[task_id]
+        duration = self.task_duration[task_idx]
+        priority = self.task_priority[task_idx]
+        self.emp_hours[emp_idx] -= duration
+        self.day_hours[emp_idx][assignment.start // HOURS_PER_DAY] -= duration
+        self.total_assigned_hours -= duration
+        self.assigned_priority -= priority
+        self.priority_hours -= priority * self.time_axis.calendar_hours(assignment.start)
+    
+    def fits_capacity(self, emp_idx: int, start: int, duration: int) -> bool:
+        """Nhân sự còn đủ sức chứa trong ngày của mốc start cho thêm duration giờ?"""
+        return self.day_hours[emp_idx][start // HOURS_PER_DAY] + duration <= self.emp_capacity[emp_idx]
+    
+    def find_overlapping_tasks(self) -> List[str]:
+        """
+        Các tác vụ bị trùng lịch với tác vụ khác của cùng nhân sự
+        (dựng lại chỉ mục lịch bận theo thứ tự thời gian bắt đầu, dùng cho kiểm định kết quả)
+        """
+        occupancy = OccupancyIndex(len(self.cac_nhansu))
+        overlapping = []
+        for task_id, assignment in sorted(self.assignment.items(), key=lambda x: x[1].start):
+            emp_idx = self.emp_index[assignment.nhansu.id]
+            if not occupancy.is_free(emp_idx, assignment.start, assignment.end):
+                overlapping.append(task_id)
+            occupancy.occupy(emp_idx, assignment.start, assignment.end)
+        return overlapping
+    
+    def _build_employee_classes(self) -> List[Optional[int]]:
+        """Gom nhân sự có cùng tập kỹ năng và sức chứa ngày vào một lớp"""
+        members: Dict[Tuple[frozenset, int], List[int]] = {}
+        for i, nhansu in enumerate(self.cac_nhansu):
+            members.setdefault((frozenset(nhansu.skills), nhansu.daily_capacity), []).append(i)
+        emp_class: List[Optional[int]] = [None] * len(self.cac_nhansu)
+        for group in members.values():
+            if len(group) > 1:
+                for i in group:
+                    emp_class[i] = group[0]
+        return emp_class
     
     def _build_neighbor_map(self) -> Dict[str, List[TacVu]]:
-        """Xây dựng bản đồ hàng xóm một lần duy nhất khi khởi tạo CSP"""
+        """Xây dựng bản đồ hàng xóm (một lần duy nhất, qua thuộc tính neighbor_map)"""
+        # Gom nhóm một lượt: tác vụ phụ thuộc vào từng tác vụ, tác vụ theo kỹ năng
+        dependents: Dict[str, List[int]] = {t.id: [] for t in self.cac_tacvu}
+        skill_groups: Dict[str, List[int]] = {}
+        for i, tacvu in enumerate(self.cac_tacvu):
+            for dep_id in tacvu.dependencies:
+                if dep_id in dependents:
+                    dependents[dep_id].append(i)
+            if tacvu.required_skill:  # Chỉ xét nếu có yêu cầu kỹ năng
+                skill_groups.setdefault(tacvu.required_skill, []).append(i)
+        
         neighbor_map = {}
-        for tacvu in self.cac_tacvu:
+        for i, tacvu in enumerate(self.cac_tacvu):
             neighbors = set()
             
             # 1. Tác vụ phụ thuộc VÀO tacvu
-            for other_task in self.cac_tacvu:
-                if tacvu.id in other_task.dependencies:
-                    neighbors.add(other_task)
+            neighbors.update(dependents[tacvu.id])
             
             # 2. Tác vụ mà tacvu phụ thuộc VÀO
             for dep_id in tacvu.dependencies:
-                dep_task = next((t for t in self.cac_tacvu if t.id == dep_id), None)
-                if dep_task:
-                    neighbors.add(dep_task)
+                if dep_id in self.task_index:
+                    neighbors.add(self.task_index[dep_id])
             
             # 3. Tác vụ cùng kỹ năng yêu cầu (cạnh tranh nhân sự)
-            for other_task in self.cac_tacvu:
-                if (other_task.required_skill == tacvu.required_skill and 
-                    other_task.id != tacvu.id and 
-                    other_task.required_skill):  # Chỉ xét nếu có yêu cầu kỹ năng
-                    neighbors.add(other_task)
+            if tacvu.required_skill:
+                neighbors.update(skill_groups[tacvu.required_skill])
             
-            neighbor_map[tacvu.id] = list(neighbors)
+            neighbors.discard(i)
+            # Sắp theo chỉ số để thứ tự duyệt ổn định giữa các lần chạy
+            neighbor_map[tacvu.id] = [self.cac_tacvu[j] for j in sorted(neighbors)]
         
         return neighbor_map
 
@@ -141,34 +498,108 @@ def is_consistent(tacvu: TacVu, assignment: CSPAssignment, csp: CSP) -> bool:
     # 2. Ràng buộc phụ thuộc giữa các tác vụ
     for dep_task_id in tacvu.dependencies:
         if dep_task_id in csp.assignment:
-            dep_assignment = csp.assignment[dep_task_id]
-            dep_task = next(t for t in csp.cac_tacvu if t.id == dep_task_id)
-            dep_end_time = dep_assignment.start_time + timedelta(hours=dep_task.duration)
-            if assignment.start_time < dep_end_time:
+            if assignment.start < csp.assignment[dep_task_id].end:
                 return False
     
-    # 3. Ràng buộc lịch làm việc (không được trùng thời gian)
-    task_end_time = assignment.start_time + timedelta(hours=tacvu.duration)
+    # 3. Ràng buộc lịch làm việc (không được trùng thời gian) - tra chỉ mục lịch bận
+    task_end = assignment.start + tacvu.duration
     
-    for assigned_task_id, assigned_assignment in csp.assignment.items():
-        if assigned_assignment.nhansu.id == assignment.nhansu.id:
-            assigned_task = next(t for t in csp.cac_tacvu if t.id == assigned_task_id)
-            assigned_end_time = assigned_assignment.start_time + timedelta(hours=assigned_task.duration)
-            if (assignment.start_time < assigned_end_time and 
-                task_end_time > assigned_assignment.start_time):
-                return False
+    if not csp.occupancy.is_free(csp.emp_index[assignment.nhansu.id], assignment.start, task_end):
+        return False
     
     # 4. Ràng buộc hạn chót của tác vụ
-    project_deadline = csp.project_start_date + timedelta(days=tacvu.deadline)
-    if task_end_time > project_deadline:
+    if task_end > csp.task_deadline[csp.task_index[tacvu.id]]:
         return False
     
     # 5. Ràng buộc trong khung thời gian dự án
-    if assignment.start_time < csp.project_start_date or task_end_time > csp.project_end_date:
+    if assignment.start < csp.project_start or task_end > csp.project_end:
+        return False
+    
+    # 6. Ràng buộc sức chứa theo ngày của nhân sự
+    if not csp.fits_capacity(csp.emp_index[assignment.nhansu.id], assignment.start, tacvu.duration):
         return False
     
     return True
 
+# ==================== CRITICAL PATH (CPM) ====================
+
+def earliest_fit_slot(slot: int, duration: int) -> int:
+    """Mốc bắt đầu hợp lệ sớm nhất >= slot (tác vụ không được kéo dài quá 17h)"""
+    offset = slot % HOURS_PER_DAY
+    if duration <= HOURS_PER_DAY and offset + duration > HOURS_PER_DAY:
+        slot += HOURS_PER_DAY - offset
+    return slot
+
+def latest_fit_slot(slot: int, duration: int) -> int:
+    """Mốc bắt đầu hợp lệ muộn nhất <= slot (tác vụ không được kéo dài quá 17h)"""
+    offset = slot % HOURS_PER_DAY
+    if duration <= HOURS_PER_DAY and offset + duration > HOURS_PER_DAY:
+        slot -= offset + duration - HOURS_PER_DAY
+    return slot
+
+def compute_time_windows(csp: CSP):
+    """
+    Phân tích đường găng (CPM) trên DAG phụ thuộc, chạy trước khi sinh miền
+    
+    - Lượt xuôi: EST = max(project_start, EST(tiền nhiệm) + thời lượng tiền nhiệm)
+    - Lượt ngược: LFT = min(hạn chót, project_end, mốc bắt đầu muộn nhất của tác vụ kế tiếp)
+    - Độ trễ cho phép (slack) = mốc bắt đầu muộn nhất - EST
+    - Đường găng: chuỗi tiền nhiệm quyết định EST, kết thúc ở tác vụ xong muộn nhất
+    
+    Tác vụ nằm trong chu trình phụ thuộc giữ nguyên cửa sổ mặc định.
+    Kết quả ghi vào csp.task_est, csp.task_lft, csp.task_slack, csp.critical_path.
+    """
+    n = len(csp.cac_tacvu)
+    durations = csp.task_duration
+    preds: List[List[int]] = [
+        [csp.task_index[dep_id] for dep_id in tacvu.dependencies if dep_id in csp.task_index]
+        for tacvu in csp.cac_tacvu
+    ]
+    succs: List[List[int]] = [[] for _ in range(n)]
+    in_degree = [len(p) for p in preds]
+    for i in range(n):
+        for p in preds[i]:
+            succs[p].append(i)
+    
+    # Thứ tự topo (Kahn)
+    order = [i for i in range(n) if in_degree[i] == 0]
+    for i in order:
+        for succ in succs[i]:
+            in_degree[succ] -= 1
+            if in_degree[succ] == 0:
+                order.append(succ)
+    
+    est = [csp.project_start] * n
+    lft = [min(deadline, csp.project_end) for deadline in csp.task_deadline]
+    critical_pred = [-1] * n
+    
+    # Lượt xuôi: mốc bắt đầu sớm nhất
+    for i in order:
+        start = csp.project_start
+        for p in preds[i]:
+            if est[p] + durations[p] > start:
+                start = est[p] + durations[p]
+                critical_pred[i] = p
+        est[i] = earliest_fit_slot(start, durations[i])
+    
+    # Lượt ngược: mốc kết thúc muộn nhất
+    for i in reversed(order):
+        for succ in succs[i]:
+            lft[i] = min(lft[i], latest_fit_slot(lft[succ] - durations[succ], durations[succ]))
+    
+    csp.task_est = est
+    csp.task_lft = lft
+    csp.task_slack = [latest_fit_slot(lft[i] - durations[i], durations[i]) - est[i] for i in range(n)]
+    
+    # Đường găng: lần ngược từ tác vụ có mốc kết thúc sớm nhất lớn nhất
+    csp.critical_path = []
+    if order:
+        last = max(order, key=lambda i: est[i] + durations[i])
+        while last != -1:
+            csp.critical_path.append(csp.cac_tacvu[last].id)
+            last = critical_pred[last]
+        csp.critical_path.reverse()
+
 def get_domain_values(tacvu: TacVu, csp: CSP) -> List[CSPAssignment]:
     """Lấy tất cả các phương án gán hợp lệ cho một tác vụ (dựa trên trạng thái csp hiện tại)"""
     domain = []
@@ -180,63 +611,165 @@ def get_domain_values(tacvu: TacVu, csp: CSP) -> List[CSPAssignment]:
     if not suitable_employees:
         return domain
     
-    # Tính thời gian bắt đầu sớm nhất dựa theo các phụ thuộc
-    earliest_start = csp.project_start_date
+    task_idx = csp.task_index[tacvu.id]
+    
+    # Tính thời gian bắt đầu sớm nhất dựa theo các phụ thuộc (và cửa sổ đường găng)
+    earliest_start = csp.task_est[task_idx]
     for dep_task_id in tacvu.dependencies:
         if dep_task_id in csp.assignment:
-            dep_assignment = csp.assignment[dep_task_id]
-            dep_task = next(t for t in csp.cac_tacvu if t.id == dep_task_id)
-            dep_end_time = dep_assignment.start_time + timedelta(hours=dep_task.duration)
-            earliest_start = max(earliest_start, dep_end_time)
-    
-    # Sinh các khoảng thời gian khả thi bắt đầu từ earliest_start
-    current_time = earliest_start
-    
-    # Làm tròn tới giờ kế tiếp nếu không tròn giờ
-    if current_time.minute > 0 or current_time.second > 0:
-        current_time = current_time.replace(minute=0, second=0) + timedelta(hours=1)
-    
-    while current_time < csp.project_end_date:
-        # Bỏ qua ngoài giờ làm việc (8h - 17h)
-        if current_time.hour < 8 or current_time.hour >= 17:
-            current_time = current_time.replace(hour=8, minute=0, second=0) + timedelta(days=1)
+            earliest_start = max(earliest_start, csp.assignment[dep_task_id].end)
+    
+    # Mốc kết thúc muộn nhất: hạn chót tác vụ, thời hạn dự án và cửa sổ đường găng
+    latest_end = csp.task_lft[task_idx]
+    
+    # Sinh các mốc bắt đầu khả thi từ earliest_start
+    slot = earliest_start
+    while slot + tacvu.duration <= latest_end:
+        # Bỏ qua nếu tác vụ kết thúc sau 17h -> chuyển sang 8h ngày hôm sau
+        offset = slot % HOURS_PER_DAY
+        if offset + tacvu.duration > HOURS_PER_DAY:
+            slot += HOURS_PER_DAY - offset
             continue
         
-        task_end_time = current_time + timedelta(hours=tacvu.duration)
-        
-        # Bỏ qua nếu tác vụ kết thúc sau 17h
-        if task_end_time.hour > 17:
-            current_time = current_time.replace(hour=8, minute=0, second=0) + timedelta(days=1)
-            continue
-        
-        # Bỏ qua nếu vượt quá thời hạn dự án
-        if task_end_time > csp.project_end_date:
-            break
-            
-        # Bỏ qua nếu vượt quá hạn chót tác vụ
-        project_deadline = csp.project_start_date + timedelta(days=tacvu.deadline)
-        if task_end_time > project_deadline:
-            break
-        
         # Thử gán cho từng nhân sự phù hợp
         for nhansu in suitable_employees:
-            assignment = CSPAssignment(nhansu, current_time)
+            assignment = CSPAssignment(nhansu, slot, slot + tacvu.duration, csp.time_axis)
             if is_consistent(tacvu, assignment, csp):
                 domain.append(assignment)
         
         # Chuyển sang giờ tiếp theo
-        current_time += timedelta(hours=1)
+        slot += 1
     
     return domain
 
 def initialize_domains(csp: CSP):
-    """Tạo miền ban đầu cho mỗi tác vụ dựa trên trạng thái assignment hiện tại (ban đầu rỗng)"""
+    """
+    Tạo miền ban đầu cho mỗi tác vụ dựa trên trạng thái assignment hiện tại (ban đầu rỗng)
+    Chỉ sinh các mốc trong cửa sổ [EST, LFT] của phân tích đường găng
+    (chế độ domain_mode="left_justified" thu miền lại sau AC-3, xem restrict_left_justified)
+    """
+    compute_time_windows(csp)
     csp.domains = {}
     for tacvu in csp.cac_tacvu:
         if tacvu.id in csp.assignment:
             csp.domains[tacvu.id] = []
         else:
             csp.domains[tacvu.id] = get_domain_values(tacvu, csp)
+    csp.domain_store = DomainStore(csp.domains)
+
+# ==================== LEFT-JUSTIFIED DOMAINS ====================
+# Với tính khả thi và điểm ưu tiên, bắt đầu muộn hơn trong cùng một khoảng trống của lịch nhân sự
+# bị trội bởi bắt đầu sớm nhất của khoảng trống đó → miền chỉ cần các mốc "dồn trái".
+# Bảng giá trị vẫn đủ mọi mốc theo giờ để Forward Checking bổ sung lại theo chỉ số.
+
+# Số ngày làm việc kế tiếp được giữ thêm một mốc neo (mốc rảnh sớm nhất trong ngày) cho mỗi nhân sự
+LEFT_JUSTIFIED_ANCHOR_DAYS = 2
+
+def earliest_free_start(csp: CSP, emp_idx: int, slot: int, duration: int, latest_end: int) -> Optional[int]:
+    """Mốc bắt đầu sớm nhất >= slot mà nhân sự rảnh suốt thời lượng, không kéo dài quá 17h và xong trước latest_end"""
+    occupancy = csp.occupancy
+    while True:
+        slot = earliest_fit_slot(occupancy.next_free_slot(emp_idx, slot), duration)
+        if slot + duration > latest_end:
+            return None
+        blocking = occupancy.busy[emp_idx] & occupancy.span_mask(slot, slot + duration)
+        if not blocking:
+            return slot
+        slot = blocking.bit_length()  # sau giờ bận cuối cùng trong khoảng
+
+def task_window(csp: CSP, tacvu: TacVu) -> Tuple[int, int]:
+    """(Mốc bắt đầu sớm nhất, mốc kết thúc muộn nhất) của tác vụ theo cửa sổ CPM và các tác vụ liên quan đã gán"""
+    task_idx = csp.task_index[tacvu.id]
+    release = csp.task_est[task_idx]
+    for dep_id in tacvu.dependencies:
+        if dep_id in csp.assignment:
+            release = max(release, csp.assignment[dep_id].end)
+    latest_end = csp.task_lft[task_idx]
+    for succ in csp.task_successors[task_idx]:
+        succ_id = csp.cac_tacvu[succ].id
+        if succ_id in csp.assignment:
+            latest_end = min(latest_end, csp.assignment[succ_id].start)
+    return release, latest_end
+
+def left_justified_mask(csp: CSP, tacvu: TacVu) -> int:
+    """
+    Mặt nạ các giá trị dồn trái của tác vụ: với mỗi nhân sự phù hợp, mốc sớm nhất của từng khoảng trống
+    trên lịch bận trong cửa sổ task_window, thêm mốc neo của LEFT_JUSTIFIED_ANCHOR_DAYS ngày kế tiếp
+    (cho tìm kiếm lựa chọn lùi tác vụ lại để nhường chỗ, cân bằng tải giữa các ngày)
+    """
+    store = csp.domain_store
+    release, latest_end = task_window(csp, tacvu)
+    duration = tacvu.duration
+    mask = 0
+    for emp_id, emp_mask in store.emp_masks[tacvu.id].items():
+        emp_idx = csp.emp_index[emp_id]
+        busy = csp.occupancy.busy[emp_idx]
+        starts = []
+        slot = earliest_free_start(csp, emp_idx, release, duration, latest_end)
+        while slot is not None:
+            starts.append(slot)
+            later = busy >> slot
+            if not later:
+                break
+            # Khoảng trống kết thúc ở giờ bận kế tiếp
+            slot = earliest_free_start(csp, emp_idx, slot + (later & -later).bit_length() - 1,
+                                       duration, latest_end)
+        if starts:
+            first_day = starts[0] // HOURS_PER_DAY
+            for day in range(first_day + 1, first_day + 1 + LEFT_JUSTIFIED_ANCHOR_DAYS):
+                anchor = earliest_free_start(csp, emp_idx, day * HOURS_PER_DAY, duration, latest_end)
+                if anchor is not None:
+                    starts.append(anchor)
+        for start in starts:
+            mask |= emp_mask & store.window_mask(tacvu.id, start, start + 1)
+    return mask
+
+def restrict_left_justified(csp: CSP) -> int:
+    """
+    Thu miền của mọi tác vụ chưa gán về các giá trị dồn trái (chế độ domain_mode="left_justified")
+    
+    Gọi sau AC-3: AC-3 chạy trên miền đầy đủ nên chỉ cắt giá trị thật sự vô nghiệm; chạy trên miền đã thu
+    thì nó cắt cả những giá trị mà Forward Checking sẽ bổ sung lại khi các tác vụ khác được gán
+    (ví dụ nhiều tác vụ chỉ có một nhân sự làm được, mỗi tác vụ chỉ còn vài mốc đầu ngày).
+    
+    Returns:
+        Số giá trị bị loại khỏi miền
+    """
+    store = csp.domain_store
+    removed = 0
+    for tacvu in csp.cac_tacvu:
+        bits = store.bits.get(tacvu.id, 0)
+        if bits and tacvu.id not in csp.assignment:
+            restricted = bits & left_justified_mask(csp, tacvu)
+            if restricted:  # giá trị dồn trái đều bị AC-3 cắt → giữ miền của AC-3
+                store.bits[tacvu.id] = restricted
+                removed += (bits ^ restricted).bit_count()
+    return removed
+
+def rederive_left_justified(csp: CSP, tacvu: TacVu, assigned_task: TacVu,
+                            assigned_assignment: CSPAssignment) -> int:
+    """
+    Mặt nạ các mốc dồn trái mới của tacvu sau phép gán assigned_task (chế độ domain_mode="left_justified"):
+    mốc rảnh sớm nhất ngay sau tác vụ vừa gán trên lịch của cùng nhân sự, và nếu tacvu phụ thuộc vào
+    tác vụ vừa gán thì mốc rảnh sớm nhất từ thời điểm giải phóng mới trên lịch của từng nhân sự.
+    Các mốc này rảnh và nằm trong task_window nên nhất quán với mọi phép gán hiện tại.
+    """
+    store = csp.domain_store
+    emp_masks = store.emp_masks[tacvu.id]
+    release, latest_end = task_window(csp, tacvu)
+    candidates = []
+    if assigned_task.id in tacvu.dependencies:
+        candidates = [(emp_id, release) for emp_id in emp_masks]
+    emp_id = assigned_assignment.nhansu.id
+    if emp_id in emp_masks:
+        candidates.append((emp_id, max(release, assigned_assignment.end)))
+    
+    mask = 0
+    for emp_id, slot in candidates:
+        start = earliest_free_start(csp, csp.emp_index[emp_id], slot, tacvu.duration, latest_end)
+        if start is not None:
+            mask |= emp_masks[emp_id] & store.window_mask(tacvu.id, start, start + 1)
+    return mask
 
 def get_neighbors(tacvu: TacVu, csp: CSP) -> List[TacVu]:
     """
@@ -260,41 +793,351 @@ def check_conflict_between_assignments(task1: TacVu, assignment1: CSPAssignment,
         True nếu CÓ XUNG ĐỘT
         False nếu KHÔNG XUNG ĐỘT
     """
-    end_time_1 = assignment1.start_time + timedelta(hours=task1.duration)
-    end_time_2 = assignment2.start_time + timedelta(hours=task2.duration)
+    start_1, end_1 = assignment1.start, assignment1.end
+    start_2, end_2 = assignment2.start, assignment2.end
     
     # KIỂM TRA 1: Cùng nhân sự + thời gian trùng lặp?
     if assignment1.nhansu.id == assignment2.nhansu.id:
-        if (assignment1.start_time < end_time_2 and end_time_1 > assignment2.start_time):
+        if (start_1 < end_2 and end_1 > start_2):
             return True  # CÓ XUNG ĐỘT
     
     # KIỂM TRA 2: Phụ thuộc không thỏa mãn?
     if task2.id in task1.dependencies:
-        if assignment1.start_time < end_time_2:
+        if start_1 < end_2:
             return True  # CÓ XUNG ĐỘT
     
     if task1.id in task2.dependencies:
-        if assignment2.start_time < end_time_1:
+        if start_2 < end_1:
             return True  # CÓ XUNG ĐỘT
     
     # KIỂM TRA 3: Deadline bị vượt?
-    task1_deadline = csp.project_start_date + timedelta(days=task1.deadline)
-    if end_time_1 > task1_deadline:
+    if end_1 > csp.task_deadline[csp.task_index[task1.id]]:
         return True  # CÓ XUNG ĐỘT
     
-    task2_deadline = csp.project_start_date + timedelta(days=task2.deadline)
-    if end_time_2 > task2_deadline:
+    if end_2 > csp.task_deadline[csp.task_index[task2.id]]:
         return True  # CÓ XUNG ĐỘT
     
     # KIỂM TRA 4: Ngoài khung thời gian dự án?
-    if assignment1.start_time < csp.project_start_date or end_time_1 > csp.project_end_date:
+    if start_1 < csp.project_start or end_1 > csp.project_end:
         return True  # CÓ XUNG ĐỘT
     
-    if assignment2.start_time < csp.project_start_date or end_time_2 > csp.project_end_date:
+    if start_2 < csp.project_start or end_2 > csp.project_end:
         return True  # CÓ XUNG ĐỘT
     
     return False  # KHÔNG XUNG ĐỘT
 
+# ==================== PROPAGATORS ====================
+# Bộ lan truyền chuyên biệt theo loại ràng buộc: mỗi hàm trả về MẶT NẠ các giá trị
+# cần cắt khỏi miền của một tác vụ, chỉ dựa trên vài cận của miền bên kia
+# (mốc bắt đầu sớm nhất/muộn nhất, nhân sự duy nhất) thay vì duyệt từng cặp giá trị.
+
+def domain_bounds(csp: CSP, task_id: str) -> Optional[Tuple[int, int, Optional[str]]]:
+    """
+    Cận của miền hiện tại: (mốc bắt đầu sớm nhất, mốc bắt đầu muộn nhất, nhân sự duy nhất)
+    Nhân sự duy nhất = None nếu miền còn giá trị của từ 2 nhân sự trở lên.
+    Trả về None nếu miền rỗng.
+    """
+    store = csp.domain_store
+    bits = store.bits.get(task_id, 0)
+    if not bits:
+        return None
+    starts = store.starts[task_id]
+    min_start = starts[(bits & -bits).bit_length() - 1]
+    max_start = starts[bits.bit_length() - 1]
+    
+    sole_employee = None
+    for emp_id, emp_mask in store.emp_masks[task_id].items():
+        if bits & emp_mask:
+            if sole_employee is not None:
+                return min_start, max_start, None
+            sole_employee = emp_id
+    return min_start, max_start, sole_employee
+
+def domain_window(csp: CSP, task_id: str) -> Tuple[int, int]:
+    """
+    (Mốc bắt đầu sớm nhất, mốc kết thúc muộn nhất) của tác vụ theo miền hiện tại (miền khác rỗng).
+    Miền dồn trái không chứa mọi mốc khả thi nên dùng task_window.
+    """
+    if csp.config.domain_mode == "left_justified":
+        return task_window(csp, csp.get_task(task_id))
+    store = csp.domain_store
+    bits = store.bits[task_id]
+    starts = store.starts[task_id]
+    latest_start = starts[bits.bit_length() - 1]
+    return starts[(bits & -bits).bit_length() - 1], latest_start + csp.task_duration[csp.task_index[task_id]]
+
+def propagate_unary(csp: CSP, task_id: str) -> int:
+    """Ràng buộc đơn: các giá trị vượt hạn chót tác vụ hoặc nằm ngoài khung thời gian dự án"""
+    store = csp.domain_store
+    task_idx = csp.task_index[task_id]
+    latest_end = min(csp.task_deadline[task_idx], csp.project_end)
+    valid = store.window_mask(task_id, csp.project_start, latest_end - csp.task_duration[task_idx] + 1)
+    return store.bits.get(task_id, 0) & ~valid
+
+def propagate_precedence(csp: CSP, task_id: str, earliest_start: int) -> int:
+    """Tác vụ phải bắt đầu sau khi tác vụ tiền nhiệm kết thúc: cắt các giá trị bắt đầu trước earliest_start"""
+    return csp.domain_store.window_mask(task_id, -math.inf, earliest_start)
+
+def propagate_successor(csp: CSP, task_id: str, latest_end: int) -> int:
+    """Tác vụ phải kết thúc trước khi tác vụ kế tiếp bắt đầu: cắt các giá trị kết thúc sau latest_end"""
+    duration = csp.task_duration[csp.task_index[task_id]]
+    return csp.domain_store.window_mask(task_id, latest_end - duration + 1, math.inf)
+
+def propagate_no_overlap(csp: CSP, task_id: str, emp_id: str, busy_start: int, busy_end: int) -> int:
+    """
+    Không trùng lịch: cắt các giá trị giao cho emp_id mà trùng mọi giá trị của tác vụ bên kia.
+    Bên kia chỉ còn nhân sự emp_id với mốc bắt đầu trong [min_start, max_start] thì giá trị
+    x trùng tất cả khi x < min_end và x + thời lượng > max_start, tức là "trùng" khoảng
+    [busy_start, busy_end) = [max_start, min_end) (với phép gán: đúng khoảng [start, end)).
+    """
+    duration = csp.task_duration[csp.task_index[task_id]]
+    return csp.domain_store.busy_mask(task_id, emp_id, busy_start, busy_end, duration)
+
+def propagate_daily_capacity(csp: CSP, task_id: str, emp_idx: int, day: int) -> int:
+    """
+    Sức chứa theo ngày: cắt các giá trị giao cho nhân sự emp_idx bắt đầu trong ngày day
+    nếu thời lượng tác vụ vượt số giờ còn lại của nhân sự trong ngày đó
+    """
+    spare = csp.emp_capacity[emp_idx] - csp.day_hours[emp_idx][day]
+    if csp.task_duration[csp.task_index[task_id]] <= spare:
+        return 0
+    store = csp.domain_store
+    emp_mask = store.emp_masks.get(task_id, {}).get(csp.cac_nhansu[emp_idx].id, 0)
+    if not emp_mask:
+        return 0
+    return emp_mask & store.window_mask(task_id, day * HOURS_PER_DAY, (day + 1) * HOURS_PER_DAY)
+
+def propagate_arc(csp: CSP, task_i: TacVu, task_j: TacVu,
+                  min_start_j: int, max_start_j: int, employee_j: Optional[str]) -> int:
+    """
+    Bộ điều phối: mặt nạ các giá trị của task_i không còn hỗ trợ nào trong miền task_j
+    (miền task_j cho bởi các cận; phép gán = miền một giá trị).
+    
+    - task_i phụ thuộc task_j   → propagate_precedence (bao hàm luôn ràng buộc trùng lịch)
+    - task_j phụ thuộc task_i   → propagate_successor
+    - chỉ cạnh tranh nhân sự    → propagate_no_overlap, chỉ khi task_j còn đúng một nhân sự
+    Với cặp phụ thuộc vòng, hợp hai mặt nạ chỉ chính xác khi miền task_j có một giá trị
+    (AC-3 dùng generic_unsupported_mask cho trường hợp này).
+    """
+    duration_j = csp.task_duration[csp.task_index[task_j.id]]
+    i_after_j = task_j.id in task_i.dependencies
+    i_before_j = task_i.id in task_j.dependencies
+    
+    if i_after_j or i_before_j:
+        mask = 0
+        if i_after_j:
+            mask |= propagate_precedence(csp, task_i.id, min_start_j + duration_j)
+        if i_before_j:
+            mask |= propagate_successor(csp, task_i.id, max_start_j)
+        return mask
+    
+    if employee_j is None:
+        return 0  # task_j còn ít nhất 2 nhân sự → mọi giá trị của task_i đều có hỗ trợ
+    return propagate_no_overlap(csp, task_i.id, employee_j, max_start_j, min_start_j + duration_j)
+
+# ==================== DISJUNCTIVE RESOURCE (EDGE-FINDING) ====================
+# Mỗi nhân sự là một tài nguyên rời rạc: các tác vụ chỉ người đó làm được (csp.pinned_tasks) cùng các
+# khoảng đã bận không thể chồng nhau. Ràng buộc trùng lịch theo cặp không thấy được một nhóm tác vụ
+# cùng không vừa trước hạn chót; edge-finding và not-first/not-last lập luận trên cả nhóm.
+# Bài toán được nới lỏng (bỏ qua việc tác vụ không được kéo dài quá 17h) nên các cận suy ra luôn đúng.
+
+def disjunctive_est_bounds(est: List[int], lct: List[int], durations: List[int]) -> Optional[List[int]]:
+    """
+    Cận dưới mới cho mốc bắt đầu của các hoạt động trên một tài nguyên rời rạc
+    (est: bắt đầu sớm nhất, lct: kết thúc muộn nhất, durations: thời lượng)
+    
+    Duyệt các tập Ω = {j: est_j >= E, lct_j <= L} (task interval), cộng dồn theo E giảm dần:
+    - Quá tải: E + p(Ω) > L → không lịch nào thỏa, trả về None
+    - Edge-finding: min(est_i, E) + p(Ω) + p_i > L → i phải làm sau mọi tác vụ của Ω,
+      est_i >= ECT(Ω) = max(E' + p(Ω')) trên các tập con cùng dạng
+    - Not-first: L - p(Ω) < est_i + p_i → i không thể làm trước cả Ω, est_i >= min ect_j (j ∈ Ω)
+    """
+    n = len(est)
+    new_est = list(est)
+    order = sorted(range(n), key=lambda j: est[j], reverse=True)
+    for latest in sorted(set(lct)):
+        # Các tập Ω lồng nhau theo E giảm dần: (E, p(Ω), ECT(Ω), min ect_j)
+        omegas = []
+        position = [n] * n  # vị trí tác vụ được thêm vào Ω (n = không thuộc Ω nào với L này)
+        total = 0
+        ect = -math.inf
+        min_ect = math.inf
+        for j in order:
+            if lct[j] <= latest:
+                total += durations[j]
+                if est[j] + total > latest:
+                    return None
+                ect = max(ect, est[j] + total)
+                min_ect = min(min_ect, est[j] + durations[j])
+                position[j] = len(omegas)
+                omegas.append((est[j], total, ect, min_ect))
+        
+        for i in range(n):
+            # i thuộc mọi Ω từ vị trí được thêm trở đi → chỉ xét các Ω đứng trước vị trí đó
+            for first, total, ect, min_ect in omegas[:position[i]]:
+                if min(est[i], first) + total + durations[i] > latest:
+                    new_est[i] = max(new_est[i], ect)
+                if latest - total < est[i] + durations[i]:
+                    new_est[i] = max(new_est[i], min_ect)
+    return new_est
+
+def propagate_disjunctive(csp: CSP, emp_indices: Iterable[int]) -> bool:
+    """
+    Lan truyền tài nguyên rời rạc trên lịch của từng nhân sự trong emp_indices, tới điểm bất động
+    
+    Hoạt động = các tác vụ chưa gán chỉ nhân sự đó làm được (cửa sổ domain_window) cùng các khoảng
+    đã bận (cố định). Cận mới được áp dụng bằng
+    propagate_precedence/propagate_successor; mục trail được đánh dấu global_reason vì lý do là toàn bộ
+    phép gán. Quá tải thì miền của một tác vụ trong nhóm bị cắt rỗng, để mục trail cuối cùng là miền
+    rỗng như khi Forward Checking thất bại.
+    
+    Returns:
+        False nếu có miền bị cắt rỗng
+    """
+    store = csp.domain_store
+    for emp_idx in emp_indices:
+        changed = bool(csp.pinned_tasks[emp_idx])
+        while changed:
+            changed = False
+            task_ids = [csp.cac_tacvu[i].id for i in csp.pinned_tasks[emp_idx]
+                        if csp.cac_tacvu[i].id not in csp.assignment and store.bits.get(csp.cac_tacvu[i].id)]
+            if not task_ids:
+                break
+            est, lct, durations = [], [], []
+            for task_id in task_ids:
+                release, latest_end = domain_window(csp, task_id)
+                est.append(release)
+                lct.append(latest_end)
+                durations.append(csp.task_duration[csp.task_index[task_id]])
+            
+            # Các khoảng đã bận (liền mạch) trong tầm cửa sổ của nhóm
+            busy = csp.occupancy.busy[emp_idx] & OccupancyIndex.span_mask(min(est), max(lct))
+            while busy:
+                start = (busy & -busy).bit_length() - 1
+                free = ~(busy >> start)
+                end = start + (free & -free).bit_length() - 1
+                est.append(start)
+                lct.append(end)
+                durations.append(end - start)
+                busy &= ~OccupancyIndex.span_mask(start, end)
+            
+            # Chiều ngược (đảo trục thời gian) cho cận trên của mốc kết thúc (edge-finding ngược, not-last)
+            lower = disjunctive_est_bounds(est, lct, durations)
+            upper = disjunctive_est_bounds([-x for x in lct], [-x for x in est], durations)
+            if lower is None or upper is None:
+                csp.disjunctive_pruned_count += store.remove_mask(task_ids[0], store.bits[task_ids[0]],
+                                                                  global_reason=True)
+                return False
+            for k, task_id in enumerate(task_ids):
+                mask = 0
+                if lower[k] > est[k]:
+                    mask |= propagate_precedence(csp, task_id, lower[k])
+                if -upper[k] < lct[k]:
+                    mask |= propagate_successor(csp, task_id, -upper[k])
+                removed = store.remove_mask(task_id, mask, global_reason=True)
+                if removed:
+                    csp.disjunctive_pruned_count += removed
+                    changed = True
+                    if not store.bits[task_id]:
+                        return False
+    return True
+
+# ==================== SKILL-POOL ENERGY ====================
+# So khối lượng còn lại của từng nhóm năng lực (tổng giờ của các tác vụ chưa gán cần các kỹ năng có
+# cùng tập nhân sự) với số giờ còn làm được của các nhân sự đó trước mỗi hạn chót. Mỗi tác vụ phải nằm
+# trọn trong giờ trống của một nhân sự phù hợp bên trong cửa sổ của nó và trong sức chứa ngày còn lại,
+# nên cầu vượt cung trong một khoảng thời gian nào đó là vô nghiệm.
+
+def employee_supply(csp: CSP, emp_idx: int, start: int, end: int) -> int:
+    """
+    Số giờ nhân sự còn làm được trong [start, end): theo từng ngày, số giờ trống trong khoảng
+    nhưng không quá sức chứa ngày còn lại (daily_capacity - số giờ đã gán trong ngày)
+    """
+    busy = csp.occupancy.busy[emp_idx]
+    capacity = csp.emp_capacity[emp_idx]
+    if capacity >= HOURS_PER_DAY:
+        return end - start - (busy & OccupancyIndex.span_mask(start, end)).bit_count()
+    day_hours = csp.day_hours[emp_idx]
+    supply = 0
+    for day in range(start // HOURS_PER_DAY, (end - 1) // HOURS_PER_DAY + 1):
+        lo = max(start, day * HOURS_PER_DAY)
+        hi = min(end, (day + 1) * HOURS_PER_DAY)
+        free = hi - lo - (busy & OccupancyIndex.span_mask(lo, hi)).bit_count()
+        supply += min(free, max(0, capacity - day_hours[day]))
+    return supply
+
+def skill_energy_overload(csp: CSP, skill: str) -> Optional[Tuple[int, int, int, int, str]]:
+    """
+    Tìm khoảng thời gian mà cầu của nhóm năng lực (skill là kỹ năng đại diện, xem CSP.pool_skills) vượt cung
+    
+    Tác vụ chưa gán được sắp theo mốc kết thúc muộn nhất (lct); với mỗi lct, khoảng xét là
+    [est nhỏ nhất của các tác vụ đã duyệt, lct) và cầu là tổng thời lượng của chúng.
+    Cung = tổng employee_supply của từng nhân sự phù hợp trong khoảng đó.
+    
+    Returns:
+        (mốc đầu, mốc cuối, cầu, cung, task_id của tác vụ có lct lớn nhất trong khoảng)
+        hoặc None nếu không có khoảng quá tải
+    """
+    store = csp.domain_store
+    windows = []
+    for pool_skill in csp.pool_skills[skill]:
+        for i in csp.skill_tasks[pool_skill]:
+            task_id = csp.cac_tacvu[i].id
+            if task_id not in csp.assignment and store.bits.get(task_id):
+                release, latest_end = domain_window(csp, task_id)
+                windows.append((latest_end, release, csp.task_duration[i], task_id))
+    windows.sort()
+    employees = csp.skill_employees[skill]
+    window_start = None
+    demand = 0
+    for k, (latest_end, release, duration, task_id) in enumerate(windows):
+        window_start = release if window_start is None else min(window_start, release)
+        demand += duration
+        if k + 1 < len(windows) and windows[k + 1][0] == latest_end:
+            continue  # chỉ xét khi đã cộng mọi tác vụ cùng lct
+        supply = sum(employee_supply(csp, e, window_start, latest_end) for e in employees)
+        if demand > supply:
+            return window_start, latest_end, demand, supply, task_id
+    return None
+
+def propagate_skill_energy(csp: CSP, skills: Iterable[str]) -> bool:
+    """
+    Kiểm tra năng lực cho các nhóm năng lực (kỹ năng đại diện) trong skills
+    
+    Quá tải thì miền của tác vụ trả về bởi skill_energy_overload bị cắt rỗng (mục trail global_reason,
+    như propagate_disjunctive) để tìm kiếm quay lui ngay.
+    
+    Returns:
+        False nếu có kỹ năng quá tải
+    """
+    for skill in skills:
+        overload = skill_energy_overload(csp, skill)
+        if overload is not None:
+            task_id = overload[-1]
+            csp.domain_store.remove_mask(task_id, csp.domain_store.bits[task_id], global_reason=True)
+            csp.energy_cut_count += 1
+            return False
+    return True
+
+def describe_energy_overload(csp: CSP, skill: str, overload: Tuple[int, int, int, int, str]) -> str:
+    """Mô tả quá tải (kết quả của skill_energy_overload) bằng lời, dùng làm lý do vô nghiệm"""
+    window_start, window_end, demand, supply, _ = overload
+    deadline = csp.time_axis.to_datetime(window_end, is_end=True).strftime('%H:%M %d/%m/%Y')
+    start = csp.time_axis.to_datetime(window_start).strftime('%H:%M %d/%m/%Y')
+    skills = ", ".join(pool_skill or "bất kỳ" for pool_skill in csp.pool_skills[skill])
+    return (f"kỹ năng '{skills}' cần {demand} giờ làm việc từ {start} đến {deadline}"
+            f" nhưng {len(csp.skill_employees[skill])} nhân sự phù hợp chỉ còn làm được {supply} giờ"
+            f" (theo giờ trống và sức chứa ngày)")
+
+def check_skill_energy(csp: CSP) -> bool:
+    """Kiểm tra năng lực mọi nhóm năng lực trước tìm kiếm; quá tải thì ghi lý do vào csp.infeasibility_reason"""
+    for skill in csp.pool_skills:
+        overload = skill_energy_overload(csp, skill)
+        if overload is not None:
+            csp.infeasibility_reason = describe_energy_overload(csp, skill, overload)
+            return False
+    return True
+
 # ==================== AC-3 IMPLEMENTATION ====================
 
 def create_all_arcs(csp: CSP) -> List[Tuple[TacVu, TacVu]]:
@@ -326,45 +1169,129 @@ def revise(task_i: TacVu, task_j: TacVu, csp: CSP) -> bool:
         True nếu có thay đổi domain của task_i
         False nếu không có thay đổi
     """
-    revised = False  # Cờ đánh dấu có thay đổi domain không
-    domain_i = csp.domains.get(task_i.id, [])
-    domain_j = csp.domains.get(task_j.id, [])
+    removed = csp.domain_store.remove_mask(task_i.id, unsupported_mask(task_i, task_j, csp))
+    csp.ac3_pruned_count += removed
+    return removed > 0
+
+def unsupported_mask(task_i: TacVu, task_j: TacVu, csp: CSP) -> int:
+    """
+    Mặt nạ các giá trị hiện có của task_i không có hỗ trợ trong domain_j (không sửa miền)
+    
+    Điều phối theo loại ràng buộc (propagate_arc) - chỉ cần các cận của domain_j.
+    Cặp phụ thuộc vòng dùng generic_unsupported_mask (duyệt từng cặp giá trị).
+    """
+    if task_j.id in task_i.dependencies and task_i.id in task_j.dependencies:
+        return generic_unsupported_mask(task_i, task_j, csp)
+    
+    bits_i = csp.domain_store.bits.get(task_i.id, 0)
+    bounds = domain_bounds(csp, task_j.id)
+    if bounds is None:
+        # domain_j rỗng → không giá trị nào của task_i có hỗ trợ
+        return bits_i
+    return bits_i & propagate_arc(csp, task_i, task_j, *bounds)
+
+def generic_unsupported_mask(task_i: TacVu, task_j: TacVu, csp: CSP) -> int:
+    """
+    Phiên bản tổng quát: check_conflict_between_assignments() cho từng cặp giá trị
     
-    # Danh sách giá trị cần loại bỏ
-    to_remove = []
+    Kiểu AC-2001: mỗi giá trị của task_i nhớ chỉ số giá trị hỗ trợ gần nhất trong
+    domain_j (csp.ac3_supports). Khi arc được xét lại, chỉ những giá trị có hỗ trợ
+    đã bị cắt mới phải tìm lại, và chỉ tìm tiếp từ sau hỗ trợ cũ (các giá trị đứng
+    trước đã được xác nhận là xung đột, miền chỉ co lại nên không cần xét lại).
+    """
+    store = csp.domain_store
+    bits_j = store.bits.get(task_j.id, 0)
+    domain_j = store.live_items(task_j.id)
+    live_j = [index_j for index_j, _ in domain_j]
+    
+    # Hỗ trợ đã biết cho từng giá trị của task_i trên arc này (-1 = chưa có)
+    arc = (task_i.id, task_j.id)
+    supports = csp.ac3_supports.get(arc)
+    if supports is None:
+        supports = [-1] * len(store.values.get(task_i.id, []))
+        csp.ac3_supports[arc] = supports
+    
+    # Mặt nạ các giá trị không có hỗ trợ
+    to_remove = 0
     
     # Duyệt qua từng giá trị trong domain của task_i
-    for value_i in domain_i:
-        # Kiểm tra xem có TỒN TẠI ít nhất 1 giá trị trong domain_j
-        # sao cho (value_i, value_j) không xung đột không?
+    for k, value_i in store.live_items(task_i.id):
+        last = supports[k]
         
-        found_consistent_value = False
+        # Hỗ trợ cũ vẫn còn trong domain_j → value_i vẫn hợp lệ, không cần quét lại
+        if last >= 0 and (bits_j >> last) & 1:
+            continue
         
-        for value_j in domain_j:
+        # Tìm hỗ trợ mới trong các giá trị còn lại đứng SAU hỗ trợ cũ
+        found_support = -1
+        for index_j, value_j in domain_j[bisect_right(live_j, last):]:
             # Kiểm tra xung đột giữa 2 assignment (sử dụng hàm đã có)
-            has_conflict = check_conflict_between_assignments(
-                task_i, value_i,
-                task_j, value_j,
-                csp
-            )
-            
-            # Nếu KHÔNG xung đột → Tìm được giá trị hợp lệ
-            if not has_conflict:
-                found_consistent_value = True
+            if not check_conflict_between_assignments(task_i, value_i, task_j, value_j, csp):
+                found_support = index_j
                 break  # Không cần kiểm tra thêm
         
-        # Nếu KHÔNG TÌM ĐƯỢC giá trị nào hợp lệ
-        if not found_consistent_value:
-            # Đánh dấu để loại bỏ value_i khỏi domain của task_i
-            to_remove.append(value_i)
-            revised = True
-    
-    # Cắt tỉa domain
-    for value_to_remove in to_remove:
-        csp.domains[task_i.id].remove(value_to_remove)
-        csp.ac3_pruned_count += 1
+        if found_support >= 0:
+            supports[k] = found_support
+        else:
+            # KHÔNG TÌM ĐƯỢC giá trị nào hợp lệ → loại bỏ value_i khỏi domain của task_i
+            to_remove |= 1 << k
     
-    return revised  # True nếu có thay đổi, False nếu không
+    return to_remove
+
+def explain_empty_domain(csp: CSP, tacvu: TacVu) -> str:
+    """Lý do (bằng lời) tác vụ không có phương án nào dù chưa xét tới tác vụ khác"""
+    task_idx = csp.task_index[tacvu.id]
+    duration = csp.task_duration[task_idx]
+    skill = csp.task_skill[task_idx]
+    employees = csp.skill_employees[skill]
+    if not employees:
+        cause = f"không có nhân sự nào có kỹ năng '{skill}'"
+    elif duration > HOURS_PER_DAY:
+        cause = f"thời lượng {duration} giờ dài hơn một ngày làm việc ({HOURS_PER_DAY} giờ)"
+    elif all(csp.emp_capacity[e] < duration for e in employees):
+        cause = f"thời lượng {duration} giờ vượt sức chứa ngày của mọi nhân sự có kỹ năng '{skill}'"
+    else:
+        latest_end = min(csp.task_deadline[task_idx], csp.project_end)
+        if earliest_fit_slot(csp.project_start, duration) + duration > latest_end:
+            deadline = csp.time_axis.to_datetime(latest_end, is_end=True).strftime('%H:%M %d/%m/%Y')
+            cause = f"không thể hoàn thành {duration} giờ trước hạn chót {deadline}"
+        else:
+            # Cửa sổ đường găng bị thu hẹp bởi tiền nhiệm (EST) và/hoặc các tác vụ phụ thuộc vào nó (LFT)
+            details = []
+            if csp.task_est[task_idx] > csp.project_start:
+                ready = csp.time_axis.to_datetime(csp.task_est[task_idx]).strftime('%H:%M %d/%m/%Y')
+                details.append(f"các tác vụ tiền nhiệm sớm nhất xong lúc {ready}")
+            if csp.task_lft[task_idx] <= csp.project_start:
+                details.append("các tác vụ phụ thuộc vào nó không kịp hạn chót dù bắt đầu ngay")
+            elif csp.task_lft[task_idx] < latest_end:
+                finish = csp.time_axis.to_datetime(csp.task_lft[task_idx], is_end=True).strftime('%H:%M %d/%m/%Y')
+                details.append(f"các tác vụ phụ thuộc vào nó buộc nó xong trước {finish}")
+            cause = f"không đủ {duration} giờ theo chuỗi phụ thuộc ({'; '.join(details)})"
+    return f"tác vụ {tacvu.id} ({tacvu.name}): {cause}"
+
+def enforce_node_consistency(csp: CSP) -> bool:
+    """
+    Nhất quán nút: cắt các giá trị vi phạm ràng buộc đơn (deadline, khung dự án)
+    Returns: False nếu có miền rỗng (kể cả rỗng ngay từ khi khởi tạo), lý do ghi vào csp.infeasibility_reason
+    """
+    store = csp.domain_store
+    for tacvu in csp.cac_tacvu:
+        if tacvu.id in csp.assignment:
+            continue
+        csp.ac3_pruned_count += store.remove_mask(tacvu.id, propagate_unary(csp, tacvu.id))
+        if store.size(tacvu.id) == 0:
+            csp.infeasibility_reason = explain_empty_domain(csp, tacvu)
+            return False
+    return True
+
+def explain_arc_wipeout(task_i: TacVu, task_j: TacVu) -> str:
+    """Lý do (bằng lời) miền của task_i bị AC-3 cắt rỗng khi xét arc (task_i, task_j)"""
+    if task_j.id in task_i.dependencies or task_i.id in task_j.dependencies:
+        relation = "ràng buộc phụ thuộc"
+    else:
+        relation = "tranh chấp nhân sự"
+    return (f"tác vụ {task_i.id} ({task_i.name}): không còn phương án nào tương thích với"
+            f" tác vụ {task_j.id} ({task_j.name}) do {relation}")
 
 def ac3_preprocess(csp: CSP) -> bool:
     """
@@ -374,6 +1301,10 @@ def ac3_preprocess(csp: CSP) -> bool:
         True nếu AC-3 thành công (không phát hiện ngõ cụt)
         False nếu phát hiện domain rỗng (bài toán không có lời giải)
     """
+    # Nhất quán nút: cắt các giá trị vi phạm ràng buộc đơn (deadline, khung dự án)
+    if not enforce_node_consistency(csp):
+        return False
+    
     # Tạo hàng đợi chứa tất cả các arc (cung)
     queue = deque(create_all_arcs(csp))
     # Sử dụng set để theo dõi các arc đã có trong queue (tránh trùng lặp)
@@ -392,7 +1323,8 @@ def ac3_preprocess(csp: CSP) -> bool:
         # Nếu domain của task_i bị thay đổi
         if revised:
             # Kiểm tra ngõ cụt
-            if len(csp.domains[task_i.id]) == 0:
+            if csp.domain_store.size(task_i.id) == 0:
+                csp.infeasibility_reason = explain_arc_wipeout(task_i, task_j)
                 return False  # Phát hiện ngõ cụt!
             
             # LAN TRUYỀN: Thêm tất cả arc (task_k, task_i) vào hàng đợi
@@ -411,14 +1343,13 @@ def ac3_preprocess(csp: CSP) -> bool:
 
 # ==================== SOFT CONSTRAINTS OPTIMIZATION ====================
 
+# Trọng số kết hợp hai ràng buộc mềm
+LOAD_BALANCE_WEIGHT = 0.4
+PRIORITY_WEIGHT = 0.6
+
 def calculate_workload(nhansu: NhanSu, csp: CSP) -> int:
-    """Tính tổng số giờ làm việc đã được gán cho nhân sự"""
-    total_hours = 0
-    for task_id, assignment in csp.assignment.items():
-        if assignment.nhansu.id == nhansu.id:
-            task = next(t for t in csp.cac_tacvu if t.id == task_id)
-            total_hours += task.duration
-    return total_hours
+    """Tổng số giờ làm việc đã được gán cho nhân sự (đọc từ bộ tích lũy)"""
+    return csp.emp_hours[csp.emp_index[nhansu.id]]
 
 def calculate_load_balance_score(csp: CSP) -> float:
     """
@@ -429,8 +1360,8 @@ def calculate_load_balance_score(csp: CSP) -> float:
     if not csp.assignment:
         return 0.0
     
-    workloads = [calculate_workload(nhansu, csp) for nhansu in csp.cac_nhansu]
-    avg_workload = sum(workloads) / len(workloads)
+    workloads = csp.emp_hours
+    avg_workload = csp.total_assigned_hours / len(workloads)
     
     # Tính độ lệch chuẩn
     variance = sum((w - avg_workload) ** 2 for w in workloads) / len(workloads)
@@ -451,26 +1382,84 @@ def calculate_priority_score(csp: CSP) -> float:
     if not csp.assignment:
         return 0.0
     
-    total_score = 0.0
-    project_duration = (csp.project_end_date - csp.project_start_date).total_seconds()
+    project_duration = csp.project_duration_hours
     
-    for task_id, assignment in csp.assignment.items():
-        task = next(t for t in csp.cac_tacvu if t.id == task_id)
-        
-        # Tính thời điểm bắt đầu chuẩn hóa (0 = bắt đầu dự án, 1 = kết thúc dự án)
-        time_elapsed = (assignment.start_time - csp.project_start_date).total_seconds()
-        normalized_time = time_elapsed / project_duration if project_duration > 0 else 0
-        
-        # Tác vụ ưu tiên cao thực hiện sớm → điểm cao
-        task_score = task.priority * (1.0 - normalized_time)
-        total_score += task_score
+    # Tổng (priority × thời gian đã trôi) = Σ priority × calendar_hours - start_offset × Σ priority
+    priority_elapsed = csp.priority_hours - csp.time_axis.start_offset * csp.assigned_priority
+    
+    # Tác vụ ưu tiên cao thực hiện sớm → điểm cao
+    total_score = csp.assigned_priority - (priority_elapsed / project_duration if project_duration > 0 else 0)
     
     # Chuẩn hóa điểm (chia cho tổng priority của tất cả tác vụ)
-    total_priority = sum(t.priority for t in csp.cac_tacvu)
-    normalized_score = total_score / total_priority if total_priority > 0 else 0
+    normalized_score = total_score / csp.total_priority if csp.total_priority > 0 else 0
     
     return normalized_score
 
+def soft_objective(csp: CSP) -> float:
+    """Hàm mục tiêu của chế độ tối ưu (lời giải đầy đủ): kết hợp Load Balance Score và Priority Score"""
+    return (LOAD_BALANCE_WEIGHT * calculate_load_balance_score(csp) +
+            PRIORITY_WEIGHT * calculate_priority_score(csp))
+
+def soft_objective_bound(csp: CSP) -> float:
+    """
+    Cận trên lạc quan của soft_objective cho mọi lời giải mở rộng phép gán hiện tại
+    
+    - Priority: mỗi tác vụ chưa gán được tính như bắt đầu tại mốc sớm nhất còn trong miền
+    - Load Balance: số giờ còn lại được "đổ nước" vào các nhân sự ít việc nhất, bỏ qua
+      ràng buộc kỹ năng → độ lệch chuẩn nhỏ nhất có thể đạt được
+    """
+    store = csp.domain_store
+    priority_elapsed = csp.priority_hours - csp.time_axis.start_offset * csp.assigned_priority
+    remaining_hours = 0
+    for i, tacvu in enumerate(csp.cac_tacvu):
+        if tacvu.id in csp.assignment:
+            continue
+        remaining_hours += csp.task_duration[i]
+        bits = store.bits.get(tacvu.id, 0)
+        if bits:
+            min_start = store.starts[tacvu.id][(bits & -bits).bit_length() - 1]
+            priority_elapsed += csp.task_priority[i] * csp.time_axis.elapsed_hours(min_start)
+    
+    # Cận của Priority Score (khi mọi tác vụ đã gán: assigned_priority = total_priority)
+    project_duration = csp.project_duration_hours
+    priority_bound = csp.total_priority - (priority_elapsed / project_duration if project_duration > 0 else 0)
+    priority_bound = priority_bound / csp.total_priority if csp.total_priority > 0 else 0
+    
+    # Cận của Load Balance Score: nâng k nhân sự ít việc nhất lên cùng mức level
+    workloads = sorted(csp.emp_hours)
+    if not workloads:
+        return PRIORITY_WEIGHT * priority_bound
+    level = workloads[0]
+    prefix = 0
+    for k, workload in enumerate(workloads):
+        prefix += workload
+        level = (prefix + remaining_hours) / (k + 1)
+        if k + 1 == len(workloads) or level <= workloads[k + 1]:
+            break
+    final = [max(w, level) for w in workloads]
+    avg_workload = sum(final) / len(final)
+    variance = sum((w - avg_workload) ** 2 for w in final) / len(final)
+    load_balance_bound = 1.0 / (1.0 + variance ** 0.5)
+    
+    return LOAD_BALANCE_WEIGHT * load_balance_bound + PRIORITY_WEIGHT * priority_bound
+
+def makespan_objective(csp: CSP) -> float:
+    """Hàm mục tiêu theo makespan (lời giải đầy đủ): âm của mốc kết thúc muộn nhất, càng cao càng tốt"""
+    return -max((a.end for a in csp.assignment.values()), default=0)
+
+def makespan_bound(csp: CSP) -> float:
+    """Cận trên lạc quan của makespan_objective: tác vụ chưa gán kết thúc sớm nhất có thể theo miền hiện tại"""
+    store = csp.domain_store
+    latest_end = max((a.end for a in csp.assignment.values()), default=0)
+    for i, tacvu in enumerate(csp.cac_tacvu):
+        if tacvu.id in csp.assignment:
+            continue
+        bits = store.bits.get(tacvu.id, 0)
+        if bits:
+            min_start = store.starts[tacvu.id][(bits & -bits).bit_length() - 1]
+            latest_end = max(latest_end, min_start + csp.task_duration[i])
+    return -latest_end
+
 def evaluate_soft_constraints(assignment: CSPAssignment, tacvu: TacVu, csp: CSP) -> float:
     """
     Đánh giá mức độ thỏa mãn ràng buộc mềm cho một phép gán
@@ -485,8 +1474,7 @@ def evaluate_soft_constraints(assignment: CSPAssignment, tacvu: TacVu, csp: CSP)
     new_workload = current_workload + tacvu.duration
     
     # Tính workload trung bình
-    total_assigned_hours = sum(calculate_workload(emp, csp) for emp in csp.cac_nhansu)
-    avg_workload = total_assigned_hours / len(csp.cac_nhansu) if csp.cac_nhansu else 0
+    avg_workload = csp.total_assigned_hours / len(csp.cac_nhansu) if csp.cac_nhansu else 0
     
     # 1. Load Balance Score: Ưu tiên nhân sự có workload thấp hơn
     # Nếu new_workload gần avg_workload → điểm cao
@@ -494,18 +1482,14 @@ def evaluate_soft_constraints(assignment: CSPAssignment, tacvu: TacVu, csp: CSP)
     load_balance_score = 1.0 / (1.0 + load_balance_diff)
     
     # 2. Priority Score: Ưu tiên tác vụ có độ ưu tiên cao thực hiện sớm
-    project_duration = (csp.project_end_date - csp.project_start_date).total_seconds()
-    time_elapsed = (assignment.start_time - csp.project_start_date).total_seconds()
+    project_duration = csp.project_duration_hours
+    time_elapsed = csp.time_axis.elapsed_hours(assignment.start)
     normalized_time = time_elapsed / project_duration if project_duration > 0 else 0
     
     # Tác vụ ưu tiên cao thực hiện sớm → điểm cao
-    max_priority = max((t.priority for t in csp.cac_tacvu), default=1)
-    priority_score = (tacvu.priority / max_priority) * (1.0 - normalized_time)
+    priority_score = (tacvu.priority / csp.max_priority) * (1.0 - normalized_time)
     
     # Kết hợp 2 điểm (trọng số có thể điều chỉnh)
-    LOAD_BALANCE_WEIGHT = 0.4
-    PRIORITY_WEIGHT = 0.6
-    
     total_score = (LOAD_BALANCE_WEIGHT * load_balance_score + 
                    PRIORITY_WEIGHT * priority_score)
     
@@ -519,7 +1503,7 @@ def count_conflicts(assignment: CSPAssignment, tacvu: TacVu, csp: CSP) -> int:
     Xung đột xảy ra khi assignment này làm giảm số lựa chọn hợp lệ của tác vụ khác.
     """
     conflicts = 0
-    task_end_time = assignment.start_time + timedelta(hours=tacvu.duration)
+    task_end = assignment.end
     
     # Duyệt qua tất cả các tác vụ chưa được gán
     unassigned_tasks = [t for t in csp.cac_tacvu if t.id not in csp.assignment and t.id != tacvu.id]
@@ -528,22 +1512,19 @@ def count_conflicts(assignment: CSPAssignment, tacvu: TacVu, csp: CSP) -> int:
         # Kiểm tra xem việc gán này có ảnh hưởng đến tác vụ khác không
         if other_task.required_skill in assignment.nhansu.skills:
             # Tìm thời gian bắt đầu sớm nhất cho other_task
-            earliest_start = csp.project_start_date
+            earliest_start = csp.project_start
             for dep_task_id in other_task.dependencies:
                 if dep_task_id in csp.assignment:
-                    dep_assignment = csp.assignment[dep_task_id]
-                    dep_task = next(t for t in csp.cac_tacvu if t.id == dep_task_id)
-                    dep_end_time = dep_assignment.start_time + timedelta(hours=dep_task.duration)
-                    earliest_start = max(earliest_start, dep_end_time)
+                    earliest_start = max(earliest_start, csp.assignment[dep_task_id].end)
                 elif dep_task_id == tacvu.id:
                     # Nếu other_task phụ thuộc vào tacvu hiện tại
-                    earliest_start = max(earliest_start, task_end_time)
+                    earliest_start = max(earliest_start, task_end)
             
-            other_end_time = earliest_start + timedelta(hours=other_task.duration)
+            other_end = earliest_start + other_task.duration
             
             # Kiểm tra xung đột thời gian với nhân sự này
-            if (assignment.start_time < other_end_time and 
-                task_end_time > earliest_start):
+            if (assignment.start < other_end and 
+                task_end > earliest_start):
                 conflicts += 1
     
     return conflicts
@@ -558,6 +1539,15 @@ def order_domain_values_with_lcv(tacvu: TacVu, domain_values: List[CSPAssignment
     if not domain_values:
         return domain_values
     
+    # Có seed → xáo trộn trước để các giá trị hòa điểm được chọn ngẫu nhiên (sort ổn định)
+    if csp.rng is not None:
+        domain_values = list(domain_values)
+        csp.rng.shuffle(domain_values)
+    
+    # Trọng số kết hợp (theo cấu hình, mặc định LCV 0.7 - mềm 0.3)
+    LCV_WEIGHT = csp.config.lcv_weight
+    SOFT_WEIGHT = csp.config.soft_weight
+    
     # Tính điểm cho mỗi giá trị
     value_scores = []
     
@@ -573,10 +1563,6 @@ def order_domain_values_with_lcv(tacvu: TacVu, domain_values: List[CSPAssignment
         # Chuyển conflicts thành điểm âm để kết hợp
         conflict_score = -conflicts
         
-        # Trọng số kết hợp (có thể điều chỉnh)
-        LCV_WEIGHT = 0.7
-        SOFT_WEIGHT = 0.3
-        
         total_score = LCV_WEIGHT * conflict_score + SOFT_WEIGHT * soft_score
         
         value_scores.append((assignment, total_score))
@@ -587,7 +1573,7 @@ def order_domain_values_with_lcv(tacvu: TacVu, domain_values: List[CSPAssignment
     # Trả về danh sách assignments đã sắp xếp
     return [assignment for assignment, _ in value_scores]
 
-def select_variable_with_mrv(csp: CSP, current_domains: Dict[str, List[CSPAssignment]]) -> Optional[TacVu]:
+def select_variable_with_mrv(csp: CSP) -> Optional[TacVu]:
     """
     MRV (Minimum Remaining Values) Heuristic + Priority Tie-Breaking
     Chọn tác vụ có ít lựa chọn hợp lệ nhất (fail-fast strategy)
@@ -608,10 +1594,10 @@ def select_variable_with_mrv(csp: CSP, current_domains: Dict[str, List[CSPAssign
         return None
     
     # Domain sizes để tránh tính lại nhiều lần
-    domain_sizes = {tacvu.id: len(current_domains.get(tacvu.id, [])) 
+    domain_sizes = {tacvu.id: csp.domain_store.size(tacvu.id) 
                     for tacvu in ready_tasks}
     
-    # Tìm tác vụ có ít lựa chọn hợp lệ nhất dựa trên current_domains
+    # Tìm tác vụ có ít lựa chọn hợp lệ nhất dựa trên miền hiện tại
     min_choices = float('inf')
     candidates = []
     
@@ -624,9 +1610,16 @@ def select_variable_with_mrv(csp: CSP, current_domains: Dict[str, List[CSPAssign
         elif num_choices == min_choices:
             candidates.append(tacvu)
     
-    # Nếu có nhiều tác vụ cùng số lựa chọn, chọn tác vụ có priority cao nhất
+    # Nếu có nhiều tác vụ cùng số lựa chọn, phá hòa theo cấu hình
+    # (mặc định: chọn tác vụ có priority cao nhất)
     if len(candidates) > 1:
-        candidates.sort(key=lambda t: t.priority, reverse=True)
+        if csp.rng is not None:
+            csp.rng.shuffle(candidates)
+        variable_order = csp.config.variable_order
+        if variable_order == "priority":
+            candidates.sort(key=lambda t: t.priority, reverse=True)
+        elif variable_order == "slack":
+            candidates.sort(key=lambda t: (csp.task_slack[csp.task_index[t.id]], -t.priority))
     
     return candidates[0] if candidates else None
 
@@ -640,133 +1633,577 @@ def forward_checking(csp: CSP, assigned_task_id: str) -> bool:
     Returns:
         True nếu không phát hiện ngõ cụt, False nếu có domain trở thành rỗng
     """
-    assigned_task = next(t for t in csp.cac_tacvu if t.id == assigned_task_id)
+    assigned_task = csp.get_task(assigned_task_id)
     assigned_assignment = csp.assignment[assigned_task_id]
     
     # Lấy tất cả hàng xóm của tác vụ vừa gán
     neighbors = get_neighbors(assigned_task, csp)
     
+    store = csp.domain_store
+    left_justified = csp.config.domain_mode == "left_justified"
+    
     # Duyệt qua các hàng xóm chưa được gán
     for neighbor_task in neighbors:
         if neighbor_task.id not in csp.assignment:
-            original_domain = csp.domains.get(neighbor_task.id, [])
-            new_domain = []
-            
-            # Kiểm tra từng giá trị trong domain của hàng xóm
-            for neighbor_value in original_domain:
-                # Kiểm tra xung đột giữa assignment vừa gán và giá trị này
-                has_conflict = check_conflict_between_assignments(
-                    assigned_task, assigned_assignment,
-                    neighbor_task, neighbor_value,
-                    csp
-                )
-                
-                if not has_conflict:
-                    # Không xung đột → giữ lại
-                    new_domain.append(neighbor_value)
-                else:
-                    # Có xung đột → cắt bỏ
-                    csp.fc_pruned_count += 1
-            
-            # CẬP NHẬT domain mới (đã cắt tỉa)
-            csp.domains[neighbor_task.id] = new_domain
+            # Miền dồn trái: phép gán mới tạo ra mốc dồn trái mới cho hàng xóm → bổ sung trước khi cắt
+            # (ghi vào trail nên quay lui cũng gỡ bỏ; miền bị cắt rỗng vẫn là mục trail cuối cùng)
+            if left_justified:
+                store.add_mask(neighbor_task.id,
+                               rederive_left_justified(csp, neighbor_task, assigned_task, assigned_assignment))
+            # Phép gán được xem như miền một giá trị của assigned_task → dùng chung bộ lan truyền với AC-3
+            # Cắt mọi giá trị xung đột của hàng xóm bằng một phép AND (ghi vào trail để quay lui khôi phục)
+            conflict = propagate_arc(csp, neighbor_task, assigned_task,
+                                     assigned_assignment.start, assigned_assignment.start,
+                                     assigned_assignment.nhansu.id)
+            csp.fc_pruned_count += store.remove_mask(neighbor_task.id, conflict)
             
             # PHÁT HIỆN NGÕ CỤT SỚM (FAIL-FAST)
-            if len(csp.domains[neighbor_task.id]) == 0:
+            if store.size(neighbor_task.id) == 0:
                 return False  # Báo hiệu ngõ cụt!
     
+    # Sức chứa theo ngày của nhân sự vừa nhận việc: cắt giá trị của mọi tác vụ chưa gán mà nhân sự đó
+    # làm được (kể cả khác kỹ năng, không nằm trong neighbor_map) trong ngày vừa bị lấp thêm.
+    # Lý do là mọi tác vụ đã gán trong ngày đó nên mục trail được đánh dấu global_reason
+    emp_idx = csp.emp_index[assigned_assignment.nhansu.id]
+    day = assigned_assignment.start // HOURS_PER_DAY
+    for skill in csp.employee_skills[emp_idx]:
+        for i in csp.skill_tasks[skill]:
+            task_id = csp.cac_tacvu[i].id
+            if task_id not in csp.assignment:
+                removed = store.remove_mask(task_id, propagate_daily_capacity(csp, task_id, emp_idx, day),
+                                            global_reason=True)
+                if removed:
+                    csp.capacity_pruned_count += removed
+                    if not store.bits[task_id]:
+                        return False
+    
+    # Lan truyền tài nguyên rời rạc trên lịch của nhân sự vừa nhận việc và của nhân sự duy nhất
+    # làm được các hàng xóm (cửa sổ của chúng vừa bị thu hẹp)
+    if csp.config.disjunctive:
+        emp_indices = {emp_idx}
+        emp_indices.update(csp.task_pinned_employee[csp.task_index[neighbor_task.id]] for neighbor_task in neighbors
+                           if neighbor_task.id not in csp.assignment)
+        emp_indices.discard(None)
+        if not propagate_disjunctive(csp, sorted(emp_indices)):
+            return False
+    
+    # Kiểm tra năng lực của các nhóm năng lực mà nhân sự vừa nhận việc đáp ứng và của các hàng xóm
+    if csp.config.energy_reasoning:
+        skills = {csp.skill_pool[skill] for skill in csp.employee_skills[emp_idx]}
+        skills.update(csp.skill_pool[neighbor_task.required_skill] for neighbor_task in neighbors
+                      if neighbor_task.id not in csp.assignment)
+        return propagate_skill_energy(csp, sorted(skills))
+    
     # Cắt tỉa tất cả hàng xóm mà không ai bị rỗng
     return True  # Thành công, có thể tiếp tục
 
 # ==================== BACKTRACKING ====================
 
-def recursive_backtracking(csp: CSP, current_domains: Dict[str, List[CSPAssignment]]) -> bool:
+def luby(i: int) -> int:
+    """Phần tử thứ i (tính từ 1) của dãy Luby: 1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8, ..."""
+    while True:
+        k = 1
+        while (1 << k) - 1 < i:
+            k += 1
+        if i == (1 << k) - 1:
+            return 1 << (k - 1)
+        i -= (1 << (k - 1)) - 1
+
+class ChoicePoint:
+    """Một điểm lựa chọn trên ngăn xếp tìm kiếm (tương ứng một tầng đệ quy)"""
+    def __init__(self, tacvu: TacVu, values: List[CSPAssignment]):
+        self.tacvu = tacvu
+        self.values = values        # các giá trị đã sắp xếp theo LCV
+        self.next_index = 0         # vị trí giá trị sẽ thử tiếp theo
+        self.trail_mark: Optional[int] = None  # khác None khi đang có giá trị được gán tại điểm này
+        self.conflicts: Set[str] = set()       # tập xung đột (CBJ): các tác vụ đã gán gây ra thất bại tại điểm này
+        # Phá đối xứng: (lớp nhân sự, lịch bận, mốc bắt đầu) đã thử -> chỉ số nhân sự đại diện đã được gán
+        self.tried: Dict[Tuple[int, int, int], int] = {}
+
+class SearchEngine:
     """
-    Giải bằng thuật toán quay lui đệ quy (backtracking) với MRV + LCV + Forward Checking
-    
-    Args:
-        csp: Đối tượng CSP chứa assignment và thông tin bài toán
-        current_domains: Miền giá trị hiện tại của tầng đệ quy này (đã được cắt tỉa từ các tầng trước)
+    Tìm kiếm quay lui dạng LẶP với ngăn xếp điểm lựa chọn tường minh (MRV + LCV + Forward Checking)
+    
+    Duyệt đúng thứ tự như bản đệ quy nhưng không phụ thuộc giới hạn đệ quy của Python.
+    Khi một điểm lựa chọn hết giá trị, tìm kiếm nhảy lùi thẳng về tác vụ gây xung đột sâu nhất
+    (conflict-directed backjumping) thay vì chỉ quay lui một tầng, và ghi lại tập xung đột
+    thành nogood để không đi lại cùng ngõ cụt. Các cây con bị nhảy qua chắc chắn không chứa
+    lời giải nên lời giải tìm được trùng với bản quay lui theo thứ tự thời gian.
+    Nếu cấu hình có restart_schedule, mỗi lần chạy chỉ được một ngân sách backtrack;
+    hết ngân sách thì khởi động lại từ gốc với phá hòa ngẫu nhiên (nogood được giữ lại).
+    
+    Chế độ tối ưu (optimize=True, nhánh cận - branch-and-bound): gặp lời giải thì ghi nhận,
+    gọi solution_callback(csp, điểm) nếu tốt hơn lời giải trước rồi tìm tiếp; nhánh nào có
+    cận trên objective_bound không vượt điểm tốt nhất thì bị cắt (mặc định soft_objective /
+    soft_objective_bound; nếu csp.best_score đã có sẵn thì chỉ nhận lời giải vượt điểm đó).
+    Khi duyệt hết cây (proven_optimal = True), hết time_limit giây hoặc bị hủy,
+    lời giải tốt nhất được gán lại vào csp.
+    
+    Có thể tạm dừng giữa các nút (run(max_nodes) rồi gọi run() lần nữa để tiếp tục),
+    báo tiến độ qua progress_callback(engine) sau mỗi progress_interval nút, và hủy bằng cancel().
     """
-    # Trường hợp cơ sở: tất cả tác vụ đã được gán
-    if len(csp.assignment) == len(csp.cac_tacvu):
-        csp.solution_found = True
+    READY = "ready"
+    RUNNING = "running"
+    SOLVED = "solved"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    # Chỉ học nogood có tối đa chừng này phép gán (nogood dài hiếm khi lặp lại mà tốn bộ nhớ)
+    MAX_NOGOOD_SIZE = 4
+    
+    def __init__(self, csp: CSP, progress_callback: Optional[Callable[["SearchEngine"], None]] = None,
+                 progress_interval: int = 200, optimize: bool = False,
+                 solution_callback: Optional[Callable[[CSP, float], None]] = None,
+                 time_limit: Optional[float] = None,
+                 objective: Callable[[CSP], float] = soft_objective,
+                 objective_bound: Callable[[CSP], float] = soft_objective_bound):
+        self.csp = csp
+        self.stack: List[ChoicePoint] = []
+        self.status = SearchEngine.READY
+        self.nodes = 0  # số nút (bước thử giá trị) đã xử lý
+        self.progress_callback = progress_callback
+        self.progress_interval = progress_interval
+        self._cancel_requested = False
+        # pruned_by[task_id]: lý do của từng lần Forward Checking cắt miền task_id - tác vụ vừa gán, hoặc
+        # mọi tác vụ trên ngăn xếp với lần cắt của bộ lan truyền toàn cục
+        # (ngăn xếp, mỗi mục ứng với một mục trail; hoàn tác cùng trail)
+        self.pruned_by: Dict[str, List[Tuple[str, ...]]] = {}
+        # Ngân sách backtrack của lần chạy hiện tại (None = không khởi động lại)
+        self.restart_limit: Optional[int] = self._restart_limit(1) if csp.config.restart_schedule else None
+        self.restart_mark = csp.backtrack_count
+        # Chế độ tối ưu
+        self.optimize = optimize
+        self.solution_callback = solution_callback
+        self.time_limit = time_limit
+        self.objective = objective
+        self.objective_bound = objective_bound
+        self.deadline: Optional[float] = None
+        self.best_solution: Optional[List[Tuple[str, CSPAssignment]]] = None
+        self.proven_optimal = False
+    
+    @property
+    def finished(self) -> bool:
+        return self.status in (SearchEngine.SOLVED, SearchEngine.FAILED, SearchEngine.CANCELLED)
+    
+    def cancel(self):
+        """Yêu cầu dừng tìm kiếm (có hiệu lực trước nút kế tiếp)"""
+        self._cancel_requested = True
+    
+    def _open_node(self) -> bool:
+        """
+        Mở một nút mới - tương ứng phần đầu của một lời gọi đệ quy
+        Returns: False nếu nút thất bại ngay (không còn tác vụ sẵn sàng hoặc miền rỗng)
+        """
+        csp = self.csp
+        
+        # Trường hợp cơ sở: tất cả tác vụ đã được gán
+        if len(csp.assignment) == len(csp.cac_tacvu):
+            if self.optimize and self.stack:
+                # Chế độ tối ưu: ghi nhận rồi tìm tiếp lời giải tốt hơn
+                self._record_solution()
+                return False
+            csp.solution_found = True
+            self.status = SearchEngine.SOLVED
+            return True
+        
+        # Chọn biến chưa gán bằng MRV Heuristic
+        tacvu = select_variable_with_mrv(csp)
+        if tacvu is None:
+            # không còn task ready (phụ thuộc vòng hoặc thiếu tác vụ) -> thất bại ở nhánh này;
+            # lỗi do cấu trúc dữ liệu, không do phép gán nào nên không thêm tác vụ vào tập xung đột
+            return False
+        
+        # Lấy các giá trị còn lại trong miền (đã được cắt tỉa)
+        domain_values = csp.domain_store.live_values(tacvu.id)
+        if not domain_values:
+            if self.stack:
+                self.stack[-1].conflicts.update(*self.pruned_by.get(tacvu.id, []))
+                self.stack[-1].conflicts.discard(self.stack[-1].tacvu.id)
+            return False
+        
+        # Sắp xếp theo LCV + Soft Constraints
+        self.stack.append(ChoicePoint(tacvu, order_domain_values_with_lcv(tacvu, domain_values, csp)))
         return True
     
-    # Chọn biến chưa gán bằng MRV Heuristic (luôn dùng)
-    tacvu = select_variable_with_mrv(csp, current_domains)
-    
-    if tacvu is None:
-        # không còn task ready (có thể deadlock) -> thất bại ở nhánh này
-        return False
-    
-    # Lấy các giá trị miền từ current_domains (đã được cắt tỉa)
-    domain_values = current_domains.get(tacvu.id, [])
-    if not domain_values:
-        return False
-    
-    # Sắp xếp theo LCV + Soft Constraints (luôn dùng)
-    domain_values = order_domain_values_with_lcv(tacvu, domain_values, csp)
-    
-    # Thử từng giá trị
-    for assignment in list(domain_values):
-        # 1. Thực hiện phép gán
-        csp.assignment[tacvu.id] = assignment
+    def _step(self):
+        """Một bước tìm kiếm: hoàn tác giá trị đang gán ở đỉnh ngăn xếp (nếu có) rồi thử giá trị kế tiếp"""
+        csp = self.csp
+        point = self.stack[-1]
         
-        # 2. TẠO BẢN SAO DOMAIN ĐỂ CHUẨN BỊ "CẮT TỈA" (Deep Copy)
-        new_domains = {}
-        for task_id in current_domains.keys():
-            new_domains[task_id] = current_domains[task_id].copy()
+        # QUAY LUI - Khôi phục đúng các giá trị FC đã cắt, xóa assignment
+        if point.trail_mark is not None:
+            self._retract(point)
+            csp.backtrack_count += 1
         
-        # Đánh dấu task hiện tại đã gán (domain rỗng)
-        new_domains[tacvu.id] = []
+        store = csp.domain_store
+        while point.next_index < len(point.values):
+            assignment = point.values[point.next_index]
+            point.next_index += 1
+            
+            # Bỏ qua giá trị trùng lịch nhân sự đã bận (kể cả do tác vụ khác kỹ năng,
+            # vốn không nằm trong neighbor_map nên Forward Checking không cắt tới)
+            emp_idx = csp.emp_index[assignment.nhansu.id]
+            if not csp.occupancy.is_free(emp_idx, assignment.start, assignment.end):
+                point.conflicts.update(self._occupying_tasks(assignment))
+                continue
+            
+            # Bỏ qua giá trị vượt sức chứa ngày mà Forward Checking chưa cắt (giá trị được miền dồn trái
+            # bổ sung lại sau đó); xung đột là các tác vụ đã gán cho nhân sự trong cùng ngày
+            if not csp.fits_capacity(emp_idx, assignment.start, assignment.end - assignment.start):
+                point.conflicts.update(self._day_tasks(emp_idx, assignment.start // HOURS_PER_DAY))
+                continue
+            
+            # Phá đối xứng: nhân sự cùng lớp, cùng lịch bận với nhân sự đã thử tại cùng mốc cho
+            # cây con đối xứng với cây con đã duyệt. Sự tương đương phụ thuộc các tác vụ đang chiếm
+            # lịch của hai nhân sự nên chúng được thêm vào tập xung đột
+            symmetry_key = None
+            if csp.config.symmetry_breaking and csp.emp_class[emp_idx] is not None:
+                symmetry_key = (csp.emp_class[emp_idx], csp.occupancy.busy[emp_idx], assignment.start)
+                representative = point.tried.get(symmetry_key)
+                if representative is not None:
+                    if csp.occupancy.busy[emp_idx]:
+                        point.conflicts.update(self._employee_tasks(emp_idx, representative))
+                    csp.symmetry_pruned_count += 1
+                    continue
+            
+            # Bỏ qua giá trị hoàn tất một nogood đã học
+            nogood = self._violated_nogood(point.tacvu.id, assignment)
+            if nogood is not None:
+                point.conflicts.update(task_id for task_id, _, _ in nogood if task_id != point.tacvu.id)
+                continue
+            
+            # Gán, ghi mốc trail rồi Forward Checking
+            csp.assign(point.tacvu.id, assignment)
+            if symmetry_key is not None:
+                point.tried[symmetry_key] = emp_idx
+            point.trail_mark = store.mark()
+            consistent = forward_checking(csp, point.tacvu.id)
+            self._record_pruners(point)
+            
+            # Không phát hiện ngõ cụt → đi xuống tầng tiếp theo
+            # (nếu tầng dưới thất bại ngay, bước sau sẽ quay lui giá trị này)
+            if consistent:
+                if (self.optimize and csp.best_score is not None
+                        and self.objective_bound(csp) <= csp.best_score + 1e-9):
+                    # Cắt nhánh: mọi lời giải bên dưới đều không tốt hơn lời giải tốt nhất
+                    self._conflict_with_all_assigned()
+                else:
+                    self._open_node()
+            else:
+                # Miền bị rỗng là miền vừa cắt sau cùng: mọi tác vụ đã cắt nó cùng chịu trách nhiệm
+                wiped_task_id = store.trail[-1][0]
+                point.conflicts.update(*self.pruned_by[wiped_task_id])
+                point.conflicts.discard(point.tacvu.id)
+            return
         
-        # 3. Cập nhật csp.domains để is_consistent() và forward_checking() sử dụng
-        csp.domains = new_domains
+        # Đã thử hết các giá trị → nhảy lùi về tác vụ gây xung đột sâu nhất
+        self.stack.pop()
+        self._backjump(point)
+    
+    def _record_pruners(self, point: ChoicePoint):
+        """Ghi lý do cho các mục trail mà Forward Checking vừa thêm (xem pruned_by)"""
+        store = self.csp.domain_store
+        reason = (point.tacvu.id,)
+        global_reason = None
+        global_entries = store.global_entries
+        g = bisect_left(global_entries, point.trail_mark)
+        for position in range(point.trail_mark, len(store.trail)):
+            task_id = store.trail[position][0]
+            if g < len(global_entries) and global_entries[g] == position:
+                if global_reason is None:
+                    global_reason = tuple(p.tacvu.id for p in self.stack)
+                self.pruned_by.setdefault(task_id, []).append(global_reason)
+                g += 1
+            else:
+                self.pruned_by.setdefault(task_id, []).append(reason)
+    
+    def _retract(self, point: ChoicePoint):
+        """Hoàn tác phép gán tại một điểm lựa chọn: khôi phục miền đã cắt và bỏ gán"""
+        csp = self.csp
+        store = csp.domain_store
+        for task_id, _ in store.trail[point.trail_mark:]:
+            self.pruned_by[task_id].pop()
+        store.undo(point.trail_mark)
+        csp.unassign(point.tacvu.id)
+        point.trail_mark = None
+    
+    def _occupying_tasks(self, assignment: CSPAssignment) -> List[str]:
+        """Các tác vụ đã gán đang chiếm lịch của nhân sự trong khoảng của assignment"""
+        emp_id = assignment.nhansu.id
+        return [task_id for task_id, other in self.csp.assignment.items()
+                if other.nhansu.id == emp_id and other.start < assignment.end and assignment.start < other.end]
+    
+    def _day_tasks(self, emp_idx: int, day: int) -> List[str]:
+        """Các tác vụ đã gán cho nhân sự (theo chỉ số) bắt đầu trong ngày day"""
+        emp_id = self.csp.cac_nhansu[emp_idx].id
+        return [task_id for task_id, other in self.csp.assignment.items()
+                if other.nhansu.id == emp_id and other.start // HOURS_PER_DAY == day]
+    
+    def _employee_tasks(self, *emp_indices: int) -> List[str]:
+        """Các tác vụ đã gán cho một trong các nhân sự (theo chỉ số)"""
+        emp_ids = {self.csp.cac_nhansu[i].id for i in emp_indices}
+        return [task_id for task_id, other in self.csp.assignment.items() if other.nhansu.id in emp_ids]
+    
+    def _violated_nogood(self, task_id: str, assignment: CSPAssignment) -> Optional[Tuple[Tuple[str, str, int], ...]]:
+        """Nogood đã học sẽ bị thỏa trọn vẹn nếu gán task_id = assignment (None nếu không có)"""
+        csp = self.csp
+        key = (task_id, assignment.nhansu.id, assignment.start)
+        for nogood in csp.nogoods.get(key, ()):
+            for other_id, emp_id, start in nogood:
+                if other_id == task_id:
+                    continue
+                other = csp.assignment.get(other_id)
+                if other is None or other.nhansu.id != emp_id or other.start != start:
+                    break
+            else:
+                return nogood
+        return None
+    
+    def _backjump(self, point: ChoicePoint):
+        """
+        Điểm lựa chọn đã hết giá trị: học nogood từ tập xung đột rồi bỏ qua (hoàn tác) mọi tầng
+        không thuộc tập xung đột, dừng ở tác vụ xung đột sâu nhất và chuyển tập xung đột lên đó.
+        Tập xung đột rỗng → không có lời giải, ngăn xếp được làm rỗng.
+        """
+        csp = self.csp
+        conflicts = point.conflicts.union(*self.pruned_by.get(point.tacvu.id, []))
         
-        # 4. THỰC HIỆN FORWARD CHECKING (luôn dùng)
-        # Hàm này sẽ cắt tỉa new_domains và phát hiện ngõ cụt sớm
-        forward_ok = forward_checking(csp, tacvu.id)
+        # Học nogood: các phép gán trong tập xung đột không thể cùng nằm trong một lời giải
+        if 0 < len(conflicts) <= SearchEngine.MAX_NOGOOD_SIZE:
+            nogood = tuple(sorted((task_id, csp.assignment[task_id].nhansu.id, csp.assignment[task_id].start)
+                                  for task_id in conflicts))
+            for member in nogood:
+                csp.nogoods.setdefault(member, []).append(nogood)
+            csp.nogood_count += 1
         
-        # 5. Nếu Forward Check không phát hiện ngõ cụt
-        if forward_ok:
-            # Gọi đệ quy với new_domains đã bị cắt tỉa
-            result = recursive_backtracking(csp, csp.domains)
-            if result:
-                return True
+        skipped = 0
+        while self.stack and self.stack[-1].tacvu.id not in conflicts:
+            self._retract(self.stack.pop())
+            skipped += 1
+        if self.stack:
+            if skipped:
+                csp.backjump_count += 1
+            target = self.stack[-1]
+            conflicts.discard(target.tacvu.id)
+            target.conflicts |= conflicts
+    
+    def _conflict_with_all_assigned(self):
+        """Thất bại do cận/lời giải phụ thuộc toàn bộ phép gán: mọi tầng đều vào tập xung đột"""
+        point = self.stack[-1]
+        point.conflicts.update(p.tacvu.id for p in self.stack)
+        point.conflicts.discard(point.tacvu.id)
+    
+    def _record_solution(self):
+        """Chế độ tối ưu: lưu lời giải hiện tại nếu tốt hơn và báo qua solution_callback"""
+        csp = self.csp
+        score = self.objective(csp)
+        if csp.best_score is None or score > csp.best_score:
+            csp.best_score = score
+            self.best_solution = list(csp.assignment.items())
+            if self.solution_callback:
+                self.solution_callback(csp, score)
+        self._conflict_with_all_assigned()
+    
+    def _restore_best(self):
+        """Chế độ tối ưu kết thúc: hoàn tác ngăn xếp và gán lại lời giải tốt nhất"""
+        csp = self.csp
+        while self.stack:
+            point = self.stack.pop()
+            if point.trail_mark is not None:
+                self._retract(point)
+        if self.best_solution is not None:
+            for task_id, assignment in self.best_solution:
+                if task_id not in csp.assignment:
+                    csp.assign(task_id, assignment)
+            csp.solution_found = True
+            self.status = SearchEngine.SOLVED
+    
+    def _restart_limit(self, run: int) -> int:
+        """Ngân sách backtrack của lần chạy thứ run (tính từ 1) theo lịch khởi động lại"""
+        config = self.csp.config
+        if config.restart_schedule == "luby":
+            return config.restart_base * luby(run)
+        return int(config.restart_base * config.restart_factor ** (run - 1))
+    
+    def _restart(self):
+        """Hết ngân sách: hoàn tác toàn bộ ngăn xếp rồi bắt đầu lại từ gốc với phá hòa ngẫu nhiên"""
+        csp = self.csp
+        while self.stack:
+            point = self.stack.pop()
+            if point.trail_mark is not None:
+                self._retract(point)
+        csp.restart_count += 1
+        if csp.rng is None:
+            # Lần chạy đầu giữ thứ tự tất định; từ lần khởi động lại đầu tiên mới xáo trộn (seed mặc định 0)
+            csp.rng = random.Random(0)
+        self.restart_limit = self._restart_limit(csp.restart_count + 1)
+        self.restart_mark = csp.backtrack_count
+        if not self._open_node():
+            self.status = SearchEngine.FAILED
+    
+    def run(self, max_nodes: Optional[int] = None) -> Optional[bool]:
+        """
+        Chạy tìm kiếm tới khi kết thúc hoặc đã xử lý max_nodes nút (tạm dừng)
         
-        # 6. QUAY LUI (Backtrack) - Xóa assignment hiện tại
-        del csp.assignment[tacvu.id]
-        csp.backtrack_count += 1
-        # Vứt bỏ new_domains - vòng lặp tiếp theo dùng current_domains gốc
-    
-    # Nếu đã thử hết các giá trị mà không tìm được lời giải
-    return False
-
-# ==================== MAIN SOLVER ====================
+        Returns:
+            True nếu tìm thấy lời giải, False nếu thất bại hoặc bị hủy,
+            None nếu đang tạm dừng (gọi run() lần nữa để tiếp tục)
+        """
+        if self.status == SearchEngine.READY:
+            self.status = SearchEngine.RUNNING
+            if self.time_limit is not None:
+                self.deadline = time.perf_counter() + self.time_limit
+            if not self._open_node():
+                self.status = SearchEngine.FAILED
+        
+        steps = 0
+        while self.status == SearchEngine.RUNNING:
+            if self._cancel_requested or (self.deadline is not None and time.perf_counter() >= self.deadline):
+                self.status = SearchEngine.CANCELLED
+                break
+            if not self.stack:
+                self.status = SearchEngine.FAILED
+                self.proven_optimal = self.optimize
+                break
+            if max_nodes is not None and steps >= max_nodes:
+                return None
+            
+            self._step()
+            steps += 1
+            self.nodes += 1
+            if (self.restart_limit is not None and self.status == SearchEngine.RUNNING and self.stack
+                    and self.csp.backtrack_count - self.restart_mark >= self.restart_limit):
+                self._restart()
+            if self.progress_callback and self.nodes % self.progress_interval == 0:
+                self.progress_callback(self)
+        
+        if self.optimize:
+            self._restore_best()
+        return self.status == SearchEngine.SOLVED
 
-def solve_csp(dataset_folder: str, project_start_date: datetime, project_end_date: datetime) -> CSP:
+def recursive_backtracking(csp: CSP) -> bool:
     """
-    Hàm tổng hợp để giải bài toán CSP
-    Sử dụng: AC-3 Preprocessing + Backtracking + MRV + LCV + Forward Checking + Soft Constraints
+    Giải bằng thuật toán quay lui (backtracking) với MRV + LCV + Forward Checking
+    Giữ tên cũ để tương thích; bên trong chạy SearchEngine dạng lặp (không đệ quy)
     
     Args:
-        dataset_folder: Đường dẫn tới thư mục dữ liệu
-        project_start_date: Ngày bắt đầu dự án
-        project_end_date: Ngày kết thúc dự án
+        csp: Đối tượng CSP chứa assignment và domain_store (miền đã được cắt tỉa bởi AC-3)
+    """
+    return SearchEngine(csp).run()
+
+# ==================== PHÂN RÃ THÀNH PHẦN ĐỘC LẬP ====================
+
+def find_components(csp: CSP) -> List[List[str]]:
     """
+    Tách các tác vụ thành các thành phần liên thông của đồ thị tương tác (union-find)
     
-    # Nạp dữ liệu
-    cac_tacvu, cac_nhansu = load_data(dataset_folder)
+    Hai tác vụ tương tác nếu có quan hệ phụ thuộc hoặc có chung ít nhất một nhân sự đủ kỹ năng
+    (rộng hơn neighbor_map, vốn chỉ nối các tác vụ cùng kỹ năng). Các thành phần khác nhau không
+    phụ thuộc nhau và không tranh chấp nhân sự, nên giải riêng từng thành phần rồi gộp lại
+    vẫn được một lời giải hợp lệ của toàn bài toán.
     
-    # Tạo đối tượng CSP
-    csp = CSP(cac_tacvu, cac_nhansu, project_start_date, project_end_date)
+    Returns:
+        Danh sách thành phần (task_id theo thứ tự dữ liệu), thành phần lớn nhất đứng đầu
+    """
+    parent = list(range(len(csp.cac_tacvu)))
+    
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    
+    def union(i: int, j: int):
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+    
+    # 1. Quan hệ phụ thuộc
+    for i, tacvu in enumerate(csp.cac_tacvu):
+        for dep_id in tacvu.dependencies:
+            if dep_id in csp.task_index:
+                union(i, csp.task_index[dep_id])
+    
+    # 2. Chung nhân sự: mỗi nhân sự nối mọi nhóm kỹ năng mà họ làm được
+    # (tác vụ không yêu cầu kỹ năng thuộc nhóm "" - ai cũng làm được)
+    skill_groups: Dict[str, List[int]] = {}
+    for i, skill in enumerate(csp.task_skill):
+        skill_groups.setdefault(skill, []).append(i)
+    for nhansu in csp.cac_nhansu:
+        groups = [skill_groups[skill] for skill in set(nhansu.skills) | {""} if skill in skill_groups]
+        for group in groups:
+            for i in group:
+                union(groups[0][0], i)
+    
+    components: Dict[int, List[str]] = {}
+    for i, tacvu in enumerate(csp.cac_tacvu):
+        components.setdefault(find(i), []).append(tacvu.id)
+    return sorted(components.values(), key=lambda ids: (-len(ids), csp.task_index[ids[0]]))
+
+def component_csp(csp: CSP, task_ids: List[str]) -> CSP:
+    """CSP con chỉ gồm các tác vụ của một thành phần và các nhân sự làm được ít nhất một tác vụ trong đó"""
+    cac_tacvu = [csp.get_task(task_id) for task_id in task_ids]
+    skills = {tacvu.required_skill for tacvu in cac_tacvu}
+    cac_nhansu = [nhansu for nhansu in csp.cac_nhansu
+                  if "" in skills or any(skill in nhansu.skills for skill in skills)]
+    return CSP(cac_tacvu, cac_nhansu, csp.project_start_date, csp.project_end_date, csp.config)
+
+def merge_components(csp: CSP, parts: List[CSP]):
+    """
+    Gộp lời giải, miền và thống kê của các CSP con vào csp
     
+    Phép gán chỉ được gộp khi mọi thành phần đều có lời giải (giống tìm kiếm không phân rã,
+    thất bại thì assignment rỗng); phép gán được dựng lại trên NhanSu của csp nên CSP con
+    có thể đến từ tiến trình khác.
+    """
+    compute_time_windows(csp)
+    csp.solution_found = (all(part.solution_found for part in parts)
+                          and sum(len(part.cac_tacvu) for part in parts) == len(csp.cac_tacvu))
+    csp.domains = {}
+    for part in parts:
+        csp.domains.update(part.domains)
+    csp.domain_store = DomainStore(csp.domains)
+    for part in parts:
+        if part.domain_store is not None:
+            csp.domain_store.bits.update(part.domain_store.bits)
+        if csp.solution_found:
+            for task_id, assignment in part.assignment.items():
+                nhansu = csp.cac_nhansu[csp.emp_index[assignment.nhansu.id]]
+                csp.assign(task_id, CSPAssignment(nhansu, assignment.start, assignment.end, csp.time_axis))
+        csp.ac3_pruned_count += part.ac3_pruned_count
+        csp.fc_pruned_count += part.fc_pruned_count
+        csp.backtrack_count += part.backtrack_count
+        csp.backjump_count += part.backjump_count
+        csp.nogood_count += part.nogood_count
+        csp.restart_count += part.restart_count
+        csp.symmetry_pruned_count += part.symmetry_pruned_count
+        csp.disjunctive_pruned_count += part.disjunctive_pruned_count
+        csp.energy_cut_count += part.energy_cut_count
+        csp.capacity_pruned_count += part.capacity_pruned_count
+        if csp.infeasibility_reason is None:
+            csp.infeasibility_reason = part.infeasibility_reason
+
+# ==================== MAIN SOLVER ====================
+
+def solve_loaded(csp: CSP, progress_callback: Optional[Callable[[SearchEngine], None]] = None,
+                 optimize: bool = False, time_limit: Optional[float] = None,
+                 solution_callback: Optional[Callable[[CSP, float], None]] = None,
+                 warm_start: bool = False) -> CSP:
+    """Giải một CSP đã dựng sẵn (khởi tạo miền, AC-3, tìm kiếm); tham số như solve_csp"""
     print("\n[BƯỚC 1] Khởi tạo miền ban đầu...")
     # Khởi tạo miền ban đầu
     initialize_domains(csp)
-    initial_domain_size = sum(len(domain) for domain in csp.domains.values())
+    initial_domain_size = csp.domain_store.total_size()
     print(f"  → Tổng số giá trị trong miền ban đầu: {initial_domain_size}")
+    if csp.critical_path:
+        path_indices = [csp.task_index[task_id] for task_id in csp.critical_path]
+        path_hours = sum(csp.task_duration[i] for i in path_indices)
+        path_slack = min(csp.task_slack[i] for i in path_indices)
+        print(f"  → Đường găng (CPM): {' → '.join(csp.critical_path)} ({path_hours} giờ làm việc)")
+        print(f"  → Độ trễ cho phép trên đường găng: {path_slack} giờ làm việc")
+    if csp.config.energy_reasoning and not check_skill_energy(csp):
+        print("  ✗ Kiểm tra năng lực theo kỹ năng phát hiện bài toán không có lời giải!")
+        print(f"  → Lý do: {csp.infeasibility_reason}")
+        return csp
     
     print("\n[BƯỚC 2] Tiền xử lý bằng AC-3...")
     # BƯỚC MỚI: Tiền xử lý bằng AC-3
@@ -775,24 +2212,121 @@ def solve_csp(dataset_folder: str, project_start_date: datetime, project_end_dat
     # Nếu AC-3 phát hiện domain rỗng → Không có lời giải
     if not is_consistent:
         print("  ✗ AC-3 phát hiện bài toán không có lời giải!")
-        print("  → Domain của một hoặc nhiều tác vụ đã trở thành rỗng.")
+        print(f"  → Lý do: {csp.infeasibility_reason}")
         return csp
     
-    after_ac3_size = sum(len(domain) for domain in csp.domains.values())
+    after_ac3_size = csp.domain_store.total_size()
     print(f"  ✓ AC-3 hoàn thành thành công!")
     print(f"  → Tổng số giá trị sau AC-3: {after_ac3_size}")
     print(f"  → Số giá trị bị cắt bởi AC-3: {csp.ac3_pruned_count}")
-    print(f"  → Tỷ lệ cắt giảm: {(initial_domain_size - after_ac3_size) / initial_domain_size * 100:.2f}%")
+    if initial_domain_size:
+        print(f"  → Tỷ lệ cắt giảm: {(initial_domain_size - after_ac3_size) / initial_domain_size * 100:.2f}%")
+    if csp.config.disjunctive:
+        if not propagate_disjunctive(csp, range(len(csp.cac_nhansu))):
+            # Mục trail cuối cùng là miền bị cắt rỗng, của một tác vụ chỉ một nhân sự làm được
+            wiped_task = csp.domain_store.trail[-1][0]
+            nhansu = csp.cac_nhansu[csp.task_pinned_employee[csp.task_index[wiped_task]]]
+            csp.infeasibility_reason = (f"các tác vụ chỉ {nhansu.name} ({nhansu.id}) làm được"
+                                        f" không thể xếp vừa trước hạn chót (tác vụ {wiped_task})")
+            print("  ✗ Lan truyền tài nguyên (edge-finding) phát hiện bài toán không có lời giải!")
+            print(f"  → Lý do: {csp.infeasibility_reason}")
+            return csp
+        if csp.disjunctive_pruned_count:
+            print(f"  → Số giá trị bị cắt bởi edge-finding / not-first / not-last: {csp.disjunctive_pruned_count}")
+    # Cửa sổ đã được AC-3 và edge-finding thu hẹp: kiểm tra năng lực lần nữa
+    if csp.config.energy_reasoning and not check_skill_energy(csp):
+        print("  ✗ Kiểm tra năng lực theo kỹ năng phát hiện bài toán không có lời giải!")
+        print(f"  → Lý do: {csp.infeasibility_reason}")
+        return csp
+    if csp.config.domain_mode == "left_justified":
+        restrict_left_justified(csp)
+        print(f"  → Miền dồn trái: còn {csp.domain_store.total_size()} giá trị")
     
-    print("\n[BƯỚC 3] Bắt đầu Backtracking với MRV + LCV + Forward Checking...")
-    # Tạo bản sao initial_domains đã được AC-3 cắt tỉa
-    initial_domains = {}
-    for task_id in csp.domains:
-        initial_domains[task_id] = csp.domains[task_id].copy()
+    if optimize:
+        print("\n[BƯỚC 3] Tối ưu ràng buộc mềm bằng nhánh cận (Branch-and-Bound)...")
+    else:
+        print("\n[BƯỚC 3] Bắt đầu Backtracking với MRV + LCV + Forward Checking...")
+    # Tìm kiếm lặp (ngăn xếp tường minh) với domain đã được tối ưu
+    engine = SearchEngine(csp, progress_callback, optimize=optimize,
+                          solution_callback=solution_callback, time_limit=time_limit)
+    if optimize and warm_start:
+        import greedy  # import tại chỗ: greedy phụ thuộc advanced
+        if greedy.serial_sgs(csp):
+            engine.best_solution = list(csp.assignment.items())
+            csp.best_score = engine.objective(csp)
+            print(f"  → Lời giải khởi đầu (greedy): điểm {csp.best_score:.4f}")
+            for task_id, _ in engine.best_solution:
+                csp.unassign(task_id)
+        else:
+            for task_id in list(csp.assignment):
+                csp.unassign(task_id)
+        csp.solution_found = False
+    engine.run()
+    if csp.symmetry_pruned_count:
+        print(f"  → Số giá trị bỏ qua do nhân sự tương đương (phá đối xứng): {csp.symmetry_pruned_count}")
+    if csp.disjunctive_pruned_count:
+        print(f"  → Tổng số giá trị bị cắt bởi lan truyền tài nguyên rời rạc: {csp.disjunctive_pruned_count}")
+    if csp.energy_cut_count:
+        print(f"  → Số nhánh bị cắt do kỹ năng quá tải (cầu vượt giờ trống): {csp.energy_cut_count}")
+    if csp.capacity_pruned_count:
+        print(f"  → Số giá trị bị cắt do sức chứa theo ngày: {csp.capacity_pruned_count}")
+    if optimize and csp.best_score is not None:
+        print(f"  → Điểm mục tiêu tốt nhất: {csp.best_score:.4f}"
+              f" ({'tối ưu' if engine.proven_optimal else 'dừng theo ngân sách thời gian'})")
     
-    # Gọi hàm đệ quy với domain đã được tối ưu
-    recursive_backtracking(csp, initial_domains)
+    return csp
+
+def solve_csp(dataset_folder: str, project_start_date: datetime, project_end_date: datetime,
+              progress_callback: Optional[Callable[[SearchEngine], None]] = None,
+              config: Optional[SolverConfig] = None, optimize: bool = False,
+              time_limit: Optional[float] = None,
+              solution_callback: Optional[Callable[[CSP, float], None]] = None,
+              warm_start: bool = False, decompose: bool = False) -> CSP:
+    """
+    Hàm tổng hợp để giải bài toán CSP
+    Sử dụng: AC-3 Preprocessing + Backtracking + MRV + LCV + Forward Checking + Soft Constraints
+    
+    Args:
+        dataset_folder: Đường dẫn tới thư mục dữ liệu
+        project_start_date: Ngày bắt đầu dự án
+        project_end_date: Ngày kết thúc dự án
+        progress_callback: Hàm nhận SearchEngine, được gọi định kỳ trong lúc tìm kiếm
+                           (báo tiến độ, nhường quyền điều khiển, hoặc gọi engine.cancel())
+        config: Cấu hình heuristic (None = mặc định)
+        optimize: True = tìm tiếp sau lời giải đầu tiên (nhánh cận) để tối ưu ràng buộc mềm
+        time_limit: Ngân sách thời gian (giây) cho bước tìm kiếm; hết giờ trả về lời giải tốt nhất
+        solution_callback: Hàm nhận (csp, điểm), được gọi mỗi khi chế độ tối ưu tìm ra lời giải tốt hơn
+        warm_start: Chế độ tối ưu: lấy lời giải của mô hình tham lam (greedy.serial_sgs) làm lời giải
+                    ban đầu, nhánh cận chỉ còn nhận lời giải vượt điểm của nó
+        decompose: Tách bài toán thành các thành phần độc lập (find_components) và giải lần lượt
+                   từng thành phần, dùng chung một ngân sách time_limit. Bị bỏ qua khi optimize=True
+                   (cân bằng tải là mục tiêu toàn cục, tối ưu riêng từng thành phần không cho tối ưu chung)
+    """
+    
+    # Nạp dữ liệu
+    cac_tacvu, cac_nhansu = load_data(dataset_folder)
     
+    # Tạo đối tượng CSP
+    csp = CSP(cac_tacvu, cac_nhansu, project_start_date, project_end_date, config)
+    
+    components = find_components(csp) if decompose and not optimize else [[t.id for t in cac_tacvu]]
+    if len(components) <= 1:
+        return solve_loaded(csp, progress_callback, optimize, time_limit, solution_callback, warm_start)
+    
+    print(f"\n[BƯỚC 0] Phân rã: {len(components)} thành phần độc lập "
+          f"({', '.join(str(len(task_ids)) for task_ids in components)} tác vụ)")
+    # Một hạn chót chung cho mọi thành phần: mỗi thành phần chỉ nhận phần ngân sách còn lại
+    deadline = time.perf_counter() + time_limit if time_limit is not None else None
+    parts = []
+    for k, task_ids in enumerate(components, 1):
+        print(f"\n===== Thành phần {k}/{len(components)}: {len(task_ids)} tác vụ =====")
+        remaining = max(0.0, deadline - time.perf_counter()) if deadline is not None else None
+        part = solve_loaded(component_csp(csp, task_ids), progress_callback, optimize, remaining,
+                            solution_callback, warm_start)
+        parts.append(part)
+        if not part.solution_found:
+            break  # một thành phần vô nghiệm (hoặc hết ngân sách) → cả bài toán không có lời giải
+    merge_components(csp, parts)
     return csp
 
 def display_solution(csp: CSP):
@@ -802,16 +2336,16 @@ def display_solution(csp: CSP):
         return
     
     sorted_assignments = sorted(csp.assignment.items(), 
-                              key=lambda x: x[1].start_time)
+                              key=lambda x: x[1].start)
     
     print("\n" + "="*70)
     print("KẾT QUẢ PHÂN CÔNG CÔNG VIỆC")
     print("="*70 + "\n")
     
     for task_id, assignment in sorted_assignments:
-        tacvu = next(t for t in csp.cac_tacvu if t.id == task_id)
+        tacvu = csp.get_task(task_id)
         start_time = assignment.start_time
-        end_time = start_time + timedelta(hours=tacvu.duration)
+        end_time = assignment.end_time
         
         print(f"Tác vụ {tacvu.id} ({tacvu.name}): {assignment.nhansu.name} ({assignment.nhansu.id})")
         print(f"  - Ngày bắt đầu: {start_time.strftime('%H:%M %d/%m/%Y')}")
@@ -853,10 +2387,11 @@ def export_to_csv(csp: CSP, filename: str = "task_assignment.csv"):
         return
     
     csv_data = []
-    for task_id, assignment in csp.assignment.items():
-        tacvu = next(t for t in csp.cac_tacvu if t.id == task_id)
+    sorted_assignments = sorted(csp.assignment.items(), key=lambda x: x[1].start)
+    for task_id, assignment in sorted_assignments:
+        tacvu = csp.get_task(task_id)
         start_time = assignment.start_time
-        end_time = start_time + timedelta(hours=tacvu.duration)
+        end_time = assignment.end_time
         
         csv_data.append({
             'Task_ID': tacvu.id,
@@ -872,8 +2407,6 @@ def export_to_csv(csp: CSP, filename: str = "task_assignment.csv"):
             'Required_Skill': tacvu.required_skill
         })
     
-    csv_data.sort(key=lambda x: datetime.strptime(f"{x['Start_Date']} {x['Start_Time']}", '%d/%m/%Y %H:%M'))
-    
     df = pd.DataFrame(csv_data)
     df.to_csv(filename, index=False, encoding='utf-8-sig')
     print(f"\n✓ Kết quả đã được xuất ra file: {filename}")
@@ -953,6 +2486,8 @@ def main():
     print(f"Số giá trị bị cắt bởi AC-3: {csp.ac3_pruned_count}")
     print(f"Số giá trị bị cắt bởi Forward Checking: {csp.fc_pruned_count}")
     print(f"Số lần Backtrack: {csp.backtrack_count}")
+    print(f"Số lần Backjump: {csp.backjump_count} (nogood đã học: {csp.nogood_count})")
+    print(f"Số lần khởi động lại: {csp.restart_count}")
     print(f"{'='*70}")
     
     if csp.solution_found:
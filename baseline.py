@@ -1,9 +1,10 @@
 import csv
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Callable
 import os
 import sys
+from timeline import HOURS_PER_DAY, TimeAxis, OccupancyIndex
 
 # Thiết lập mã hóa UTF-8 cho đầu ra (tránh lỗi font trên Windows)
 if sys.platform == "win32":
@@ -31,10 +32,21 @@ class NhanSu:
         self.work_schedule = []  # danh sách (thời gian bắt đầu, kết thúc) cho các tác vụ được gán
 
 class CSPAssignment:
-    def __init__(self, nhansu: NhanSu, start_time: datetime):
+    def __init__(self, nhansu: NhanSu, start: int, end: int, time_axis: TimeAxis):
         self.nhansu = nhansu
-        self.start_time = start_time
-        self.end_time = None  # sẽ được tính khi biết thời lượng tác vụ
+        self.start = start  # mốc bắt đầu trên trục giờ làm việc
+        self.end = end      # mốc kết thúc = start + thời lượng
+        self.time_axis = time_axis
+    
+    @property
+    def start_time(self) -> datetime:
+        """Thời điểm bắt đầu (chỉ dùng khi hiển thị/xuất kết quả)"""
+        return self.time_axis.to_datetime(self.start)
+    
+    @property
+    def end_time(self) -> datetime:
+        """Thời điểm kết thúc (chỉ dùng khi hiển thị/xuất kết quả)"""
+        return self.time_axis.to_datetime(self.end, is_end=True)
 
 class CSP:
     def __init__(self, cac_tacvu: List[TacVu], cac_nhansu: List[NhanSu], 
@@ -43,8 +55,61 @@ class CSP:
         self.cac_nhansu = cac_nhansu
         self.project_start_date = project_start_date
         self.project_end_date = project_end_date
+        # Biểu diễn đã biên dịch: mọi mốc thời gian là số nguyên trên trục giờ làm việc
+        self.time_axis = TimeAxis(project_start_date)
+        self.project_start = self.time_axis.to_slot(project_start_date, round_up=True)
+        self.project_end = self.time_axis.to_slot(project_end_date)
+        self.project_duration_hours = (project_end_date - project_start_date).total_seconds() / 3600
+        # Bảng tra cứu id -> chỉ số (thay cho next(...) quét tuyến tính)
+        self.task_index: Dict[str, int] = {t.id: i for i, t in enumerate(cac_tacvu)}
+        self.emp_index: Dict[str, int] = {e.id: i for i, e in enumerate(cac_nhansu)}
+        # Mảng đặc theo chỉ số tác vụ
+        self.task_duration: List[int] = [t.duration for t in cac_tacvu]
+        self.task_deadline: List[int] = [  # mốc hạn chót (project_start_date + deadline ngày)
+            self.time_axis.to_slot(project_start_date + timedelta(days=t.deadline))
+            for t in cac_tacvu
+        ]
+        self.task_priority: List[int] = [t.priority for t in cac_tacvu]
+        self.task_skill: List[str] = [t.required_skill for t in cac_tacvu]
         self.assignment = {}  # ánh xạ task_id -> CSPAssignment
         self.solution_found = False
+        # Lịch bận theo nhân sự, cập nhật qua assign()/unassign()
+        self.occupancy = OccupancyIndex(len(cac_nhansu))
+        # Số giờ đã gán của từng nhân sự trong từng ngày làm việc (tính vào ngày bắt đầu của tác vụ)
+        self.emp_capacity: List[int] = [nhansu.daily_capacity for nhansu in cac_nhansu]
+        self.day_hours: List[List[int]] = [[0] * (self.project_end // HOURS_PER_DAY + 1) for _ in cac_nhansu]
+    
+    def get_task(self, task_id: str) -> TacVu:
+        """Tra cứu tác vụ theo id trong O(1)"""
+        return self.cac_tacvu[self.task_index[task_id]]
+    
+    def assign(self, task_id: str, assignment: CSPAssignment):
+        """Gán tác vụ và cập nhật lịch bận, số giờ trong ngày của nhân sự"""
+        self.assignment[task_id] = assignment
+        emp_idx = self.emp_index[assignment.nhansu.id]
+        self.occupancy.occupy(emp_idx, assignment.start, assignment.end)
+        self.day_hours[emp_idx][assignment.start // HOURS_PER_DAY] += assignment.end - assignment.start
+    
+    def unassign(self, task_id: str):
+        """Bỏ gán tác vụ, giải phóng lịch bận và số giờ trong ngày của nhân sự"""
+        assignment = self.assignment.pop(task_id)
+        emp_idx = self.emp_index[assignment.nhansu.id]
+        self.occupancy.release(emp_idx, assignment.start, assignment.end)
+        self.day_hours[emp_idx][assignment.start // HOURS_PER_DAY] -= assignment.end - assignment.start
+    
+    def find_overlapping_tasks(self) -> List[str]:
+        """
+        Các tác vụ bị trùng lịch với tác vụ khác của cùng nhân sự
+        (dựng lại chỉ mục lịch bận theo thứ tự thời gian bắt đầu, dùng cho kiểm định kết quả)
+        """
+        occupancy = OccupancyIndex(len(self.cac_nhansu))
+        overlapping = []
+        for task_id, assignment in sorted(self.assignment.items(), key=lambda x: x[1].start):
+            emp_idx = self.emp_index[assignment.nhansu.id]
+            if not occupancy.is_free(emp_idx, assignment.start, assignment.end):
+                overlapping.append(task_id)
+            occupancy.occupy(emp_idx, assignment.start, assignment.end)
+        return overlapping
 
 def load_data(dataset_folder: str) -> Tuple[List[TacVu], List[NhanSu]]:
     """Tải dữ liệu tác vụ và nhân sự từ các tệp CSV trong thư mục chỉ định"""
@@ -104,30 +169,26 @@ def is_consistent(tacvu: TacVu, assignment: CSPAssignment, csp: CSP) -> bool:
     # 2. Ràng buộc phụ thuộc giữa các tác vụ
     for dep_task_id in tacvu.dependencies:
         if dep_task_id in csp.assignment:
-            dep_assignment = csp.assignment[dep_task_id]
-            dep_task = next(t for t in csp.cac_tacvu if t.id == dep_task_id)
-            dep_end_time = dep_assignment.start_time + timedelta(hours=dep_task.duration)
-            if assignment.start_time < dep_end_time:
+            if assignment.start < csp.assignment[dep_task_id].end:
                 return False
     
-    # 3. Ràng buộc lịch làm việc (không được trùng thời gian)
-    task_end_time = assignment.start_time + timedelta(hours=tacvu.duration)
+    # 3. Ràng buộc lịch làm việc (không được trùng thời gian) - tra chỉ mục lịch bận
+    task_end = assignment.start + tacvu.duration
     
-    for assigned_task_id, assigned_assignment in csp.assignment.items():
-        if assigned_assignment.nhansu.id == assignment.nhansu.id:
-            assigned_task = next(t for t in csp.cac_tacvu if t.id == assigned_task_id)
-            assigned_end_time = assigned_assignment.start_time + timedelta(hours=assigned_task.duration)
-            if (assignment.start_time < assigned_end_time and 
-                task_end_time > assigned_assignment.start_time):
-                return False
+    if not csp.occupancy.is_free(csp.emp_index[assignment.nhansu.id], assignment.start, task_end):
+        return False
     
     # 4. Ràng buộc hạn chót của tác vụ
-    project_deadline = csp.project_start_date + timedelta(days=tacvu.deadline)
-    if task_end_time > project_deadline:
+    if task_end > csp.task_deadline[csp.task_index[tacvu.id]]:
         return False
     
     # 5. Ràng buộc trong khung thời gian dự án
-    if assignment.start_time < csp.project_start_date or task_end_time > csp.project_end_date:
+    if assignment.start < csp.project_start or task_end > csp.project_end:
+        return False
+    
+    # 6. Ràng buộc sức chứa theo ngày của nhân sự
+    emp_idx = csp.emp_index[assignment.nhansu.id]
+    if csp.day_hours[emp_idx][assignment.start // HOURS_PER_DAY] + tacvu.duration > csp.emp_capacity[emp_idx]:
         return False
     
     return True
@@ -162,84 +223,165 @@ def get_domain_values(tacvu: TacVu, csp: CSP) -> List[CSPAssignment]:
         return domain
     
     # Tính thời gian bắt đầu sớm nhất dựa theo các phụ thuộc
-    earliest_start = csp.project_start_date
+    earliest_start = csp.project_start
     for dep_task_id in tacvu.dependencies:
         if dep_task_id in csp.assignment:
-            dep_assignment = csp.assignment[dep_task_id]
-            dep_task = next(t for t in csp.cac_tacvu if t.id == dep_task_id)
-            dep_end_time = dep_assignment.start_time + timedelta(hours=dep_task.duration)
-            earliest_start = max(earliest_start, dep_end_time)
-    
-    # Sinh các khoảng thời gian khả thi bắt đầu từ earliest_start
-    current_time = earliest_start
-    
-    # Làm tròn tới giờ kế tiếp nếu không tròn giờ
-    if current_time.minute > 0 or current_time.second > 0:
-        current_time = current_time.replace(minute=0, second=0) + timedelta(hours=1)
-    
-    while current_time < csp.project_end_date:
-        # Bỏ qua ngoài giờ làm việc (8h - 17h)
-        if current_time.hour < 8 or current_time.hour >= 17:
-            current_time = current_time.replace(hour=8, minute=0, second=0) + timedelta(days=1)
+            earliest_start = max(earliest_start, csp.assignment[dep_task_id].end)
+    
+    # Mốc kết thúc muộn nhất: hạn chót tác vụ và thời hạn dự án
+    latest_end = min(csp.task_deadline[csp.task_index[tacvu.id]], csp.project_end)
+    
+    suitable_indices = [csp.emp_index[emp.id] for emp in suitable_employees]
+    
+    # Sinh các mốc bắt đầu khả thi từ earliest_start
+    slot = earliest_start
+    while slot + tacvu.duration <= latest_end:
+        # Bỏ qua nếu tác vụ kết thúc sau 17h -> chuyển sang 8h ngày hôm sau
+        offset = slot % HOURS_PER_DAY
+        if offset + tacvu.duration > HOURS_PER_DAY:
+            slot += HOURS_PER_DAY - offset
             continue
         
-        task_end_time = current_time + timedelta(hours=tacvu.duration)
-        
-        # Bỏ qua nếu tác vụ kết thúc sau 17h
-        if task_end_time.hour > 17:
-            current_time = current_time.replace(hour=8, minute=0, second=0) + timedelta(days=1)
+        # Mọi nhân sự phù hợp đều đang bận -> nhảy tới khoảng trống sớm nhất
+        next_free = min(csp.occupancy.next_free_slot(emp_idx, slot) for emp_idx in suitable_indices)
+        if next_free > slot:
+            slot = next_free
             continue
         
-        # Bỏ qua nếu vượt quá thời hạn dự án
-        if task_end_time > csp.project_end_date:
-            break
-            
-        # Bỏ qua nếu vượt quá hạn chót tác vụ
-        project_deadline = csp.project_start_date + timedelta(days=tacvu.deadline)
-        if task_end_time > project_deadline:
-            break
-        
         # Thử gán cho từng nhân sự phù hợp
         for nhansu in suitable_employees:
-            assignment = CSPAssignment(nhansu, current_time)
+            assignment = CSPAssignment(nhansu, slot, slot + tacvu.duration, csp.time_axis)
             if is_consistent(tacvu, assignment, csp):
                 domain.append(assignment)
         
         # Chuyển sang giờ tiếp theo
-        current_time += timedelta(hours=1)
+        slot += 1
     
     return domain
 
-def recursive_backtracking(csp: CSP) -> bool:
-    """Giải bằng thuật toán quay lui đệ quy (backtracking)"""
-    
-    # Trường hợp cơ sở: tất cả tác vụ đã được gán
-    if len(csp.assignment) == len(csp.cac_tacvu):
-        csp.solution_found = True
-        return True
-    
-    # Chọn biến chưa gán
-    tacvu = select_next_unassigned_variable(csp)
-    if tacvu is None:
-        return True
-    
-    # Lấy các giá trị miền cho tác vụ
-    domain_values = get_domain_values(tacvu, csp)
-    
-    # Thử từng giá trị
-    for assignment in domain_values:
-        csp.assignment[tacvu.id] = assignment
+class ChoicePoint:
+    """Một điểm lựa chọn trên ngăn xếp tìm kiếm (tương ứng một tầng đệ quy)"""
+    def __init__(self, tacvu: TacVu, values: List[CSPAssignment]):
+        self.tacvu = tacvu
+        self.values = values        # các giá trị miền theo thứ tự sinh
+        self.next_index = 0         # vị trí giá trị sẽ thử tiếp theo
+        self.assigned = False       # đang có giá trị được gán tại điểm này
+
+class SearchEngine:
+    """
+    Tìm kiếm quay lui dạng LẶP với ngăn xếp điểm lựa chọn tường minh
+    
+    Duyệt đúng thứ tự như bản đệ quy nhưng không phụ thuộc giới hạn đệ quy của Python.
+    Có thể tạm dừng giữa các nút (run(max_nodes) rồi gọi run() lần nữa để tiếp tục),
+    báo tiến độ qua progress_callback(engine) sau mỗi progress_interval nút, và hủy bằng cancel().
+    """
+    READY = "ready"
+    RUNNING = "running"
+    SOLVED = "solved"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    
+    def __init__(self, csp: CSP, progress_callback: Optional[Callable[["SearchEngine"], None]] = None,
+                 progress_interval: int = 200):
+        self.csp = csp
+        self.stack: List[ChoicePoint] = []
+        self.status = SearchEngine.READY
+        self.nodes = 0  # số nút (bước thử giá trị) đã xử lý
+        self.progress_callback = progress_callback
+        self.progress_interval = progress_interval
+        self._cancel_requested = False
+    
+    @property
+    def finished(self) -> bool:
+        return self.status in (SearchEngine.SOLVED, SearchEngine.FAILED, SearchEngine.CANCELLED)
+    
+    def cancel(self):
+        """Yêu cầu dừng tìm kiếm (có hiệu lực trước nút kế tiếp)"""
+        self._cancel_requested = True
+    
+    def _open_node(self):
+        """Mở một nút mới - tương ứng phần đầu của một lời gọi đệ quy"""
+        csp = self.csp
         
-        if recursive_backtracking(csp):
-            return True
+        # Trường hợp cơ sở: tất cả tác vụ đã được gán
+        if len(csp.assignment) == len(csp.cac_tacvu):
+            csp.solution_found = True
+            self.status = SearchEngine.SOLVED
+            return
         
-        # Quay lui
-        del csp.assignment[tacvu.id]
+        # Chọn biến chưa gán
+        tacvu = select_next_unassigned_variable(csp)
+        if tacvu is None:
+            # Không còn tác vụ sẵn sàng: dừng tìm kiếm như bản đệ quy (không quay lui)
+            self.status = SearchEngine.FAILED
+            return
+        
+        # Lấy các giá trị miền cho tác vụ (theo assignment hiện tại)
+        self.stack.append(ChoicePoint(tacvu, get_domain_values(tacvu, csp)))
     
-    return False
+    def _step(self):
+        """Một bước tìm kiếm: hoàn tác giá trị đang gán ở đỉnh ngăn xếp (nếu có) rồi thử giá trị kế tiếp"""
+        csp = self.csp
+        point = self.stack[-1]
+        
+        # Quay lui
+        if point.assigned:
+            csp.unassign(point.tacvu.id)
+            point.assigned = False
+        
+        if point.next_index < len(point.values):
+            csp.assign(point.tacvu.id, point.values[point.next_index])
+            point.next_index += 1
+            point.assigned = True
+            self._open_node()
+        else:
+            # Đã thử hết các giá trị → quay về điểm lựa chọn phía trên
+            self.stack.pop()
+    
+    def run(self, max_nodes: Optional[int] = None) -> Optional[bool]:
+        """
+        Chạy tìm kiếm tới khi kết thúc hoặc đã xử lý max_nodes nút (tạm dừng)
+        
+        Returns:
+            True nếu tìm thấy lời giải, False nếu thất bại hoặc bị hủy,
+            None nếu đang tạm dừng (gọi run() lần nữa để tiếp tục)
+        """
+        if self.status == SearchEngine.READY:
+            self.status = SearchEngine.RUNNING
+            self._open_node()
+        
+        steps = 0
+        while self.status == SearchEngine.RUNNING:
+            if self._cancel_requested:
+                self.status = SearchEngine.CANCELLED
+                break
+            if not self.stack:
+                self.status = SearchEngine.FAILED
+                break
+            if max_nodes is not None and steps >= max_nodes:
+                return None
+            
+            self._step()
+            steps += 1
+            self.nodes += 1
+            if self.progress_callback and self.nodes % self.progress_interval == 0:
+                self.progress_callback(self)
+        
+        return self.status == SearchEngine.SOLVED
 
-def solve_csp(dataset_folder: str, project_start_date: datetime, project_end_date: datetime) -> CSP:
-    """Hàm tổng hợp để giải bài toán CSP"""
+def recursive_backtracking(csp: CSP) -> bool:
+    """
+    Giải bằng thuật toán quay lui (backtracking)
+    Giữ tên cũ để tương thích; bên trong chạy SearchEngine dạng lặp (không đệ quy)
+    """
+    return SearchEngine(csp).run()
+
+def solve_csp(dataset_folder: str, project_start_date: datetime, project_end_date: datetime,
+              progress_callback: Optional[Callable[[SearchEngine], None]] = None) -> CSP:
+    """
+    Hàm tổng hợp để giải bài toán CSP
+    progress_callback (nếu có) được gọi định kỳ với SearchEngine trong lúc tìm kiếm
+    """
     
     # Nạp dữ liệu
     cac_tacvu, cac_nhansu = load_data(dataset_folder)
@@ -247,8 +389,8 @@ def solve_csp(dataset_folder: str, project_start_date: datetime, project_end_dat
     # Tạo đối tượng CSP
     csp = CSP(cac_tacvu, cac_nhansu, project_start_date, project_end_date)
     
-    # Giải bằng quay lui
-    recursive_backtracking(csp)
+    # Giải bằng quay lui (lặp, ngăn xếp tường minh)
+    SearchEngine(csp, progress_callback).run()
     
     return csp
 
@@ -259,14 +401,14 @@ def display_solution(csp: CSP):
         return
     
     sorted_assignments = sorted(csp.assignment.items(), 
-                              key=lambda x: x[1].start_time)
+                              key=lambda x: x[1].start)
     
     print("\n=== KẾT QUẢ PHÂN CÔNG CÔNG VIỆC ===\n")
     
     for task_id, assignment in sorted_assignments:
-        tacvu = next(t for t in csp.cac_tacvu if t.id == task_id)
+        tacvu = csp.get_task(task_id)
         start_time = assignment.start_time
-        end_time = start_time + timedelta(hours=tacvu.duration)
+        end_time = assignment.end_time
         
         print(f"Tác vụ {tacvu.id} ({tacvu.name}): {assignment.nhansu.name} ({assignment.nhansu.id})")
         print(f"  - Ngày bắt đầu: {start_time.strftime('%H:%M %d/%m/%Y')}")
@@ -280,10 +422,11 @@ def export_to_csv(csp: CSP, filename: str = "task_assignment.csv"):
         return
     
     csv_data = []
-    for task_id, assignment in csp.assignment.items():
-        tacvu = next(t for t in csp.cac_tacvu if t.id == task_id)
+    sorted_assignments = sorted(csp.assignment.items(), key=lambda x: x[1].start)
+    for task_id, assignment in sorted_assignments:
+        tacvu = csp.get_task(task_id)
         start_time = assignment.start_time
-        end_time = start_time + timedelta(hours=tacvu.duration)
+        end_time = assignment.end_time
         
         csv_data.append({
             'Task_ID': tacvu.id,
@@ -299,8 +442,6 @@ def export_to_csv(csp: CSP, filename: str = "task_assignment.csv"):
             'Required_Skill': tacvu.required_skill
         })
     
-    csv_data.sort(key=lambda x: datetime.strptime(f"{x['Start_Date']} {x['Start_Time']}", '%d/%m/%Y %H:%M'))
-    
     df = pd.DataFrame(csv_data)
     df.to_csv(filename, index=False, encoding='utf-8-sig')
     print(f"\nKết quả đã được xuất ra file: {filename}")
@@ -1,12 +1,12 @@
 """
-Script thực nghiệm để chạy Baseline và Advanced model nhiều lần
+Script thực nghiệm để chạy Baseline và Advanced model (tùy chọn thêm Local Search, Greedy) nhiều lần
 và thu thập thống kê cho báo cáo
 """
 import sys
 import time
 import statistics
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import pandas as pd
 import os
 import matplotlib.pyplot as plt
@@ -16,9 +16,15 @@ matplotlib.rcParams['font.family'] = 'DejaVu Sans'  # Hỗ trợ Unicode
 # Import các module
 import baseline
 import advanced
+import local_search
+import greedy
 
 # Python 3 đã hỗ trợ UTF-8 mặc định, không cần thiết lập lại
 
+# Thời gian dự án dùng cho mọi lần chạy thực nghiệm
+PROJECT_START_DATE = datetime(2024, 1, 1, 8, 0, 0)  # 01/01/2024 08:00
+PROJECT_END_DATE = datetime(2024, 1, 31, 17, 0, 0)  # 31/01/2024 17:00
+
 
 def calculate_makespan(csp_result) -> float:
     """Tính thời gian hoàn thành dự án (ngày)"""
@@ -27,7 +33,7 @@ def calculate_makespan(csp_result) -> float:
     
     max_end_time = None
     for task_id, assignment in csp_result.assignment.items():
-        task = next(t for t in csp_result.cac_tacvu if t.id == task_id)
+        task = csp_result.get_task(task_id)
         end_time = assignment.start_time + timedelta(hours=task.duration)
         if max_end_time is None or end_time > max_end_time:
             max_end_time = end_time
@@ -39,7 +45,7 @@ def calculate_makespan(csp_result) -> float:
 def calculate_constraint_satisfaction(csp_result) -> float:
     """
     Tính % ràng buộc thỏa mãn
-    Kiểm tra tất cả ràng buộc cứng: kỹ năng, phụ thuộc, deadline, sức chứa, khung giờ
+    Kiểm tra tất cả ràng buộc cứng: kỹ năng, phụ thuộc, deadline, sức chứa, khung giờ, trùng lịch
     """
     if not csp_result.assignment:
         return 0.0
@@ -48,7 +54,7 @@ def calculate_constraint_satisfaction(csp_result) -> float:
     satisfied_constraints = 0
     
     for task_id, assignment in csp_result.assignment.items():
-        task = next(t for t in csp_result.cac_tacvu if t.id == task_id)
+        task = csp_result.get_task(task_id)
         start_time = assignment.start_time
         end_time = start_time + timedelta(hours=task.duration)
         
@@ -62,7 +68,7 @@ def calculate_constraint_satisfaction(csp_result) -> float:
             total_constraints += 1
             if dep_id in csp_result.assignment:
                 dep_assignment = csp_result.assignment[dep_id]
-                dep_task = next(t for t in csp_result.cac_tacvu if t.id == dep_id)
+                dep_task = csp_result.get_task(dep_id)
                 dep_end = dep_assignment.start_time + timedelta(hours=dep_task.duration)
                 if start_time >= dep_end:
                     satisfied_constraints += 1
@@ -86,23 +92,27 @@ def calculate_constraint_satisfaction(csp_result) -> float:
             satisfied_constraints += 1
     
     # 6. Ràng buộc sức chứa (kiểm tra mỗi nhân viên mỗi ngày)
-    for nhansu in csp_result.cac_nhansu:
-        # Nhóm công việc theo ngày
-        daily_workload = {}
-        for task_id, assignment in csp_result.assignment.items():
-            if assignment.nhansu.id == nhansu.id:
-                task = next(t for t in csp_result.cac_tacvu if t.id == task_id)
-                work_date = assignment.start_time.date()
-                if work_date not in daily_workload:
-                    daily_workload[work_date] = 0
-                daily_workload[work_date] += task.duration
-        
-        # Kiểm tra mỗi ngày
-        for work_date, total_hours in daily_workload.items():
+    # Nhóm công việc theo (nhân viên, ngày) trong một lượt duyệt
+    daily_workload = [{} for _ in csp_result.cac_nhansu]
+    for task_id, assignment in csp_result.assignment.items():
+        emp_workload = daily_workload[csp_result.emp_index[assignment.nhansu.id]]
+        work_date = assignment.start_time.date()
+        if work_date not in emp_workload:
+            emp_workload[work_date] = 0
+        emp_workload[work_date] += csp_result.task_duration[csp_result.task_index[task_id]]
+    
+    # Kiểm tra mỗi ngày
+    for nhansu, emp_workload in zip(csp_result.cac_nhansu, daily_workload):
+        for work_date, total_hours in emp_workload.items():
             total_constraints += 1
             if total_hours <= nhansu.daily_capacity:
                 satisfied_constraints += 1
     
+    # 7. Ràng buộc không trùng lịch của cùng nhân sự (tra chỉ mục lịch bận)
+    overlapping_tasks = csp_result.find_overlapping_tasks()
+    total_constraints += len(csp_result.assignment)
+    satisfied_constraints += len(csp_result.assignment) - len(overlapping_tasks)
+    
     return (satisfied_constraints / total_constraints * 100.0) if total_constraints > 0 else 0.0
 
 
@@ -114,15 +124,11 @@ def calculate_workload_std_dev(csp_result) -> float:
     if not csp_result.assignment:
         return 0.0
     
-    # Tính workload cho mỗi nhân viên
-    workloads = []
-    for nhansu in csp_result.cac_nhansu:
-        total_hours = 0
-        for task_id, assignment in csp_result.assignment.items():
-            if assignment.nhansu.id == nhansu.id:
-                task = next(t for t in csp_result.cac_tacvu if t.id == task_id)
-                total_hours += task.duration
-        workloads.append(total_hours)
+    # Tính workload cho mỗi nhân viên (một lượt duyệt qua assignment)
+    workloads = [0] * len(csp_result.cac_nhansu)
+    for task_id, assignment in csp_result.assignment.items():
+        workloads[csp_result.emp_index[assignment.nhansu.id]] += \
+            csp_result.task_duration[csp_result.task_index[task_id]]
     
     if not workloads:
         return 0.0
@@ -144,15 +150,11 @@ def calculate_load_balance_score(csp_result) -> float:
     if not csp_result.assignment:
         return 0.0
     
-    # Tính workload cho mỗi nhân viên
-    workloads = []
-    for nhansu in csp_result.cac_nhansu:
-        total_hours = 0
-        for task_id, assignment in csp_result.assignment.items():
-            if assignment.nhansu.id == nhansu.id:
-                task = next(t for t in csp_result.cac_tacvu if t.id == task_id)
-                total_hours += task.duration
-        workloads.append(total_hours)
+    # Tính workload cho mỗi nhân viên (một lượt duyệt qua assignment)
+    workloads = [0] * len(csp_result.cac_nhansu)
+    for task_id, assignment in csp_result.assignment.items():
+        workloads[csp_result.emp_index[assignment.nhansu.id]] += \
+            csp_result.task_duration[csp_result.task_index[task_id]]
     
     if not workloads:
         return 0.0
@@ -181,18 +183,18 @@ def calculate_priority_score(csp_result) -> float:
     project_duration = (csp_result.project_end_date - csp_result.project_start_date).total_seconds()
     
     for task_id, assignment in csp_result.assignment.items():
-        task = next(t for t in csp_result.cac_tacvu if t.id == task_id)
+        priority = csp_result.task_priority[csp_result.task_index[task_id]]
         
         # Tính thời điểm bắt đầu chuẩn hóa (0 = bắt đầu dự án, 1 = kết thúc dự án)
         time_elapsed = (assignment.start_time - csp_result.project_start_date).total_seconds()
         normalized_time = time_elapsed / project_duration if project_duration > 0 else 0
         
         # Tác vụ ưu tiên cao thực hiện sớm → điểm cao
-        task_score = task.priority * (1.0 - normalized_time)
+        task_score = priority * (1.0 - normalized_time)
         total_score += task_score
     
     # Chuẩn hóa điểm (chia cho tổng priority của tất cả tác vụ)
-    total_priority = sum(t.priority for t in csp_result.cac_tacvu)
+    total_priority = sum(csp_result.task_priority)
     normalized_score = total_score / total_priority if total_priority > 0 else 0
     
     return normalized_score
@@ -211,11 +213,25 @@ def run_single_experiment(dataset_folder: str, project_start_date: datetime,
     if model_name == "Baseline":
         result = baseline.solve_csp(dataset_folder, project_start_date, project_end_date)
         backtrack_count = 0  # Baseline không track
+        backjump_count = 0
+        ac3_pruned = 0
+        fc_pruned = 0
+    elif model_name == "Local Search":
+        result = local_search.solve_csp(dataset_folder, project_start_date, project_end_date)
+        backtrack_count = 0  # Tìm kiếm cục bộ không quay lui
+        backjump_count = 0
+        ac3_pruned = 0
+        fc_pruned = 0
+    elif model_name == "Greedy":
+        result = greedy.solve_csp(dataset_folder, project_start_date, project_end_date)
+        backtrack_count = 0  # Lập lịch tham lam không quay lui
+        backjump_count = 0
         ac3_pruned = 0
         fc_pruned = 0
     else:  # Advanced
         result = advanced.solve_csp(dataset_folder, project_start_date, project_end_date)
         backtrack_count = result.backtrack_count
+        backjump_count = result.backjump_count
         ac3_pruned = result.ac3_pruned_count
         fc_pruned = result.fc_pruned_count
     
@@ -240,6 +256,7 @@ def run_single_experiment(dataset_folder: str, project_start_date: datetime,
         'workload_std_dev': workload_std,
         'solution_found': result.solution_found,
         'backtrack_count': backtrack_count,
+        'backjump_count': backjump_count,
         'ac3_pruned': ac3_pruned,
         'fc_pruned': fc_pruned,
         'load_balance_score': load_balance_score,
@@ -258,13 +275,6 @@ def run_experiments(dataset_folder: str, num_runs: int = 1) -> Tuple[List[Dict],
     Returns:
         Tuple (baseline_results, advanced_results)
     """
-    # Thiết lập thời gian dự án
-    project_start_date = datetime(2024, 1, 1, 8, 0, 0)  # 01/01/2024 08:00
-    project_end_date = datetime(2024, 1, 31, 17, 0, 0)  # 31/01/2024 17:00
-    
-    baseline_results = []
-    advanced_results = []
-    
     print("=" * 70)
     print("BẮT ĐẦU THỰC NGHIỆM")
     print("=" * 70)
@@ -275,32 +285,37 @@ def run_experiments(dataset_folder: str, num_runs: int = 1) -> Tuple[List[Dict],
         print("       Chỉ cần chạy 1 lần để lấy kết quả.")
     else:
         print("Lưu ý: Chạy nhiều lần chỉ để tính trung bình runtime (có thể dao động).")
-    print(f"Thời gian dự án: {project_start_date.strftime('%d/%m/%Y')} - {project_end_date.strftime('%d/%m/%Y')}")
+    print(f"Thời gian dự án: {PROJECT_START_DATE.strftime('%d/%m/%Y')} - {PROJECT_END_DATE.strftime('%d/%m/%Y')}")
     print("=" * 70)
     print()
     
     # Chạy Baseline
-    print("Đang chạy Baseline model...")
-    for i in range(num_runs):
-        print(f"  Lần {i+1}/{num_runs}...", end=" ", flush=True)
-        result = run_single_experiment(dataset_folder, project_start_date, project_end_date, "Baseline")
-        baseline_results.append(result)
-        status = "✓" if result['solution_found'] else "✗"
-        print(f"{status} ({result['runtime']:.4f}s)")
-    
-    print()
+    baseline_results = run_model_experiments(dataset_folder, "Baseline", num_runs)
     
     # Chạy Advanced
-    print("Đang chạy Advanced model...")
+    advanced_results = run_model_experiments(dataset_folder, "Advanced", num_runs)
+    
+    return baseline_results, advanced_results
+
+
+def run_model_experiments(dataset_folder: str, model_name: str, num_runs: int = 1) -> List[Dict]:
+    """
+    Chạy một mô hình ("Baseline", "Advanced", "Local Search" hoặc "Greedy") num_runs lần
+    
+    Returns:
+        Danh sách metrics của từng lần chạy
+    """
+    results = []
+    print(f"Đang chạy {model_name} model...")
     for i in range(num_runs):
         print(f"  Lần {i+1}/{num_runs}...", end=" ", flush=True)
-        result = run_single_experiment(dataset_folder, project_start_date, project_end_date, "Advanced")
-        advanced_results.append(result)
+        result = run_single_experiment(dataset_folder, PROJECT_START_DATE, PROJECT_END_DATE, model_name)
+        results.append(result)
         status = "✓" if result['solution_found'] else "✗"
         print(f"{status} ({result['runtime']:.4f}s)")
     
     print()
-    return baseline_results, advanced_results
+    return results
 
 
 def calculate_statistics(results: List[Dict]) -> Dict:
@@ -317,7 +332,7 @@ def calculate_statistics(results: List[Dict]) -> Dict:
     
     # Lọc các metrics số
     metrics = ['runtime', 'makespan', 'constraint_satisfaction', 'workload_std_dev', 
-               'backtrack_count', 'ac3_pruned', 'fc_pruned', 'load_balance_score', 'priority_score']
+               'backtrack_count', 'backjump_count', 'ac3_pruned', 'fc_pruned', 'load_balance_score', 'priority_score']
     
     for metric in metrics:
         values = [r[metric] for r in results if metric in r]
@@ -338,7 +353,9 @@ def calculate_statistics(results: List[Dict]) -> Dict:
 
 def export_to_excel(baseline_stats: Dict, advanced_stats: Dict, 
                     baseline_results: List[Dict], advanced_results: List[Dict],
-                    output_file: str = "experiment_results.xlsx"):
+                    output_file: str = "experiment_results.xlsx",
+                    local_search_results: Optional[List[Dict]] = None,
+                    greedy_results: Optional[List[Dict]] = None):
     """
     Xuất kết quả ra file Excel với nhiều sheet
     """
@@ -353,6 +370,7 @@ def export_to_excel(baseline_stats: Dict, advanced_stats: Dict,
                 'Load Balance Score',
                 'Priority Score',
                 'Số lần Backtrack',
+                'Số lần Backjump',
                 'AC-3 Pruned',
                 'Forward Checking Pruned',
                 'Success Rate (%)'
@@ -365,6 +383,7 @@ def export_to_excel(baseline_stats: Dict, advanced_stats: Dict,
                 f"{baseline_stats.get('load_balance_score_mean', 0):.4f} ± {baseline_stats.get('load_balance_score_std', 0):.4f}",
                 f"{baseline_stats.get('priority_score_mean', 0):.4f} ± {baseline_stats.get('priority_score_std', 0):.4f}",
                 f"{baseline_stats.get('backtrack_count_mean', 0):.0f} ± {baseline_stats.get('backtrack_count_std', 0):.0f}",
+                f"{baseline_stats.get('backjump_count_mean', 0):.0f} ± {baseline_stats.get('backjump_count_std', 0):.0f}",
                 f"{baseline_stats.get('ac3_pruned_mean', 0):.0f} ± {baseline_stats.get('ac3_pruned_std', 0):.0f}",
                 f"{baseline_stats.get('fc_pruned_mean', 0):.0f} ± {baseline_stats.get('fc_pruned_std', 0):.0f}",
                 f"{baseline_stats.get('success_rate', 0):.1f}%"
@@ -377,6 +396,7 @@ def export_to_excel(baseline_stats: Dict, advanced_stats: Dict,
                 f"{advanced_stats.get('load_balance_score_mean', 0):.4f} ± {advanced_stats.get('load_balance_score_std', 0):.4f}",
                 f"{advanced_stats.get('priority_score_mean', 0):.4f} ± {advanced_stats.get('priority_score_std', 0):.4f}",
                 f"{advanced_stats.get('backtrack_count_mean', 0):.0f} ± {advanced_stats.get('backtrack_count_std', 0):.0f}",
+                f"{advanced_stats.get('backjump_count_mean', 0):.0f} ± {advanced_stats.get('backjump_count_std', 0):.0f}",
                 f"{advanced_stats.get('ac3_pruned_mean', 0):.0f} ± {advanced_stats.get('ac3_pruned_std', 0):.0f}",
                 f"{advanced_stats.get('fc_pruned_mean', 0):.0f} ± {advanced_stats.get('fc_pruned_std', 0):.0f}",
                 f"{advanced_stats.get('success_rate', 0):.1f}%"
@@ -391,6 +411,7 @@ def export_to_excel(baseline_stats: Dict, advanced_stats: Dict,
                 "N/A",
                 "N/A",
                 "N/A",
+                "N/A",
                 f"{(advanced_stats.get('success_rate', 0) - baseline_stats.get('success_rate', 0)):.1f}%" if baseline_stats.get('success_rate', 0) > 0 else "N/A"
             ]
         }
@@ -414,11 +435,34 @@ def export_to_excel(baseline_stats: Dict, advanced_stats: Dict,
         advanced_stats_df = pd.DataFrame([advanced_stats]).T
         advanced_stats_df.columns = ['Giá trị']
         advanced_stats_df.to_excel(writer, sheet_name='Advanced Thống kê')
+        
+        # Sheet 6: Chi tiết Local Search (nếu có chạy)
+        if local_search_results:
+            df_local_search = pd.DataFrame(local_search_results)
+            df_local_search.to_excel(writer, sheet_name='Local Search Chi tiết', index=False)
+        
+        # Sheet 7: Chi tiết Greedy (nếu có chạy)
+        if greedy_results:
+            df_greedy = pd.DataFrame(greedy_results)
+            df_greedy.to_excel(writer, sheet_name='Greedy Chi tiết', index=False)
     
     print(f"\n✓ Kết quả đã được xuất ra file: {output_file}")
 
 
-def print_summary(baseline_stats: Dict, advanced_stats: Dict):
+def print_model_stats(title: str, stats: Dict):
+    """In thống kê của một mô hình không quay lui (Local Search, Greedy)"""
+    print(f"\n{title}:")
+    print(f"  Thời gian chạy:     {stats.get('runtime_mean', 0):.4f} ± {stats.get('runtime_std', 0):.4f} giây")
+    print(f"  Makespan:           {stats.get('makespan_mean', 0):.2f} ± {stats.get('makespan_std', 0):.2f} ngày")
+    print(f"  % Ràng buộc:        {stats.get('constraint_satisfaction_mean', 0):.2f} ± {stats.get('constraint_satisfaction_std', 0):.2f}%")
+    print(f"  Workload Std Dev:   {stats.get('workload_std_dev_mean', 0):.2f} ± {stats.get('workload_std_dev_std', 0):.2f}")
+    print(f"  Load Balance Score: {stats.get('load_balance_score_mean', 0):.4f} ± {stats.get('load_balance_score_std', 0):.4f}")
+    print(f"  Priority Score:     {stats.get('priority_score_mean', 0):.4f} ± {stats.get('priority_score_std', 0):.4f}")
+    print(f"  Success Rate:       {stats.get('success_rate', 0):.1f}% ({stats.get('success_count', 0)}/{stats.get('total_runs', 0)})")
+
+
+def print_summary(baseline_stats: Dict, advanced_stats: Dict, local_search_stats: Optional[Dict] = None,
+                  greedy_stats: Optional[Dict] = None):
     """In tóm tắt kết quả ra console"""
     print("\n" + "=" * 70)
     print("TÓM TẮT KẾT QUẢ THỰC NGHIỆM")
@@ -439,10 +483,16 @@ def print_summary(baseline_stats: Dict, advanced_stats: Dict):
     print(f"  Load Balance Score: {advanced_stats.get('load_balance_score_mean', 0):.4f} ± {advanced_stats.get('load_balance_score_std', 0):.4f}")
     print(f"  Priority Score:     {advanced_stats.get('priority_score_mean', 0):.4f} ± {advanced_stats.get('priority_score_std', 0):.4f}")
     print(f"  Số lần Backtrack:   {advanced_stats.get('backtrack_count_mean', 0):.0f} ± {advanced_stats.get('backtrack_count_std', 0):.0f}")
+    print(f"  Số lần Backjump:    {advanced_stats.get('backjump_count_mean', 0):.0f} ± {advanced_stats.get('backjump_count_std', 0):.0f}")
     print(f"  AC-3 Pruned:         {advanced_stats.get('ac3_pruned_mean', 0):.0f} ± {advanced_stats.get('ac3_pruned_std', 0):.0f}")
     print(f"  FC Pruned:           {advanced_stats.get('fc_pruned_mean', 0):.0f} ± {advanced_stats.get('fc_pruned_std', 0):.0f}")
     print(f"  Success Rate:       {advanced_stats.get('success_rate', 0):.1f}% ({advanced_stats.get('success_count', 0)}/{advanced_stats.get('total_runs', 0)})")
     
+    if local_search_stats:
+        print_model_stats("🔎 LOCAL SEARCH MODEL (Min-Conflicts + Tabu)", local_search_stats)
+    if greedy_stats:
+        print_model_stats("⏱️ GREEDY MODEL (Serial SGS)", greedy_stats)
+    
     # Tính cải thiện
     if baseline_stats.get('runtime_mean', 0) > 0:
         speedup = baseline_stats.get('runtime_mean', 1) / max(advanced_stats.get('runtime_mean', 0.0001), 0.0001)
@@ -482,17 +532,24 @@ def print_summary(baseline_stats: Dict, advanced_stats: Dict):
 
 
 def plot_runtime_per_trial(baseline_results: List[Dict], advanced_results: List[Dict], 
-                           output_file: str = "runtime_per_trial.png"):
+                           output_file: str = "runtime_per_trial.png",
+                           local_search_results: Optional[List[Dict]] = None,
+                           greedy_results: Optional[List[Dict]] = None):
     """
     Vẽ biểu đồ line graph cho runtime theo từng trial
+    (thêm đường Local Search / Greedy nếu có chạy)
     """
     trials = list(range(1, len(baseline_results) + 1))
-    baseline_runtimes = [r['runtime'] for r in baseline_results]
-    advanced_runtimes = [r['runtime'] for r in advanced_results]
+    series = [('Baseline', baseline_results, '#1f77b4'), ('Advanced', advanced_results, '#ff7f0e')]
+    if local_search_results:
+        series.append(('Local Search', local_search_results, '#2ca02c'))
+    if greedy_results:
+        series.append(('Greedy', greedy_results, '#9467bd'))
     
     plt.figure(figsize=(12, 6))
-    plt.plot(trials, baseline_runtimes, 'o-', label='Baseline', color='#1f77b4', linewidth=2, markersize=6)
-    plt.plot(trials, advanced_runtimes, 'o-', label='Advanced', color='#ff7f0e', linewidth=2, markersize=6)
+    for label, results, color in series:
+        plt.plot(trials, [r['runtime'] for r in results], 'o-', label=label, color=color,
+                 linewidth=2, markersize=6)
     
     plt.xlabel('Trial', fontsize=12, fontweight='bold')
     plt.ylabel('Runtime (seconds)', fontsize=12, fontweight='bold')
@@ -507,22 +564,30 @@ def plot_runtime_per_trial(baseline_results: List[Dict], advanced_results: List[
 
 
 def plot_average_comparison(baseline_stats: Dict, advanced_stats: Dict,
-                           output_file: str = "average_comparison.png"):
+                           output_file: str = "average_comparison.png",
+                           local_search_stats: Optional[Dict] = None,
+                           greedy_stats: Optional[Dict] = None):
     """
     Vẽ biểu đồ bar chart so sánh trung bình các metrics
-    Style giống gui_app.py
+    Style giống gui_app.py; thêm cột Local Search / Greedy nếu có chạy
     """
     fig = plt.figure(figsize=(12, 8))
     
     categories = ['Baseline', 'Advanced']
     colors = ['#e74c3c', '#27ae60']  # Đỏ cho Baseline, Xanh lá cho Advanced (giống gui_app.py)
+    model_stats = [baseline_stats, advanced_stats]
+    if local_search_stats:
+        categories.append('Local Search')
+        colors.append('#3498db')
+        model_stats.append(local_search_stats)
+    if greedy_stats:
+        categories.append('Greedy')
+        colors.append('#f39c12')
+        model_stats.append(greedy_stats)
     
     # 1. Makespan
     ax1 = fig.add_subplot(2, 2, 1)
-    makespan_values = [
-        baseline_stats.get('makespan_mean', 0),
-        advanced_stats.get('makespan_mean', 0)
-    ]
+    makespan_values = [stats.get('makespan_mean', 0) for stats in model_stats]
     bars1 = ax1.bar(categories, makespan_values, color=colors, alpha=0.7, edgecolor='black')
     ax1.set_ylabel('Ngày', fontsize=10)
     ax1.set_title('Thời Gian Hoàn Thành Dự Án\n(Makespan - Càng thấp càng tốt)', 
@@ -537,10 +602,7 @@ def plot_average_comparison(baseline_stats: Dict, advanced_stats: Dict,
     
     # 2. % Ràng Buộc Thỏa
     ax2 = fig.add_subplot(2, 2, 2)
-    constraint_values = [
-        baseline_stats.get('constraint_satisfaction_mean', 0),
-        advanced_stats.get('constraint_satisfaction_mean', 0)
-    ]
+    constraint_values = [stats.get('constraint_satisfaction_mean', 0) for stats in model_stats]
     bars2 = ax2.bar(categories, constraint_values, color=colors, alpha=0.7, edgecolor='black')
     ax2.set_ylabel('%', fontsize=10)
     ax2.set_title('% Ràng Buộc Thỏa\n(Càng cao càng tốt)', 
@@ -555,10 +617,7 @@ def plot_average_comparison(baseline_stats: Dict, advanced_stats: Dict,
     
     # 3. Độ Lệch Chuẩn Workload
     ax3 = fig.add_subplot(2, 2, 3)
-    workload_std_values = [
-        baseline_stats.get('workload_std_dev_mean', 0),
-        advanced_stats.get('workload_std_dev_mean', 0)
-    ]
+    workload_std_values = [stats.get('workload_std_dev_mean', 0) for stats in model_stats]
     bars3 = ax3.bar(categories, workload_std_values, color=colors, alpha=0.7, edgecolor='black')
     ax3.set_ylabel('Giờ', fontsize=10)
     ax3.set_title('Độ Lệch Chuẩn Workload\n(Càng thấp càng tốt)', 
@@ -572,10 +631,7 @@ def plot_average_comparison(baseline_stats: Dict, advanced_stats: Dict,
     
     # 4. Thời Gian Chạy
     ax4 = fig.add_subplot(2, 2, 4)
-    time_values = [
-        baseline_stats.get('runtime_mean', 0),
-        advanced_stats.get('runtime_mean', 0)
-    ]
+    time_values = [stats.get('runtime_mean', 0) for stats in model_stats]
     bars4 = ax4.bar(categories, time_values, color=colors, alpha=0.7, edgecolor='black')
     ax4.set_ylabel('Giây', fontsize=10)
     ax4.set_title('Thời Gian Chạy\n(Càng thấp càng tốt)', 
@@ -594,20 +650,26 @@ def plot_average_comparison(baseline_stats: Dict, advanced_stats: Dict,
 
 
 def plot_all_charts(baseline_results: List[Dict], advanced_results: List[Dict],
-                   baseline_stats: Dict, advanced_stats: Dict):
+                   baseline_stats: Dict, advanced_stats: Dict,
+                   local_search_results: Optional[List[Dict]] = None,
+                   local_search_stats: Optional[Dict] = None,
+                   greedy_results: Optional[List[Dict]] = None,
+                   greedy_stats: Optional[Dict] = None):
     """
-    Vẽ tất cả các biểu đồ
+    Vẽ tất cả các biểu đồ (kèm Local Search / Greedy nếu có kết quả)
     """
     print("\nĐang vẽ biểu đồ...")
     
     # 1. Runtime per trial (line graph) - chỉ vẽ nếu có nhiều hơn 1 lần chạy
     if len(baseline_results) > 1:
-        plot_runtime_per_trial(baseline_results, advanced_results, "runtime_per_trial.png")
+        plot_runtime_per_trial(baseline_results, advanced_results, "runtime_per_trial.png",
+                               local_search_results, greedy_results)
     else:
         print("  (Bỏ qua runtime_per_trial vì chỉ chạy 1 lần)")
     
     # 2. Average comparison (bar chart)
-    plot_average_comparison(baseline_stats, advanced_stats, "average_comparison.png")
+    plot_average_comparison(baseline_stats, advanced_stats, "average_comparison.png",
+                            local_search_stats, greedy_stats)
     
     print("✓ Hoàn thành vẽ biểu đồ!")
 
@@ -627,6 +689,11 @@ def main():
     # Mặc định chạy 1 lần vì kết quả giống nhau
     num_runs = 1
     
+    # Chạy thêm mô hình tìm kiếm cục bộ (Min-Conflicts + Tabu) để so sánh
+    include_local_search = True
+    # Chạy thêm mô hình lập lịch tham lam (serial SGS) để so sánh
+    include_greedy = True
+    
     print(f"Dataset: {dataset_folder}")
     print(f"Số lần chạy mỗi mô hình: {num_runs}")
     print("Lưu ý: CSP là deterministic, kết quả sẽ giống nhau mỗi lần chạy.")
@@ -635,21 +702,27 @@ def main():
     
     # Chạy thực nghiệm
     baseline_results, advanced_results = run_experiments(dataset_folder, num_runs)
+    local_search_results = run_model_experiments(dataset_folder, "Local Search", num_runs) if include_local_search else None
+    greedy_results = run_model_experiments(dataset_folder, "Greedy", num_runs) if include_greedy else None
     
     # Tính toán thống kê
     print("Đang tính toán thống kê...")
     baseline_stats = calculate_statistics(baseline_results)
     advanced_stats = calculate_statistics(advanced_results)
+    local_search_stats = calculate_statistics(local_search_results) if local_search_results else None
+    greedy_stats = calculate_statistics(greedy_results) if greedy_results else None
     
     # In tóm tắt
-    print_summary(baseline_stats, advanced_stats)
+    print_summary(baseline_stats, advanced_stats, local_search_stats, greedy_stats)
     
     # Xuất ra Excel
     output_file = "experiment_results_medium_project.xlsx"
-    export_to_excel(baseline_stats, advanced_stats, baseline_results, advanced_results, output_file)
+    export_to_excel(baseline_stats, advanced_stats, baseline_results, advanced_results, output_file,
+                    local_search_results, greedy_results)
     
     # Vẽ biểu đồ
-    plot_all_charts(baseline_results, advanced_results, baseline_stats, advanced_stats)
+    plot_all_charts(baseline_results, advanced_results, baseline_stats, advanced_stats,
+                    local_search_results, local_search_stats, greedy_results, greedy_stats)
     
     print("\n✓ Hoàn thành thực nghiệm!")
 
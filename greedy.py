@@ -0,0 +1,172 @@
+# Mô hình tham lam: lập lịch theo danh sách ưu tiên (serial schedule-generation scheme)
+"""
+Lập lịch tuần tự (serial SGS) với luật ưu tiên, cho lời giải đầu tiên gần như tức thì
+
+- Tác vụ "sẵn sàng" khi mọi tiền nhiệm đã được xếp; hàng đợi ưu tiên (heap) luôn lấy tác vụ
+  có độ trễ cho phép (slack đường găng) nhỏ nhất, hòa thì priority cao hơn, rồi theo thứ tự dữ liệu.
+- Mỗi tác vụ được xếp một lần, không quay lui: với từng nhân sự phù hợp, tìm mốc bắt đầu sớm nhất
+  >= max(EST, kết thúc của tiền nhiệm) còn trống trên chỉ mục lịch bận (OccupancyIndex), không
+  kéo dài quá 17h và không vượt sức chứa ngày của nhân sự; chọn mốc sớm nhất, hòa thì nhân sự
+  đang ít giờ hơn (cân bằng tải).
+- Tác vụ không xếp được trước LFT (hạn chót/khung dự án) bị bỏ trống cùng các tác vụ phụ thuộc vào nó,
+  khi đó solution_found = False (greedy thất bại không có nghĩa là bài toán vô nghiệm).
+
+Kết quả có thể dùng làm lời giải khởi đầu (warm start) cho nhánh cận của mô hình Advanced:
+advanced.solve_csp(..., optimize=True, warm_start=True).
+"""
+import heapq
+from bisect import bisect_left, insort
+from datetime import datetime
+from functools import reduce
+from operator import or_
+from typing import Dict, List, Tuple
+
+import advanced
+from advanced import CSP, CSPAssignment, HOURS_PER_DAY
+
+def day_start_mask(duration: int, horizon: int) -> int:
+    """
+    Bitmap các mốc t có t + duration <= horizon và tác vụ không kéo dài quá 17h
+    (tác vụ dài hơn một ngày làm việc không có mốc nào, như mô hình Advanced)
+    """
+    return sum(1 << t for t in range(horizon - duration + 1)
+               if t % HOURS_PER_DAY + duration <= HOURS_PER_DAY)
+
+def feasible_starts(busy: int, duration: int, day_mask: int) -> int:
+    """
+    Bitmap mốc bắt đầu khả thi của một nhân sự: bit t = 1 nếu nhân sự rảnh suốt [t, t + duration)
+    (busy là bitmap lịch bận của OccupancyIndex, day_mask lấy từ day_start_mask)
+    """
+    starts = ~busy & day_mask
+    for k in range(1, duration):
+        starts &= ~(busy >> k)
+    return starts
+
+def capacity_start_mask(day_hours: List[int], capacity: int, duration: int) -> int:
+    """Bitmap các mốc t mà nhân sự còn đủ sức chứa trong ngày của t cho thêm duration giờ"""
+    day_mask = (1 << HOURS_PER_DAY) - 1
+    return sum(day_mask << (k * HOURS_PER_DAY) for k, hours in enumerate(day_hours) if hours + duration <= capacity)
+
+def serial_sgs(csp: CSP) -> bool:
+    """
+    Xếp lịch mọi tác vụ chưa gán theo serial SGS (sửa trực tiếp trên csp qua csp.assign)
+
+    Mỗi nhân sự giữ một bitmap mốc bắt đầu khả thi cho từng thời lượng; hợp (OR) của các bitmap
+    theo (kỹ năng, thời lượng) được lưu đệm. Mốc bắt đầu sớm nhất của tác vụ là bit thấp nhất của hợp
+    >= mốc sẵn sàng, nên mỗi tác vụ chỉ tốn vài phép toán bit thay vì dò khoảng trống trên lịch của từng
+    nhân sự. Gán việc chỉ làm mất bit nên hợp đã lưu luôn chứa hợp thật; bit lỗi thời (không còn nhân sự
+    nào rảnh tại đó) được xóa khi gặp, mỗi bit nhiều nhất một lần. Sức chứa ngày được giữ bằng bitmap
+    các ngày còn nhận được tác vụ theo (thời lượng, nhân sự), chỉ bị xóa bớt ngày vừa được lấp thêm.
+
+    Returns:
+        True nếu mọi tác vụ đều được xếp, False nếu có tác vụ không xếp được trước LFT
+        (hoặc nằm trong chu trình phụ thuộc, hoặc phụ thuộc vào tác vụ không tồn tại)
+    """
+    advanced.compute_time_windows(csp)
+    n = len(csp.cac_tacvu)
+    durations = csp.task_duration
+    busy = csp.occupancy.busy
+
+    # Nhân sự phù hợp theo kỹ năng, mỗi danh sách luôn được sắp theo (số giờ đã gán, chỉ số):
+    # nhân sự đầu tiên rảnh tại mốc sớm nhất là người đang ít việc nhất (cân bằng tải)
+    suitable: Dict[str, List[Tuple[int, int]]] = {}
+    emp_skills: List[List[str]] = [[] for _ in csp.cac_nhansu]
+    for skill in set(csp.task_skill):
+        suitable[skill] = sorted((csp.emp_hours[e], e) for e, emp in enumerate(csp.cac_nhansu)
+                                 if not skill or skill in emp.skills)
+        for _, e in suitable[skill]:
+            emp_skills[e].append(skill)
+
+    # Bitmap mốc bắt đầu khả thi theo thời lượng và nhân sự, hợp theo (kỹ năng, thời lượng)
+    day_masks = {d: day_start_mask(d, csp.project_end) for d in set(durations)}
+    open_days = {d: [capacity_start_mask(hours, capacity, d)
+                     for hours, capacity in zip(csp.day_hours, csp.emp_capacity)]
+                 for d in day_masks}
+    starts = {d: [feasible_starts(b, d, mask) & open_days[d][e] for e, b in enumerate(busy)]
+              for d, mask in day_masks.items()}
+    union: Dict[Tuple[str, int], int] = {}
+
+    preds: List[List[int]] = [
+        [csp.task_index[dep_id] for dep_id in tacvu.dependencies if dep_id in csp.task_index]
+        for tacvu in csp.cac_tacvu
+    ]
+    succs: List[List[int]] = [[] for _ in range(n)]
+    waiting = [0] * n  # số tiền nhiệm chưa được xếp
+    for i in range(n):
+        for p in preds[i]:
+            succs[p].append(i)
+            if csp.cac_tacvu[p].id not in csp.assignment:
+                waiting[i] += 1
+        # Tiền nhiệm không có trong dữ liệu không bao giờ được xếp: tác vụ không bao giờ sẵn sàng
+        # (như select_variable_with_mrv của mô hình Advanced)
+        waiting[i] += len(csp.cac_tacvu[i].dependencies) - len(preds[i])
+
+    ready = [(csp.task_slack[i], -csp.task_priority[i], i) for i in range(n)
+             if waiting[i] == 0 and csp.cac_tacvu[i].id not in csp.assignment]
+    heapq.heapify(ready)
+
+    while ready:
+        _, _, i = heapq.heappop(ready)
+        tacvu = csp.cac_tacvu[i]
+        duration = durations[i]
+        skill = tacvu.required_skill
+        release = csp.task_est[i]
+        for p in preds[i]:
+            release = max(release, csp.assignment[csp.cac_tacvu[p].id].end)
+
+        key = (skill, duration)
+        by_emp = starts[duration]
+        if key not in union:
+            union[key] = reduce(or_, [by_emp[e] for _, e in suitable[skill]], 0)
+        e = None
+        while e is None:
+            candidates = union[key] >> release
+            if not candidates:
+                break
+            start = release + (candidates & -candidates).bit_length() - 1
+            if start + duration > csp.task_lft[i]:
+                break
+            e = next((e for _, e in suitable[skill] if by_emp[e] >> start & 1), None)
+            if e is None:
+                union[key] &= ~(1 << start)
+        if e is None:
+            continue  # không xếp được: các tác vụ phụ thuộc vào nó không bao giờ sẵn sàng
+
+        hours = csp.emp_hours[e]
+        csp.assign(tacvu.id, CSPAssignment(csp.cac_nhansu[e], start, start + duration, csp.time_axis))
+        day = start // HOURS_PER_DAY
+        day_span = advanced.OccupancyIndex.span_mask(day * HOURS_PER_DAY, (day + 1) * HOURS_PER_DAY)
+        for d, mask in day_masks.items():
+            if not csp.fits_capacity(e, start, d):
+                open_days[d][e] &= ~day_span
+            starts[d][e] = feasible_starts(busy[e], d, mask) & open_days[d][e]
+        for emp_skill in emp_skills[e]:
+            order = suitable[emp_skill]
+            del order[bisect_left(order, (hours, e))]
+            insort(order, (csp.emp_hours[e], e))
+        for succ in succs[i]:
+            waiting[succ] -= 1
+            if waiting[succ] == 0:
+                heapq.heappush(ready, (csp.task_slack[succ], -csp.task_priority[succ], succ))
+
+    csp.solution_found = len(csp.assignment) == n
+    return csp.solution_found
+
+def solve_csp(dataset_folder: str, project_start_date: datetime, project_end_date: datetime) -> CSP:
+    """
+    Hàm tổng hợp để giải bài toán bằng lập lịch tham lam (serial SGS)
+
+    Args:
+        dataset_folder: Đường dẫn tới thư mục dữ liệu
+        project_start_date: Ngày bắt đầu dự án
+        project_end_date: Ngày kết thúc dự án
+    """
+    cac_tacvu, cac_nhansu = advanced.load_data(dataset_folder)
+    csp = CSP(cac_tacvu, cac_nhansu, project_start_date, project_end_date)
+
+    print("\n[BƯỚC 1] Lập lịch tham lam theo độ trễ đường găng + độ ưu tiên (serial SGS)...")
+    if serial_sgs(csp):
+        print(f"  ✓ Đã xếp {len(csp.assignment)}/{len(cac_tacvu)} tác vụ")
+    else:
+        print(f"  ✗ Chỉ xếp được {len(csp.assignment)}/{len(cac_tacvu)} tác vụ trước hạn chót")
+    return csp
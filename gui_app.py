@@ -15,6 +15,8 @@ import numpy as np
 
 # Import các module solver
 import baseline
+import local_search
+import greedy
 import importlib.util
 spec = importlib.util.spec_from_file_location("advanced", "advanced.py")
 advanced = importlib.util.module_from_spec(spec)
@@ -30,8 +32,12 @@ class CSPApp:
         # Biến lưu trữ kết quả
         self.baseline_result = None
         self.advanced_result = None
+        self.local_search_result = None
+        self.greedy_result = None
         self.baseline_time = 0
         self.advanced_time = 0
+        self.local_search_time = 0
+        self.greedy_time = 0
         self.current_dataset = "medium_project"
         
         # Biến lưu trữ file upload (tab assignment)
@@ -161,7 +167,9 @@ class CSPApp:
         self.model_var = tk.StringVar(value="Advanced")
         models = [
             ("Baseline (Backtracking cơ bản)", "Baseline"),
-            ("Advanced (AC-3 + MRV + LCV + FC)", "Advanced")
+            ("Advanced (AC-3 + MRV + LCV + FC)", "Advanced"),
+            ("Local Search (Min-Conflicts + Tabu)", "Local Search"),
+            ("Greedy (Serial SGS theo độ ưu tiên)", "Greedy")
         ]
         
         for text, value in models:
@@ -679,10 +687,16 @@ class CSPApp:
             
             # Giải bài toán
             start_time = time.time()
+            progress = self.make_progress_callback(f"Đang giải bằng {model}")
             if model == "Baseline":
-                result = baseline.solve_csp(dataset_folder, project_start_date, project_end_date)
+                result = baseline.solve_csp(dataset_folder, project_start_date, project_end_date, progress)
+            elif model == "Local Search":
+                result = local_search.solve_csp(dataset_folder, project_start_date, project_end_date,
+                                                self.make_local_search_progress_callback(f"Đang giải bằng {model}"))
+            elif model == "Greedy":
+                result = greedy.solve_csp(dataset_folder, project_start_date, project_end_date)
             else:
-                result = advanced.solve_csp(dataset_folder, project_start_date, project_end_date)
+                result = advanced.solve_csp(dataset_folder, project_start_date, project_end_date, progress)
             
             exec_time = time.time() - start_time
             
@@ -695,12 +709,22 @@ class CSPApp:
                 if model == "Baseline":
                     self.baseline_result = result
                     self.baseline_time = exec_time
+                elif model == "Local Search":
+                    self.local_search_result = result
+                    self.local_search_time = exec_time
+                elif model == "Greedy":
+                    self.greedy_result = result
+                    self.greedy_time = exec_time
                 else:
                     self.advanced_result = result
                     self.advanced_time = exec_time
             else:
-                messagebox.showwarning("Không Tìm Thấy Lời Giải", 
-                                     f"{model} không tìm thấy lời giải cho bài toán này!")
+                message = f"{model} không tìm thấy lời giải cho bài toán này!"
+                # Lý do vô nghiệm phát hiện trước tìm kiếm (mô hình Advanced), nếu có
+                reason = getattr(result, "infeasibility_reason", None)
+                if reason:
+                    message += f"\n\nLý do: {reason}"
+                messagebox.showwarning("Không Tìm Thấy Lời Giải", message)
                 self.status_bar.config(text="✗ Không tìm thấy lời giải")
             
             self.solve_btn.config(state='normal')
@@ -710,6 +734,25 @@ class CSPApp:
             self.solve_btn.config(state='normal')
             self.status_bar.config(text="✗ Lỗi khi giải bài toán")
     
+    def make_progress_callback(self, label):
+        """Tạo callback báo tiến độ tìm kiếm lên thanh trạng thái (và nhường quyền cho giao diện)"""
+        def report_progress(engine):
+            csp = engine.csp
+            self.status_bar.config(
+                text=f"{label}... đã gán {len(csp.assignment)}/{len(csp.cac_tacvu)} tác vụ ({engine.nodes} nút)"
+            )
+            self.root.update()
+        return report_progress
+    
+    def make_local_search_progress_callback(self, label):
+        """Callback báo tiến độ cho tìm kiếm cục bộ: số vi phạm còn lại thay cho số tác vụ đã gán"""
+        def report_progress(engine):
+            self.status_bar.config(
+                text=f"{label}... còn {engine.total_violations} vi phạm (tốt nhất {engine.best_total}, {engine.nodes} bước)"
+            )
+            self.root.update()
+        return report_progress
+    
     def solve_with_uploaded_files(self, solver_module, dataset_folder, 
                                   project_start_date, project_end_date):
         """Giải bài toán với file upload"""
@@ -730,17 +773,13 @@ class CSPApp:
         else:
             csp = advanced.CSP(cac_tacvu, cac_nhansu, project_start_date, project_end_date)
             advanced.initialize_domains(csp)
-            initial_domain_size = sum(len(domain) for domain in csp.domains.values())
+            initial_domain_size = csp.domain_store.total_size()
             
             is_consistent = advanced.ac3_preprocess(csp)
             if not is_consistent:
                 return csp
             
-            initial_domains = {}
-            for task_id in csp.domains:
-                initial_domains[task_id] = csp.domains[task_id].copy()
-            
-            advanced.recursive_backtracking(csp, initial_domains)
+            advanced.recursive_backtracking(csp)
         
         return csp
     
@@ -801,7 +840,7 @@ class CSPApp:
                                    key=lambda x: x[1].start_time)
         
         for task_id, assignment in sorted_assignments:
-            tacvu = next(t for t in result.cac_tacvu if t.id == task_id)
+            tacvu = result.get_task(task_id)
             start_time = assignment.start_time
             end_time = start_time + timedelta(hours=tacvu.duration)
             
@@ -861,14 +900,16 @@ class CSPApp:
             self.status_bar.config(text="Đang giải bằng Baseline...")
             self.root.update()
             start_time = time.time()
-            self.baseline_result = baseline.solve_csp(dataset_folder, project_start_date, project_end_date)
+            self.baseline_result = baseline.solve_csp(dataset_folder, project_start_date, project_end_date,
+                                                      self.make_progress_callback("Đang giải bằng Baseline"))
             self.baseline_time = time.time() - start_time
             
             # Giải bằng Advanced
             self.status_bar.config(text="Đang giải bằng Advanced...")
             self.root.update()
             start_time = time.time()
-            self.advanced_result = advanced.solve_csp(dataset_folder, project_start_date, project_end_date)
+            self.advanced_result = advanced.solve_csp(dataset_folder, project_start_date, project_end_date,
+                                                      self.make_progress_callback("Đang giải bằng Advanced"))
             self.advanced_time = time.time() - start_time
             
             # Tính toán metrics và vẽ biểu đồ
@@ -890,7 +931,7 @@ class CSPApp:
         
         max_end_time = None
         for task_id, assignment in csp_result.assignment.items():
-            task = next(t for t in csp_result.cac_tacvu if t.id == task_id)
+            task = csp_result.get_task(task_id)
             end_time = assignment.start_time + timedelta(hours=task.duration)
             if max_end_time is None or end_time > max_end_time:
                 max_end_time = end_time
@@ -901,7 +942,7 @@ class CSPApp:
     def calculate_constraint_satisfaction(self, csp_result):
         """
         Tính % ràng buộc thỏa mãn
-        Kiểm tra tất cả ràng buộc cứng: kỹ năng, phụ thuộc, deadline, sức chứa, khung giờ
+        Kiểm tra tất cả ràng buộc cứng: kỹ năng, phụ thuộc, deadline, sức chứa, khung giờ, trùng lịch
         """
         if not csp_result.assignment:
             return 0.0
@@ -910,7 +951,7 @@ class CSPApp:
         satisfied_constraints = 0
         
         for task_id, assignment in csp_result.assignment.items():
-            task = next(t for t in csp_result.cac_tacvu if t.id == task_id)
+            task = csp_result.get_task(task_id)
             start_time = assignment.start_time
             end_time = start_time + timedelta(hours=task.duration)
             
@@ -924,7 +965,7 @@ class CSPApp:
                 total_constraints += 1
                 if dep_id in csp_result.assignment:
                     dep_assignment = csp_result.assignment[dep_id]
-                    dep_task = next(t for t in csp_result.cac_tacvu if t.id == dep_id)
+                    dep_task = csp_result.get_task(dep_id)
                     dep_end = dep_assignment.start_time + timedelta(hours=dep_task.duration)
                     if start_time >= dep_end:
                         satisfied_constraints += 1
@@ -948,23 +989,27 @@ class CSPApp:
                 satisfied_constraints += 1
         
         # 6. Ràng buộc sức chứa (kiểm tra mỗi nhân viên mỗi ngày)
-        for nhansu in csp_result.cac_nhansu:
-            # Nhóm công việc theo ngày
-            daily_workload = {}
-            for task_id, assignment in csp_result.assignment.items():
-                if assignment.nhansu.id == nhansu.id:
-                    task = next(t for t in csp_result.cac_tacvu if t.id == task_id)
-                    work_date = assignment.start_time.date()
-                    if work_date not in daily_workload:
-                        daily_workload[work_date] = 0
-                    daily_workload[work_date] += task.duration
-            
-            # Kiểm tra mỗi ngày
-            for work_date, total_hours in daily_workload.items():
+        # Nhóm công việc theo (nhân viên, ngày) trong một lượt duyệt
+        daily_workload = [{} for _ in csp_result.cac_nhansu]
+        for task_id, assignment in csp_result.assignment.items():
+            emp_workload = daily_workload[csp_result.emp_index[assignment.nhansu.id]]
+            work_date = assignment.start_time.date()
+            if work_date not in emp_workload:
+                emp_workload[work_date] = 0
+            emp_workload[work_date] += csp_result.task_duration[csp_result.task_index[task_id]]
+        
+        # Kiểm tra mỗi ngày
+        for nhansu, emp_workload in zip(csp_result.cac_nhansu, daily_workload):
+            for work_date, total_hours in emp_workload.items():
                 total_constraints += 1
                 if total_hours <= nhansu.daily_capacity:
                     satisfied_constraints += 1
         
+        # 7. Ràng buộc không trùng lịch của cùng nhân sự (tra chỉ mục lịch bận)
+        overlapping_tasks = csp_result.find_overlapping_tasks()
+        total_constraints += len(csp_result.assignment)
+        satisfied_constraints += len(csp_result.assignment) - len(overlapping_tasks)
+        
         return (satisfied_constraints / total_constraints * 100.0) if total_constraints > 0 else 0.0
     
     def calculate_workload_std_dev(self, csp_result):
@@ -975,15 +1020,11 @@ class CSPApp:
         if not csp_result.assignment:
             return 0.0
         
-        # Tính workload cho mỗi nhân viên
-        workloads = []
-        for nhansu in csp_result.cac_nhansu:
-            total_hours = 0
-            for task_id, assignment in csp_result.assignment.items():
-                if assignment.nhansu.id == nhansu.id:
-                    task = next(t for t in csp_result.cac_tacvu if t.id == task_id)
-                    total_hours += task.duration
-            workloads.append(total_hours)
+        # Tính workload cho mỗi nhân viên (một lượt duyệt qua assignment)
+        workloads = [0] * len(csp_result.cac_nhansu)
+        for task_id, assignment in csp_result.assignment.items():
+            workloads[csp_result.emp_index[assignment.nhansu.id]] += \
+                csp_result.task_duration[csp_result.task_index[task_id]]
         
         if not workloads:
             return 0.0
@@ -1017,6 +1058,7 @@ class CSPApp:
                 'constraint_satisfaction': baseline_constraint_satisfaction,
                 'workload_std_dev': baseline_workload_std,
                 'backtrack': 0,  # Baseline không track
+                'backjump': 0,
                 'ac3_pruned': 0,
                 'fc_pruned': 0
             },
@@ -1026,6 +1068,7 @@ class CSPApp:
                 'constraint_satisfaction': advanced_constraint_satisfaction,
                 'workload_std_dev': advanced_workload_std,
                 'backtrack': self.advanced_result.backtrack_count,
+                'backjump': self.advanced_result.backjump_count,
                 'ac3_pruned': self.advanced_result.ac3_pruned_count,
                 'fc_pruned': self.advanced_result.fc_pruned_count
             }
@@ -1146,6 +1189,7 @@ class CSPApp:
 
 ⚙️ THUẬT TOÁN:
   • Backtrack:  {data['Advanced']['backtrack']} lần
+  • Backjump:   {data['Advanced']['backjump']} lần
   • AC-3 Pruned: {data['Advanced']['ac3_pruned']}
   • FC Pruned:   {data['Advanced']['fc_pruned']}
 
@@ -1158,7 +1202,9 @@ class CSPApp:
     def export_single_result(self):
         """Xuất kết quả 1 mô hình"""
         model = self.model_var.get()
-        result = self.baseline_result if model == "Baseline" else self.advanced_result
+        result = {"Baseline": self.baseline_result,
+                  "Local Search": self.local_search_result,
+                  "Greedy": self.greedy_result}.get(model, self.advanced_result)
         
         if not result or not result.solution_found:
             messagebox.showwarning("Cảnh Báo", "Chưa có kết quả để xuất!")
@@ -1177,7 +1223,7 @@ class CSPApp:
         try:
             csv_data = []
             for task_id, assignment in result.assignment.items():
-                task = next(t for t in result.cac_tacvu if t.id == task_id)
+                task = result.get_task(task_id)
                 start_time = assignment.start_time
                 end_time = start_time + timedelta(hours=task.duration)
                 
@@ -1234,6 +1280,7 @@ class CSPApp:
                         '(3) % ràng buộc thỏa (%)',
                         '(4) Thời gian chạy (giây)',
                         'Số lần Backtrack',
+                        'Số lần Backjump',
                         'AC-3 Pruned',
                         'Forward Checking Pruned'
                     ],
@@ -1243,6 +1290,7 @@ class CSPApp:
                         f"{data['Baseline']['constraint_satisfaction']:.2f}",
                         f"{data['Baseline']['time']:.4f}",
                         data['Baseline']['backtrack'],
+                        data['Baseline']['backjump'],
                         data['Baseline']['ac3_pruned'],
                         data['Baseline']['fc_pruned']
                     ],
@@ -1252,6 +1300,7 @@ class CSPApp:
                         f"{data['Advanced']['constraint_satisfaction']:.2f}",
                         f"{data['Advanced']['time']:.4f}",
                         data['Advanced']['backtrack'],
+                        data['Advanced']['backjump'],
                         data['Advanced']['ac3_pruned'],
                         data['Advanced']['fc_pruned']
                     ]
@@ -1264,7 +1313,7 @@ class CSPApp:
                 if self.baseline_result and self.baseline_result.solution_found:
                     baseline_data = []
                     for task_id, assignment in self.baseline_result.assignment.items():
-                        task = next(t for t in self.baseline_result.cac_tacvu if t.id == task_id)
+                        task = self.baseline_result.get_task(task_id)
                         start = assignment.start_time
                         end = start + timedelta(hours=task.duration)
                         
@@ -1285,7 +1334,7 @@ class CSPApp:
                 if self.advanced_result and self.advanced_result.solution_found:
                     advanced_data = []
                     for task_id, assignment in self.advanced_result.assignment.items():
-                        task = next(t for t in self.advanced_result.cac_tacvu if t.id == task_id)
+                        task = self.advanced_result.get_task(task_id)
                         start = assignment.start_time
                         end = start + timedelta(hours=task.duration)
                         
@@ -0,0 +1,167 @@
+"""
+Cải thiện lời giải của mô hình Advanced bằng Large Neighborhood Search (LNS)
+
+Từ một phép gán khả thi bất kỳ, mỗi vòng LNS giải phóng một "vùng lân cận" nhỏ các tác vụ
+(các tác vụ của một nhân sự, các tác vụ bắt đầu trong một ngày, hoặc một chuỗi phụ thuộc),
+giữ cố định phần còn lại rồi giải lại riêng vùng đó bằng SearchEngine ở chế độ tối ưu
+(Forward Checking + MRV + LCV + nhánh cận). Kết quả chỉ được giữ khi hàm mục tiêu tốt hơn.
+"""
+import random
+import time
+from typing import Callable, Dict, List, Optional
+
+import advanced
+from advanced import CSP, DomainStore, HOURS_PER_DAY
+
+# Hàm mục tiêu được hỗ trợ: tên -> (hàm mục tiêu, cận trên lạc quan), càng cao càng tốt
+OBJECTIVES = {
+    "soft": (advanced.soft_objective, advanced.soft_objective_bound),
+    "makespan": (advanced.makespan_objective, advanced.makespan_bound),
+}
+NEIGHBORHOODS = ("employee", "day", "chain")
+
+# ==================== NEIGHBORHOODS ====================
+
+def employee_neighborhood(csp: CSP, rng: random.Random, size: int) -> List[str]:
+    """Các tác vụ liên tiếp (theo thời gian) của một nhân sự ngẫu nhiên"""
+    by_employee: Dict[str, List[str]] = {}
+    for task_id, assignment in sorted(csp.assignment.items(), key=lambda x: x[1].start):
+        by_employee.setdefault(assignment.nhansu.id, []).append(task_id)
+    task_ids = by_employee[rng.choice(sorted(by_employee))]
+    first = rng.randrange(max(len(task_ids) - size, 0) + 1)
+    return task_ids[first:first + size]
+
+def day_neighborhood(csp: CSP, rng: random.Random, size: int) -> List[str]:
+    """Các tác vụ bắt đầu trong một ngày làm việc ngẫu nhiên (tối đa size tác vụ)"""
+    days = sorted({assignment.start // HOURS_PER_DAY for assignment in csp.assignment.values()})
+    day = rng.choice(days)
+    task_ids = [task_id for task_id, assignment in csp.assignment.items()
+                if assignment.start // HOURS_PER_DAY == day]
+    rng.shuffle(task_ids)
+    return task_ids[:size]
+
+def chain_neighborhood(csp: CSP, rng: random.Random, size: int) -> List[str]:
+    """Một chuỗi phụ thuộc: loang theo cả tiền nhiệm lẫn kế tiếp từ một tác vụ ngẫu nhiên"""
+    successors: Dict[str, List[str]] = {t.id: [] for t in csp.cac_tacvu}
+    for tacvu in csp.cac_tacvu:
+        for dep_id in tacvu.dependencies:
+            if dep_id in successors:
+                successors[dep_id].append(tacvu.id)
+
+    start = rng.choice(csp.cac_tacvu).id
+    chain = [start]
+    seen = {start}
+    frontier = [start]
+    while frontier and len(chain) < size:
+        task_id = frontier.pop(0)
+        linked = [d for d in csp.get_task(task_id).dependencies if d in csp.task_index] + successors[task_id]
+        for other_id in linked:
+            if other_id not in seen and len(chain) < size:
+                seen.add(other_id)
+                chain.append(other_id)
+                frontier.append(other_id)
+    return chain
+
+NEIGHBORHOOD_FUNCTIONS = {
+    "employee": employee_neighborhood,
+    "day": day_neighborhood,
+    "chain": chain_neighborhood,
+}
+
+# ==================== LNS ====================
+
+def repair(csp: CSP, task_ids: List[str], base_bits: Dict[str, int], objective: str = "soft",
+           time_limit: Optional[float] = 1.0) -> bool:
+    """
+    Giải phóng task_ids và giải lại chỉ các tác vụ đó (các tác vụ khác giữ nguyên phép gán)
+
+    Miền được khôi phục về base_bits, sau đó Forward Checking từ các tác vụ cố định kề với vùng
+    lân cận cắt các giá trị xung đột; SearchEngine ở chế độ tối ưu chỉ nhận lời giải vượt điểm hiện tại.
+
+    Returns:
+        True nếu tìm được phép gán tốt hơn (đã áp dụng vào csp), False nếu giữ nguyên phép gán cũ
+    """
+    objective_fn, bound_fn = OBJECTIVES[objective]
+    store = csp.domain_store
+    previous = {task_id: csp.assignment[task_id] for task_id in task_ids}
+    current_score = objective_fn(csp)
+
+    for task_id in task_ids:
+        csp.unassign(task_id)
+    store.bits = dict(base_bits)
+    store.clear_trail()
+
+    # Lan truyền từ các tác vụ cố định là hàng xóm của vùng lân cận
+    fixed_neighbors = {neighbor.id for task_id in task_ids for neighbor in csp.neighbor_map[task_id]
+                       if neighbor.id in csp.assignment}
+    consistent = all(advanced.forward_checking(csp, task_id) for task_id in sorted(fixed_neighbors))
+
+    improved = False
+    if consistent:
+        # Nogood học trong lần giải lại phụ thuộc vào phần cố định → chỉ dùng trong lần này
+        csp.nogoods.clear()
+        csp.best_score = current_score
+        engine = advanced.SearchEngine(csp, optimize=True, time_limit=time_limit,
+                                       objective=objective_fn, objective_bound=bound_fn)
+        improved = engine.run()
+        csp.nogoods.clear()
+
+    if not improved:
+        for task_id, assignment in previous.items():
+            if task_id not in csp.assignment:
+                csp.assign(task_id, assignment)
+    csp.best_score = objective_fn(csp)
+    return improved
+
+def improve_lns(csp: CSP, iterations: int = 100, neighborhood_size: int = 20,
+                neighborhoods: tuple = NEIGHBORHOODS, objective: str = "soft",
+                repair_time_limit: Optional[float] = 1.0, time_limit: Optional[float] = None,
+                seed: int = 0,
+                improvement_callback: Optional[Callable[[CSP, float], None]] = None) -> int:
+    """
+    Cải thiện phép gán khả thi trong csp bằng LNS (sửa trực tiếp trên csp)
+
+    Args:
+        csp: CSP đã có lời giải (ví dụ kết quả của advanced.solve_csp)
+        iterations: Số vòng LNS tối đa
+        neighborhood_size: Số tác vụ tối đa được giải phóng mỗi vòng
+        neighborhoods: Các loại vùng lân cận được chọn luân phiên ngẫu nhiên ("employee", "day", "chain")
+        objective: "soft" (Load Balance + Priority Score) hoặc "makespan"
+        repair_time_limit: Ngân sách thời gian (giây) cho mỗi lần giải lại
+        time_limit: Ngân sách thời gian (giây) cho toàn bộ LNS (None = chỉ giới hạn số vòng)
+        seed: Hạt giống ngẫu nhiên để kết quả tái lập được
+        improvement_callback: Hàm nhận (csp, điểm), được gọi sau mỗi lần cải thiện
+
+    Returns:
+        Số vòng LNS đã cải thiện được lời giải
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"objective không hợp lệ: {objective}")
+    for name in neighborhoods:
+        if name not in NEIGHBORHOOD_FUNCTIONS:
+            raise ValueError(f"neighborhood không hợp lệ: {name}")
+    if not csp.solution_found or not csp.assignment:
+        return 0
+
+    rng = random.Random(seed)
+    deadline = time.perf_counter() + time_limit if time_limit is not None else None
+
+    # Miền gốc (bảng giá trị của initialize_domains, chưa cắt theo phép gán nào)
+    csp.domain_store = DomainStore(csp.domains)
+    base_bits = dict(csp.domain_store.bits)
+
+    improvements = 0
+    for _ in range(iterations):
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+        name = rng.choice(neighborhoods)
+        task_ids = NEIGHBORHOOD_FUNCTIONS[name](csp, rng, neighborhood_size)
+        if not task_ids:
+            continue
+        if repair(csp, task_ids, base_bits, objective, repair_time_limit):
+            improvements += 1
+            if improvement_callback:
+                improvement_callback(csp, csp.best_score)
+
+    csp.solution_found = len(csp.assignment) == len(csp.cac_tacvu)
+    return improvements
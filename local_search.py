@@ -0,0 +1,344 @@
+# Mô hình tìm kiếm cục bộ: Min-Conflicts + Tabu cho bài toán rất lớn (hàng nghìn tác vụ)
+"""
+Tìm kiếm cục bộ trên phép gán ĐẦY ĐỦ nhưng có thể vi phạm ràng buộc
+
+- Mỗi tác vụ luôn có một phương án (nhân sự, mốc bắt đầu). Kỹ năng, hạn chót, khung dự án và
+  giờ làm việc được bảo đảm ngay khi sinh phương án (cửa sổ đường găng [EST, LFT] như mô hình Advanced);
+  các ràng buộc còn lại của is_consistent — phụ thuộc, trùng lịch nhân sự và sức chứa theo ngày — được
+  đếm thành vi phạm (sức chứa: số giờ vượt của từng cặp (nhân sự, ngày), mọi tác vụ trong ngày quá tải
+  bị xem là đang vi phạm).
+- Số vi phạm của từng tác vụ được cập nhật tăng dần sau mỗi bước: chỉ các tác vụ trùng lịch
+  (tra theo danh sách mốc bắt đầu đã sắp của từng nhân sự), các tác vụ phụ thuộc trực tiếp và các tác vụ
+  cùng ngày của nhân sự bị ảnh hưởng.
+- Mỗi bước chọn ngẫu nhiên một tác vụ đang vi phạm, chuyển sang phương án ít vi phạm nhất
+  (min-conflicts); phương án vừa rời bỏ bị cấm quay lại trong một số bước (tabu), trừ khi tạo kỷ lục mới.
+"""
+import random
+import time
+from bisect import bisect_left, insort
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+import advanced
+from advanced import CSP, CSPAssignment, TacVu, HOURS_PER_DAY
+
+class MinConflictsSearch:
+    """
+    Min-Conflicts + Tabu trên phép gán đầy đủ (giao diện giống SearchEngine: run(), cancel(), nodes)
+
+    Args:
+        csp: CSP đã tính cửa sổ thời gian (advanced.compute_time_windows)
+        max_steps: Số bước tối đa
+        time_limit: Ngân sách thời gian (giây), None = chỉ giới hạn số bước
+        sample_size: Số phương án tối đa được đánh giá mỗi bước (nhiều hơn thì lấy mẫu ngẫu nhiên)
+        noise: Xác suất bước ngẫu nhiên (thoát cực tiểu địa phương)
+        tabu_tenure: Số bước tối thiểu một phương án vừa rời bỏ bị cấm
+        seed: Hạt giống ngẫu nhiên (kết quả tái lập được)
+        progress_callback: Hàm nhận engine, được gọi sau mỗi progress_interval bước
+    """
+    def __init__(self, csp: CSP, max_steps: int = 200000, time_limit: Optional[float] = None,
+                 sample_size: int = 300, noise: float = 0.02, tabu_tenure: int = 10, seed: int = 0,
+                 progress_callback: Optional[Callable[["MinConflictsSearch"], None]] = None,
+                 progress_interval: int = 500):
+        self.csp = csp
+        self.max_steps = max_steps
+        self.time_limit = time_limit
+        self.sample_size = sample_size
+        self.noise = noise
+        self.tabu_tenure = tabu_tenure
+        self.rng = random.Random(seed)
+        self.progress_callback = progress_callback
+        self.progress_interval = progress_interval
+        self.nodes = 0  # số bước đã thực hiện
+        self._cancel_requested = False
+
+        n = len(csp.cac_tacvu)
+        self.duration = csp.task_duration
+        self.max_duration = max(self.duration, default=0)
+        self.preds: List[List[int]] = [
+            [csp.task_index[dep_id] for dep_id in tacvu.dependencies if dep_id in csp.task_index]
+            for tacvu in csp.cac_tacvu
+        ]
+        self.succs: List[List[int]] = [[] for _ in range(n)]
+        for i in range(n):
+            for p in self.preds[i]:
+                self.succs[p].append(i)
+
+        # Phương án của từng tác vụ: nhân sự phù hợp × mốc bắt đầu hợp lệ trong cửa sổ [EST, LFT]
+        self.candidate_emps: List[List[int]] = []
+        self.candidate_starts: List[List[int]] = []
+        for i, tacvu in enumerate(csp.cac_tacvu):
+            self.candidate_emps.append([e for e, emp in enumerate(csp.cac_nhansu)
+                                        if not tacvu.required_skill or tacvu.required_skill in emp.skills])
+            starts = []
+            slot = advanced.earliest_fit_slot(csp.task_est[i], self.duration[i])
+            # Tác vụ dài hơn một ngày làm việc không có mốc bắt đầu nào (như mô hình Advanced)
+            while self.duration[i] <= HOURS_PER_DAY and slot + self.duration[i] <= csp.task_lft[i]:
+                starts.append(slot)
+                slot = advanced.earliest_fit_slot(slot + 1, self.duration[i])
+            self.candidate_starts.append(starts)
+
+        # Trạng thái hiện tại
+        self.emp: List[int] = [-1] * n
+        self.start: List[int] = [-1] * n
+        self.emp_schedule: List[List[Tuple[int, int]]] = [[] for _ in csp.cac_nhansu]  # (start, task) đã sắp
+        self.day_load: List[List[int]] = [[0] * (csp.project_end // HOURS_PER_DAY + 1)
+                                          for _ in csp.cac_nhansu]  # số giờ theo (nhân sự, ngày)
+        self.violations: List[int] = [0] * n
+        self.total_violations = 0  # số cặp ràng buộc đang bị vi phạm + tổng số giờ vượt sức chứa
+        self.conflicted: List[int] = []           # các tác vụ có vi phạm (chọn ngẫu nhiên O(1))
+        self.conflicted_pos: dict = {}
+        self.tabu: dict = {}                      # (task, emp, start) -> bước hết hạn cấm
+        self.best_total: Optional[int] = None
+        self.best: Optional[Tuple[List[int], List[int]]] = None
+
+    def cancel(self):
+        """Yêu cầu dừng tìm kiếm (có hiệu lực trước bước kế tiếp)"""
+        self._cancel_requested = True
+
+    # ---------- Đếm vi phạm ----------
+
+    def _conflicts_at(self, i: int, emp: int, start: int) -> List[int]:
+        """Các tác vụ vi phạm ràng buộc với tác vụ i nếu i đặt tại (emp, start) (có thể lặp nếu vi phạm 2 loại)"""
+        end = start + self.duration[i]
+        conflicts = []
+        # Trùng lịch: tác vụ cùng nhân sự bắt đầu trong (start - max_duration, end) và kết thúc sau start
+        schedule = self.emp_schedule[emp]
+        lo = bisect_left(schedule, (start - self.max_duration + 1, -1))
+        hi = bisect_left(schedule, (end, -1))
+        for other_start, j in schedule[lo:hi]:
+            if j != i and other_start + self.duration[j] > start:
+                conflicts.append(j)
+        # Phụ thuộc: tiền nhiệm phải kết thúc trước start, tác vụ kế tiếp phải bắt đầu sau end
+        for p in self.preds[i]:
+            if self.start[p] >= 0 and self.start[p] + self.duration[p] > start:
+                conflicts.append(p)
+        for s in self.succs[i]:
+            if self.start[s] >= 0 and self.start[s] < end:
+                conflicts.append(s)
+        return conflicts
+
+    def _capacity_excess(self, i: int, emp: int, start: int) -> int:
+        """Số giờ vượt sức chứa tăng thêm nếu tác vụ i chuyển sang (emp, start)"""
+        day = start // HOURS_PER_DAY
+        load = self.day_load[emp][day]
+        if self.emp[i] == emp and self.start[i] >= 0 and self.start[i] // HOURS_PER_DAY == day:
+            load -= self.duration[i]
+        capacity = self.csp.emp_capacity[emp]
+        return max(0, load + self.duration[i] - capacity) - max(0, load - capacity)
+
+    def _cost(self, i: int, emp: int, start: int) -> int:
+        """
+        Phần của total_violations do tác vụ i gây ra nếu đặt tại (emp, start): số cặp vi phạm của i
+        cộng số giờ vượt sức chứa mà i thêm vào ngày đó. Cùng đơn vị với total_violations, nên chuyển i
+        từ phương án hiện tại sang (emp, start) đổi total_violations đúng một lượng
+        _cost(i, emp, start) - _cost(i, phương án hiện tại).
+        """
+        return len(self._conflicts_at(i, emp, start)) + self._capacity_excess(i, emp, start)
+
+    def _flag_day(self, emp: int, day: int, delta: int):
+        """Cộng delta vào số vi phạm của mọi tác vụ của nhân sự bắt đầu trong ngày day"""
+        schedule = self.emp_schedule[emp]
+        lo = bisect_left(schedule, (day * HOURS_PER_DAY, -1))
+        hi = bisect_left(schedule, ((day + 1) * HOURS_PER_DAY, -1))
+        for _, j in schedule[lo:hi]:
+            self._add_violation(j, delta)
+
+    def _add_violation(self, i: int, delta: int):
+        before = self.violations[i]
+        self.violations[i] = before + delta
+        if before == 0 and self.violations[i] > 0:
+            self.conflicted_pos[i] = len(self.conflicted)
+            self.conflicted.append(i)
+        elif before > 0 and self.violations[i] == 0:
+            pos = self.conflicted_pos.pop(i)
+            last = self.conflicted.pop()
+            if last != i:
+                self.conflicted[pos] = last
+                self.conflicted_pos[last] = pos
+
+    def _place(self, i: int, emp: int, start: int):
+        """Đặt tác vụ i tại (emp, start), cập nhật tăng dần số vi phạm"""
+        duration = self.duration[i]
+        if self.start[i] >= 0:
+            old_emp = self.emp[i]
+            for j in self._conflicts_at(i, old_emp, self.start[i]):
+                self._add_violation(j, -1)
+                self._add_violation(i, -1)
+                self.total_violations -= 1
+            schedule = self.emp_schedule[old_emp]
+            schedule.pop(bisect_left(schedule, (self.start[i], i)))
+            # Sức chứa ngày cũ: i hết vi phạm; ngày hết quá tải thì các tác vụ còn lại cũng vậy
+            day = self.start[i] // HOURS_PER_DAY
+            capacity = self.csp.emp_capacity[old_emp]
+            load = self.day_load[old_emp][day]
+            self.day_load[old_emp][day] = load - duration
+            self.total_violations -= max(0, load - capacity) - max(0, load - duration - capacity)
+            if load > capacity:
+                self._add_violation(i, -1)
+                if load - duration <= capacity:
+                    self._flag_day(old_emp, day, -1)
+        self.emp[i] = emp
+        self.start[i] = start
+        for j in self._conflicts_at(i, emp, start):
+            self._add_violation(j, 1)
+            self._add_violation(i, 1)
+            self.total_violations += 1
+        insort(self.emp_schedule[emp], (start, i))
+        # Sức chứa ngày mới: ngày vừa trở nên quá tải thì mọi tác vụ trong ngày (kể cả i) bị đánh dấu
+        day = start // HOURS_PER_DAY
+        capacity = self.csp.emp_capacity[emp]
+        load = self.day_load[emp][day]
+        self.day_load[emp][day] = load + duration
+        self.total_violations += max(0, load + duration - capacity) - max(0, load - capacity)
+        if load + duration > capacity:
+            if load > capacity:
+                self._add_violation(i, 1)
+            else:
+                self._flag_day(emp, day, 1)
+
+    def _candidates(self, i: int) -> List[Tuple[int, int]]:
+        """Các phương án được đánh giá cho tác vụ i (lấy mẫu nếu quá nhiều)"""
+        emps = self.candidate_emps[i]
+        starts = self.candidate_starts[i]
+        count = len(emps) * len(starts)
+        if count <= self.sample_size:
+            return [(emp, start) for start in starts for emp in emps]
+        rng = self.rng
+        return [(rng.choice(emps), rng.choice(starts)) for _ in range(self.sample_size)]
+
+    # ---------- Tìm kiếm ----------
+
+    def _initialize(self) -> bool:
+        """Phép gán ban đầu: tham lam theo thứ tự EST, mỗi tác vụ chọn phương án ít vi phạm nhất"""
+        order = sorted(range(len(self.csp.cac_tacvu)), key=lambda i: (self.csp.task_est[i], i))
+        for i in order:
+            if not self.candidate_emps[i] or not self.candidate_starts[i]:
+                return False  # Không có phương án nào (thiếu kỹ năng, quá dài hoặc cửa sổ thời gian quá hẹp)
+            if len(self.preds[i]) < len(self.csp.cac_tacvu[i].dependencies):
+                return False  # Phụ thuộc vào tác vụ không có trong dữ liệu: không bao giờ thỏa (như Advanced)
+            best_cost, best_value = None, None
+            for emp, start in self._candidates(i):
+                cost = self._cost(i, emp, start)
+                if best_cost is None or cost < best_cost:
+                    best_cost, best_value = cost, (emp, start)
+                    if cost == 0:
+                        break
+            self._place(i, *best_value)
+        self._record_best()
+        return True
+
+    def _record_best(self):
+        if self.best_total is None or self.total_violations < self.best_total:
+            self.best_total = self.total_violations
+            self.best = (list(self.emp), list(self.start))
+
+    def _step(self):
+        """Một bước min-conflicts: chuyển một tác vụ đang vi phạm sang phương án tốt nhất không bị cấm"""
+        rng = self.rng
+        i = rng.choice(self.conflicted)
+        current = (self.emp[i], self.start[i])
+        # violations[i] đếm ngày quá tải là 1, còn total_violations đếm số giờ vượt: dùng _cost cho cùng đơn vị
+        current_cost = self._cost(i, *current)
+
+        if rng.random() < self.noise:
+            choice = rng.choice(self._candidates(i))
+        else:
+            choice, best_delta, ties = None, None, 0
+            for value in self._candidates(i):
+                if value == current:
+                    continue
+                delta = self._cost(i, *value) - current_cost  # thay đổi của total_violations
+                # Tabu: bỏ qua phương án bị cấm, trừ khi nó cho kỷ lục mới (aspiration)
+                if (self.tabu.get((i, *value), -1) > self.nodes
+                        and self.total_violations + delta >= self.best_total):
+                    continue
+                if best_delta is None or delta < best_delta:
+                    choice, best_delta, ties = value, delta, 1
+                elif delta == best_delta:
+                    ties += 1
+                    if rng.randrange(ties) == 0:
+                        choice = value
+            if choice is None:
+                return
+
+        if choice != current:
+            self.tabu[(i, *current)] = self.nodes + self.tabu_tenure + rng.randrange(self.tabu_tenure + 1)
+            self._place(i, *choice)
+            self._record_best()
+
+    def run(self) -> bool:
+        """
+        Chạy tới khi hết vi phạm, hết số bước/thời gian hoặc bị hủy.
+        Phép gán tốt nhất (ít vi phạm nhất) được ghi vào csp.assignment.
+
+        Returns:
+            True nếu tìm được phép gán không vi phạm ràng buộc nào
+        """
+        csp = self.csp
+        if not self._initialize():
+            return False
+
+        deadline = time.perf_counter() + self.time_limit if self.time_limit is not None else None
+        while self.total_violations > 0 and self.nodes < self.max_steps and not self._cancel_requested:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            self._step()
+            self.nodes += 1
+            if self.progress_callback and self.nodes % self.progress_interval == 0:
+                self.progress_callback(self)
+
+        # Ghi phép gán tốt nhất vào CSP
+        best_emp, best_start = self.best
+        for task_id in list(csp.assignment):
+            csp.unassign(task_id)
+        for i, tacvu in enumerate(csp.cac_tacvu):
+            start = best_start[i]
+            csp.assign(tacvu.id, CSPAssignment(csp.cac_nhansu[best_emp[i]], start,
+                                               start + self.duration[i], csp.time_axis))
+        # Kiểm định lại bằng is_consistent (mỗi tác vụ được bỏ gán tạm để không tự trùng lịch với chính nó)
+        csp.solution_found = self.best_total == 0 and all(self._is_consistent(tacvu) for tacvu in csp.cac_tacvu)
+        return csp.solution_found
+
+    def _is_consistent(self, tacvu: TacVu) -> bool:
+        """Phép gán hiện tại của tacvu thỏa mọi ràng buộc cứng với phần còn lại của csp.assignment?"""
+        csp = self.csp
+        assignment = csp.assignment[tacvu.id]
+        csp.unassign(tacvu.id)
+        consistent = advanced.is_consistent(tacvu, assignment, csp)
+        csp.assign(tacvu.id, assignment)
+        return consistent
+
+# ==================== MAIN SOLVER ====================
+
+def solve_csp(dataset_folder: str, project_start_date: datetime, project_end_date: datetime,
+              progress_callback: Optional[Callable[[MinConflictsSearch], None]] = None,
+              max_steps: int = 200000, time_limit: Optional[float] = 60.0, seed: int = 0) -> CSP:
+    """
+    Hàm tổng hợp để giải bài toán bằng tìm kiếm cục bộ (Min-Conflicts + Tabu)
+
+    Args:
+        dataset_folder: Đường dẫn tới thư mục dữ liệu
+        project_start_date: Ngày bắt đầu dự án
+        project_end_date: Ngày kết thúc dự án
+        progress_callback: Hàm nhận MinConflictsSearch, được gọi định kỳ (có thể gọi engine.cancel())
+        max_steps: Số bước tối đa
+        time_limit: Ngân sách thời gian (giây)
+        seed: Hạt giống ngẫu nhiên
+    """
+    cac_tacvu, cac_nhansu = advanced.load_data(dataset_folder)
+    csp = CSP(cac_tacvu, cac_nhansu, project_start_date, project_end_date)
+
+    print("\n[BƯỚC 1] Tính cửa sổ thời gian theo đường găng (CPM)...")
+    advanced.compute_time_windows(csp)
+
+    print("\n[BƯỚC 2] Tìm kiếm cục bộ Min-Conflicts + Tabu...")
+    engine = MinConflictsSearch(csp, max_steps=max_steps, time_limit=time_limit, seed=seed,
+                                progress_callback=progress_callback)
+    engine.run()
+    if engine.best_total is None:
+        print("  ✗ Có tác vụ không có phương án nào (thiếu kỹ năng, dài hơn một ngày làm việc,"
+              " phụ thuộc vào tác vụ không tồn tại hoặc cửa sổ thời gian quá hẹp)")
+    else:
+        print(f"  → Số bước: {engine.nodes}, số vi phạm còn lại: {engine.best_total}")
+    return csp
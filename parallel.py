@@ -0,0 +1,345 @@
+"""
+Chạy song song mô hình Advanced trên nhiều tiến trình
+
+- Portfolio: nhiều cấu hình heuristic (SolverConfig) chạy đua trên cùng bộ dữ liệu,
+  lời giải đầu tiên thắng, các tiến trình còn lại bị hủy
+- Chia cây con: các tầng đầu của cây tìm kiếm được tách thành công việc độc lập
+  (phép gán một phần + miền đã cắt tỉa) và giải trên worker pool
+- Phân rã thành phần: các nhóm tác vụ không phụ thuộc nhau và không chung nhân sự
+  được giải riêng trên từng tiến trình rồi gộp lời giải
+"""
+import io
+import os
+import contextlib
+import multiprocessing
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import advanced
+from advanced import CSP, SolverConfig
+
+# ==================== PORTFOLIO ====================
+
+def default_portfolio(num_configs: int) -> List[SolverConfig]:
+    """
+    Danh sách cấu hình mặc định cho portfolio: cấu hình gốc đứng đầu,
+    sau đó là các biến thể thứ tự biến / trọng số LCV, khởi động lại theo lịch Luby,
+    phần còn lại là hạt giống ngẫu nhiên
+    """
+    configs = [
+        SolverConfig("default"),
+        SolverConfig("slack-first", variable_order="slack"),
+        SolverConfig("lcv-only", lcv_weight=1.0, soft_weight=0.0),
+        SolverConfig("soft-heavy", lcv_weight=0.3, soft_weight=0.7),
+        SolverConfig("luby-restarts", restart_schedule="luby"),
+    ]
+    seed = 1
+    while len(configs) < num_configs:
+        configs.append(SolverConfig(f"random-{seed}", variable_order="random", seed=seed))
+        seed += 1
+    return configs[:max(num_configs, 1)]
+
+def _solve_with_config(job: Tuple[str, datetime, datetime, SolverConfig]) -> CSP:
+    """Tiến trình con: giải với một cấu hình (ẩn log in ra màn hình)"""
+    dataset_folder, project_start_date, project_end_date, config = job
+    with contextlib.redirect_stdout(io.StringIO()):
+        return advanced.solve_csp(dataset_folder, project_start_date, project_end_date, config=config)
+
+def solve_portfolio(dataset_folder: str, project_start_date: datetime, project_end_date: datetime,
+                    configs: Optional[List[SolverConfig]] = None,
+                    processes: Optional[int] = None) -> CSP:
+    """
+    Portfolio: chạy đua các cấu hình trong process pool, trả về CSP của cấu hình tìm ra lời giải
+    đầu tiên (csp.config cho biết cấu hình thắng). Khi có lời giải, pool bị terminate để hủy
+    các tiến trình còn lại. Nếu không cấu hình nào tìm được lời giải, trả về kết quả đầu tiên nhận được.
+
+    Args:
+        configs: Danh sách cấu hình (None = default_portfolio theo số CPU)
+        processes: Số tiến trình tối đa (None = số CPU)
+    """
+    processes = processes or os.cpu_count() or 1
+    if configs is None:
+        configs = default_portfolio(processes)
+    jobs = [(dataset_folder, project_start_date, project_end_date, config) for config in configs]
+
+    fallback: Optional[CSP] = None
+    with multiprocessing.Pool(processes=min(processes, len(jobs))) as pool:
+        for csp in pool.imap_unordered(_solve_with_config, jobs):
+            if csp.solution_found:
+                return csp  # thoát khỏi with → pool.terminate() hủy các cấu hình còn lại
+            if fallback is None:
+                fallback = csp
+    return fallback
+
+# ==================== SUBTREE SPLITTING ====================
+
+# Trạng thái của tiến trình con (khởi tạo một lần trong _init_subtree_worker)
+_worker_csp: Optional[CSP] = None
+_worker_stop = None
+
+def split_subtrees(csp: CSP, depth: int) -> List[Tuple[List[Tuple[str, int]], dict]]:
+    """
+    Mở rộng `depth` tầng đầu của cây tìm kiếm theo đúng thứ tự của SearchEngine
+    (MRV + LCV + kiểm tra lịch bận + Forward Checking), mỗi nút lá thành một công việc độc lập:
+    (danh sách (task_id, chỉ số giá trị) đã gán, bản sao bitset miền sau khi cắt tỉa).
+    Công việc được sắp theo thứ tự duyệt tuần tự. Nếu gặp lời giải đầy đủ trong lúc mở rộng,
+    lời giải được giữ lại trong csp (csp.solution_found = True).
+    """
+    store = csp.domain_store
+    jobs = []
+    prefix: List[Tuple[str, int]] = []
+
+    def expand(level: int) -> bool:
+        if len(csp.assignment) == len(csp.cac_tacvu):
+            csp.solution_found = True
+            return True
+        if level == depth:
+            jobs.append((list(prefix), dict(store.bits)))
+            return False
+        tacvu = advanced.select_variable_with_mrv(csp)
+        if tacvu is None:
+            return False
+        live_items = store.live_items(tacvu.id)
+        if not live_items:
+            return False
+        value_index = {id(value): k for k, value in live_items}
+        for assignment in advanced.order_domain_values_with_lcv(tacvu, [v for _, v in live_items], csp):
+            emp_idx = csp.emp_index[assignment.nhansu.id]
+            if (not csp.occupancy.is_free(emp_idx, assignment.start, assignment.end)
+                    or not csp.fits_capacity(emp_idx, assignment.start, assignment.end - assignment.start)):
+                continue
+            csp.assign(tacvu.id, assignment)
+            trail_mark = store.mark()
+            prefix.append((tacvu.id, value_index[id(assignment)]))
+            if advanced.forward_checking(csp, tacvu.id) and expand(level + 1):
+                return True
+            prefix.pop()
+            store.undo(trail_mark)
+            csp.unassign(tacvu.id)
+        return False
+
+    expand(0)
+    return jobs
+
+def _init_subtree_worker(dataset_folder: str, project_start_date: datetime, project_end_date: datetime,
+                         config: Optional[SolverConfig], stop_event):
+    """Tiến trình con: dựng CSP và chạy AC-3 một lần (bảng giá trị trùng khớp với tiến trình chính)"""
+    global _worker_csp, _worker_stop
+    cac_tacvu, cac_nhansu = advanced.load_data(dataset_folder)
+    csp = CSP(cac_tacvu, cac_nhansu, project_start_date, project_end_date, config)
+    with contextlib.redirect_stdout(io.StringIO()):
+        advanced.initialize_domains(csp)
+        advanced.ac3_preprocess(csp)
+    _worker_csp = csp
+    _worker_stop = stop_event
+
+def _solve_subtree(job: Tuple[List[Tuple[str, int]], dict]):
+    """
+    Tiến trình con: giải một cây con (khôi phục phép gán + miền đã cắt tỉa rồi chạy SearchEngine).
+    Dừng sớm khi cờ dùng chung được bật (đã có tiến trình khác tìm ra lời giải).
+
+    Returns:
+        None nếu bị bỏ qua, ngược lại (tìm thấy?, [(task_id, emp_id, start)], số cắt bởi FC, số backtrack, số backjump)
+    """
+    csp = _worker_csp
+    if _worker_stop.is_set():
+        return None
+    prefix, bits = job
+
+    # Đặt lại trạng thái từ công việc trước
+    for task_id in list(csp.assignment):
+        csp.unassign(task_id)
+    store = csp.domain_store
+    store.bits = dict(bits)
+    store.clear_trail()
+    csp.solution_found = False
+    csp.fc_pruned_count = 0
+    csp.backtrack_count = 0
+    csp.backjump_count = 0
+    # Nogood học trong cây con không chứa các phép gán tiền tố → chỉ đúng trong cây con đó
+    csp.nogoods.clear()
+    for task_id, k in prefix:
+        csp.assign(task_id, store.values[task_id][k])
+
+    def check_stop(engine):
+        if _worker_stop.is_set():
+            engine.cancel()
+
+    found = advanced.SearchEngine(csp, check_stop, progress_interval=50).run()
+    solution = [(task_id, a.nhansu.id, a.start) for task_id, a in csp.assignment.items()] if found else []
+    return found, solution, csp.fc_pruned_count, csp.backtrack_count, csp.backjump_count
+
+def solve_parallel_subtrees(dataset_folder: str, project_start_date: datetime, project_end_date: datetime,
+                            processes: Optional[int] = None, split_depth: Optional[int] = None,
+                            config: Optional[SolverConfig] = None) -> CSP:
+    """
+    Chia các tầng đầu của cây tìm kiếm thành các cây con độc lập và giải song song
+
+    Các cây con được xếp vào hàng đợi chung của Pool (chunksize=1): tiến trình nào rảnh sẽ lấy
+    cây con kế tiếp, nên tiến trình gặp cây con nhỏ tự động nhận thêm việc. Khi một tiến trình
+    tìm ra lời giải, cờ dùng chung (multiprocessing.Event) được bật để các tiến trình khác dừng.
+
+    Args:
+        processes: Số tiến trình (None = số CPU)
+        split_depth: Số tầng được chia (None = tự tăng tới khi có ít nhất 4 cây con cho mỗi tiến trình)
+        config: Cấu hình heuristic (None = mặc định)
+    """
+    processes = processes or os.cpu_count() or 1
+    cac_tacvu, cac_nhansu = advanced.load_data(dataset_folder)
+    csp = CSP(cac_tacvu, cac_nhansu, project_start_date, project_end_date, config)
+    with contextlib.redirect_stdout(io.StringIO()):
+        advanced.initialize_domains(csp)
+        if not advanced.ac3_preprocess(csp):
+            return csp
+        if csp.config.domain_mode == "left_justified":
+            advanced.restrict_left_justified(csp)
+
+    # Chọn độ sâu chia: đủ nhiều cây con để cân bằng tải giữa các tiến trình
+    if split_depth is not None:
+        jobs = split_subtrees(csp, split_depth)
+    else:
+        fc_pruned_before = csp.fc_pruned_count
+        depth, jobs = 1, split_subtrees(csp, 1)
+        while not csp.solution_found and 0 < len(jobs) < 4 * processes and depth < min(8, len(cac_tacvu)):
+            depth += 1
+            csp.fc_pruned_count = fc_pruned_before  # chỉ tính lần chia cuối cùng
+            jobs = split_subtrees(csp, depth)
+    if csp.solution_found or not jobs:
+        return csp
+
+    employees = {nhansu.id: nhansu for nhansu in cac_nhansu}
+    stop_event = multiprocessing.Event()
+    initargs = (dataset_folder, project_start_date, project_end_date, config, stop_event)
+    with multiprocessing.Pool(processes=min(processes, len(jobs)), initializer=_init_subtree_worker,
+                              initargs=initargs) as pool:
+        for result in pool.imap_unordered(_solve_subtree, jobs, chunksize=1):
+            if result is None:
+                continue
+            found, solution, fc_pruned, backtracks, backjumps = result
+            csp.fc_pruned_count += fc_pruned
+            csp.backtrack_count += backtracks
+            csp.backjump_count += backjumps
+            if found:
+                stop_event.set()
+                for task_id, emp_id, start in solution:
+                    duration = csp.task_duration[csp.task_index[task_id]]
+                    csp.assign(task_id, advanced.CSPAssignment(employees[emp_id], start, start + duration,
+                                                               csp.time_axis))
+                csp.solution_found = True
+                break
+    return csp
+
+# ==================== COMPONENT DECOMPOSITION ====================
+
+def _solve_component(part: CSP) -> CSP:
+    """Tiến trình con: giải một thành phần độc lập (ẩn log in ra màn hình)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return advanced.solve_loaded(part)
+
+def solve_components_parallel(dataset_folder: str, project_start_date: datetime, project_end_date: datetime,
+                              processes: Optional[int] = None, config: Optional[SolverConfig] = None) -> CSP:
+    """
+    Tách bài toán thành các thành phần độc lập (advanced.find_components) và giải song song
+
+    Mỗi thành phần là một CSP con (chỉ gồm tác vụ và nhân sự liên quan) được gửi cho process pool,
+    thành phần lớn nhất được giao trước để cân bằng tải. Các lời giải được gộp bằng
+    advanced.merge_components; một thành phần vô nghiệm thì cả bài toán vô nghiệm và pool bị hủy.
+
+    Args:
+        processes: Số tiến trình tối đa (None = số CPU)
+        config: Cấu hình heuristic (None = mặc định)
+    """
+    processes = processes or os.cpu_count() or 1
+    cac_tacvu, cac_nhansu = advanced.load_data(dataset_folder)
+    csp = CSP(cac_tacvu, cac_nhansu, project_start_date, project_end_date, config)
+    parts = [advanced.component_csp(csp, task_ids) for task_ids in advanced.find_components(csp)]
+    if len(parts) <= 1:
+        return _solve_component(csp)
+
+    solved: List[CSP] = []
+    with multiprocessing.Pool(processes=min(processes, len(parts))) as pool:
+        for part in pool.imap_unordered(_solve_component, parts):
+            solved.append(part)
+            if not part.solution_found:
+                break  # thoát khỏi with → pool.terminate() hủy các thành phần còn lại
+    solved.sort(key=lambda part: csp.task_index[part.cac_tacvu[0].id])
+    advanced.merge_components(csp, solved)
+    return csp
+
+# ==================== PARALLEL AC-3 ====================
+
+# CSP của tiến trình con cho AC-3 song song (khởi tạo một lần trong _init_ac3_worker)
+_ac3_worker_csp: Optional[CSP] = None
+
+def _init_ac3_worker(csp: CSP):
+    """Tiến trình con: nhận bản sao CSP (bảng giá trị miền) một lần khi khởi tạo pool"""
+    global _ac3_worker_csp
+    _ac3_worker_csp = csp
+
+def _revise_arcs(job: Tuple[dict, List[Tuple[str, str]]]) -> dict:
+    """Tiến trình con: tính mặt nạ giá trị không có hỗ trợ cho một nhóm arc trên miền đầu vòng"""
+    bits, arcs = job
+    csp = _ac3_worker_csp
+    csp.domain_store.bits = bits
+    removals = {}
+    for task_i_id, task_j_id in arcs:
+        mask = advanced.unsupported_mask(csp.get_task(task_i_id), csp.get_task(task_j_id), csp)
+        if mask:
+            removals[task_i_id] = removals.get(task_i_id, 0) | mask
+    return removals
+
+def ac3_preprocess_parallel(csp: CSP, processes: Optional[int] = None) -> bool:
+    """
+    AC-3 song song theo vòng (thay cho advanced.ac3_preprocess)
+
+    Mỗi vòng, các arc đang chờ được chia đều cho process pool; mọi tiến trình revise trên
+    CÙNG miền đầu vòng và chỉ trả về mặt nạ cần cắt. Tiến trình chính gộp (OR) các mặt nạ,
+    cắt khỏi miền, rồi đưa mọi arc (task_k, task_i) của các task_i vừa đổi vào vòng sau,
+    cho tới điểm bất động. Điểm bất động của arc consistency là duy nhất và mỗi giá trị chỉ
+    được đếm khi thực sự bị cắt, nên miền kết quả và ac3_pruned_count trùng với bản tuần tự
+    (khi bài toán nhất quán; nếu có miền rỗng, cả hai đều trả về False).
+
+    Returns:
+        True nếu AC-3 thành công, False nếu phát hiện domain rỗng
+    """
+    processes = processes or os.cpu_count() or 1
+    store = csp.domain_store
+
+    # Nhất quán nút: rẻ, chạy tuần tự như bản gốc
+    if not advanced.enforce_node_consistency(csp):
+        return False
+
+    pending = [(task_i.id, task_j.id) for task_i, task_j in advanced.create_all_arcs(csp)]
+    with multiprocessing.Pool(processes=processes, initializer=_init_ac3_worker, initargs=(csp,)) as pool:
+        while pending:
+            # Chia đều các arc của vòng này cho các tiến trình
+            chunk_size = -(-len(pending) // processes)
+            bits = dict(store.bits)
+            jobs = [(bits, pending[i:i + chunk_size]) for i in range(0, len(pending), chunk_size)]
+
+            # Gộp mặt nạ cắt của mọi tiến trình rồi áp dụng một lần
+            removals = {}
+            for partial in pool.map(_revise_arcs, jobs):
+                for task_id, mask in partial.items():
+                    removals[task_id] = removals.get(task_id, 0) | mask
+
+            changed = []
+            for task_id, mask in removals.items():
+                removed = store.remove_mask(task_id, mask)
+                if removed:
+                    csp.ac3_pruned_count += removed
+                    if store.size(task_id) == 0:
+                        tacvu = csp.get_task(task_id)
+                        csp.infeasibility_reason = (f"tác vụ {task_id} ({tacvu.name}): không còn phương án nào"
+                                                    f" tương thích với các tác vụ liên quan")
+                        return False  # Phát hiện ngõ cụt!
+                    changed.append(task_id)
+
+            # LAN TRUYỀN: arc (task_k, task_i) cho mọi task_i vừa thay đổi
+            next_arcs = set()
+            for task_id in changed:
+                for task_k in advanced.get_neighbors(csp.get_task(task_id), csp):
+                    next_arcs.add((task_k.id, task_id))
+            pending = sorted(next_arcs)
+
+    return True
@@ -0,0 +1,7 @@
+# Cấu hình chung cho bộ kiểm thử: các mô-đun của dự án nằm ở thư mục gốc
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
@@ -0,0 +1,29 @@
+# Kiểm thử kiểm tra năng lực theo nhóm kỹ năng (energy reasoning)
+import os
+from datetime import datetime
+
+import advanced
+
+DATASETS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "datasets")
+
+
+def test_daily_capacity_overload_is_detected_before_search():
+    # NV03 là nhân sự duy nhất có Frontend/Design: 29 giờ việc phải xong trước 17h ngày 04/01
+    # nhưng sức chứa ngày (8 giờ) chỉ cho phép 4 + 3 × 8 = 28 giờ
+    csp = advanced.solve_csp(os.path.join(DATASETS, "small_project"),
+                             datetime(2024, 1, 1, 8), datetime(2024, 1, 5, 17), time_limit=30)
+    assert not csp.solution_found
+    assert csp.backtrack_count == 0
+    assert "Design, Frontend" in csp.infeasibility_reason
+    assert "cần 29 giờ" in csp.infeasibility_reason and "28 giờ" in csp.infeasibility_reason
+
+
+def test_employee_supply_respects_daily_capacity():
+    cac_tacvu, cac_nhansu = advanced.load_data(os.path.join(DATASETS, "small_project"))
+    csp = advanced.CSP(cac_tacvu, cac_nhansu, datetime(2024, 1, 1, 8), datetime(2024, 1, 5, 17))
+    emp_idx = csp.emp_index["NV03"]
+    day = advanced.HOURS_PER_DAY
+    # Ngày trống hoàn toàn: 9 giờ trống nhưng chỉ làm được 8 giờ
+    assert advanced.employee_supply(csp, emp_idx, 0, day) == 8
+    csp.assign("T03", advanced.CSPAssignment(csp.cac_nhansu[emp_idx], 0, 4, csp.time_axis))
+    assert advanced.employee_supply(csp, emp_idx, 0, 2 * day) == 4 + 8
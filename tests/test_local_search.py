@@ -0,0 +1,32 @@
+# Kiểm thử tìm kiếm cục bộ: độ thay đổi dự đoán của một bước khớp với total_violations thực tế
+import os
+import random
+from datetime import datetime
+
+import advanced
+from local_search import MinConflictsSearch
+
+DATASETS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "datasets")
+
+
+def test_move_delta_matches_total_violations():
+    # Các bước ngẫu nhiên tạo ra trùng lịch, vi phạm phụ thuộc và ngày quá tải trong khung dự án hẹp
+    cac_tacvu, cac_nhansu = advanced.load_data(os.path.join(DATASETS, "medium_project"))
+    csp = advanced.CSP(cac_tacvu, cac_nhansu, datetime(2024, 1, 1, 8), datetime(2024, 1, 8, 17))
+    advanced.compute_time_windows(csp)
+    engine = MinConflictsSearch(csp, seed=0)
+    assert engine._initialize()
+    rng = random.Random(0)
+    overloaded_moves = 0
+    for _ in range(2000):
+        i = rng.randrange(len(csp.cac_tacvu))
+        current = (engine.emp[i], engine.start[i])
+        value = rng.choice(engine._candidates(i))
+        day = current[1] // advanced.HOURS_PER_DAY
+        if engine.day_load[current[0]][day] > csp.emp_capacity[current[0]] + 1:
+            overloaded_moves += 1
+        predicted = engine.total_violations - engine._cost(i, *current) + engine._cost(i, *value)
+        engine._place(i, *value)
+        assert engine.total_violations == predicted
+    # Có những bước rời một ngày vượt sức chứa hơn 1 giờ (trường hợp đếm cờ 1 sẽ sai)
+    assert overloaded_moves > 0
@@ -0,0 +1,44 @@
+# Kiểm thử AC-3 song song: miền và số giá trị bị cắt phải trùng với bản tuần tự
+from datetime import datetime
+
+import advanced
+import parallel
+
+TASKS = """ID,TenTask,YeuCauKyNang,ThoiLuong (gio),PhuThuoc,Deadline (ngay),DoUuTien
+T01,Phân tích yêu cầu,Analysis,5,,1,5
+T02,Viết đặc tả,Analysis,4,,2,3
+T03,Họp khách hàng,Analysis,3,,2,4
+T04,Xây dựng API,Backend,6,T01,3,4
+T05,Kiểm thử API,Testing,3,T04,4,2
+T06,Tích hợp,Backend,4,T02,4,3
+"""
+
+EMPLOYEES = """ID,Ten,KyNang,SucChua (gio/ngay)
+NV01,Nguyễn Văn An,Analysis,8
+NV02,Trần Thị Bình,"Backend, Testing",8
+"""
+
+
+def build_csp(dataset_folder: str) -> advanced.CSP:
+    cac_tacvu, cac_nhansu = advanced.load_data(dataset_folder)
+    csp = advanced.CSP(cac_tacvu, cac_nhansu, datetime(2024, 1, 1, 8), datetime(2024, 1, 5, 17))
+    advanced.initialize_domains(csp)
+    return csp
+
+
+def test_ac3_parallel_matches_sequential(tmp_path):
+    # NV01 là người duy nhất làm Analysis: T01 (hạn ngày 1) luôn chiếm giờ thứ 5 của ngày đầu,
+    # nên AC-3 cắt các phương án của T02/T03 trùng giờ đó
+    dataset = tmp_path / "small_project_ac3"
+    dataset.mkdir()
+    (dataset / "congviec.csv").write_text(TASKS, encoding="utf-8")
+    (dataset / "nhanvien.csv").write_text(EMPLOYEES, encoding="utf-8")
+
+    sequential = build_csp(str(dataset))
+    parallel_csp = build_csp(str(dataset))
+    assert advanced.ac3_preprocess(sequential)
+    assert parallel.ac3_preprocess_parallel(parallel_csp, processes=2)
+
+    assert sequential.ac3_pruned_count > 0
+    assert parallel_csp.ac3_pruned_count == sequential.ac3_pruned_count
+    assert parallel_csp.domain_store.bits == sequential.domain_store.bits
@@ -0,0 +1,156 @@
+# Kiểm thử đối chiếu với vét cạn: các kỹ thuật cắt tỉa không được làm mất lời giải
+import math
+import random
+from datetime import datetime
+
+import pytest
+
+import advanced
+
+START = datetime(2024, 1, 1, 8)
+SKILLS = ["Backend", "Frontend", "Testing"]
+
+
+def random_instance(seed: int, days: int, min_tasks: int = 5, max_tasks: int = 6, twin: bool = False):
+    """Sinh bài toán ngẫu nhiên min_tasks-max_tasks tác vụ, 2-3 nhân sự (hạn chót trong `days` ngày đầu)
+
+    twin: thêm một bản sao của nhân sự đầu tiên (cùng kỹ năng và sức chứa) để có nhân sự tương đương
+    """
+    rng = random.Random(seed)
+    cac_nhansu = [advanced.NhanSu(f"NV{k}", f"Nhân sự {k}", rng.sample(SKILLS, rng.randint(1, 2)),
+                                  rng.randint(5, 8))
+                  for k in range(rng.randint(2, 3))]
+    if twin:
+        cac_nhansu.append(advanced.NhanSu("NV9", "Nhân sự 9", cac_nhansu[0].skills, cac_nhansu[0].daily_capacity))
+    # Chỉ yêu cầu kỹ năng có người làm được để phần lớn bài toán không vô nghiệm hiển nhiên
+    skills = sorted({skill for nhansu in cac_nhansu for skill in nhansu.skills})
+    cac_tacvu = []
+    for k in range(rng.randint(min_tasks, max_tasks)):
+        dependencies = [tacvu.id for tacvu in cac_tacvu if rng.random() < 0.2]
+        cac_tacvu.append(advanced.TacVu(f"T{k}", f"Tác vụ {k}", rng.choice(skills), rng.randint(1, 4),
+                                        dependencies, rng.randint(1, days), rng.randint(1, 5)))
+    return cac_tacvu, cac_nhansu
+
+
+def brute_force_feasible(cac_tacvu, cac_nhansu, days: int) -> bool:
+    """Vét cạn mọi (nhân sự, giờ bắt đầu) theo thứ tự tác vụ (phụ thuộc luôn đứng trước)"""
+    hours = advanced.HOURS_PER_DAY
+    end_of = {}
+    busy = {nhansu.id: [] for nhansu in cac_nhansu}
+    load = {}
+
+    def place(k: int) -> bool:
+        if k == len(cac_tacvu):
+            return True
+        tacvu = cac_tacvu[k]
+        earliest = max((end_of[dep] for dep in tacvu.dependencies), default=0)
+        latest = min(tacvu.deadline, days) * hours
+        for nhansu in cac_nhansu:
+            if tacvu.required_skill not in nhansu.skills:
+                continue
+            for start in range(earliest, latest - tacvu.duration + 1):
+                end = start + tacvu.duration
+                day = (nhansu.id, start // hours)
+                if (start % hours + tacvu.duration > hours
+                        or any(start < b and a < end for a, b in busy[nhansu.id])
+                        or load.get(day, 0) + tacvu.duration > nhansu.daily_capacity):
+                    continue
+                end_of[tacvu.id] = end
+                busy[nhansu.id].append((start, end))
+                load[day] = load.get(day, 0) + tacvu.duration
+                if place(k + 1):
+                    return True
+                del end_of[tacvu.id]
+                busy[nhansu.id].pop()
+                load[day] -= tacvu.duration
+        return False
+
+    return place(0)
+
+
+def solve(cac_tacvu, cac_nhansu, days: int, config: advanced.SolverConfig,
+          optimize: bool = False) -> advanced.CSP:
+    csp = advanced.CSP(cac_tacvu, cac_nhansu, START, datetime(2024, 1, days, 17), config)
+    advanced.solve_loaded(csp, optimize=optimize)
+    return csp
+
+
+def test_backjumping_matches_brute_force():
+    # Tắt các kỹ thuật cắt tỉa khác để CBJ + nogood là phần cắt tỉa chính của tìm kiếm
+    bare = advanced.SolverConfig(symmetry_breaking=False, disjunctive=False, energy_reasoning=False)
+    feasible = backjumps = 0
+    for seed in range(40):
+        cac_tacvu, cac_nhansu = random_instance(seed, days=2)
+        expected = brute_force_feasible(cac_tacvu, cac_nhansu, days=2)
+        csp = solve(cac_tacvu, cac_nhansu, 2, bare)
+        assert csp.solution_found == expected, seed
+        assert solve(cac_tacvu, cac_nhansu, 2, advanced.SolverConfig()).solution_found == expected, seed
+        feasible += expected
+        backjumps += csp.backjump_count + csp.nogood_count
+    # Bộ seed cố định phải có cả bài toán có nghiệm lẫn vô nghiệm, và CBJ thực sự được dùng tới
+    assert 0 < feasible < 40
+    assert backjumps > 0
+
+
+def branch_and_bound(cac_tacvu, cac_nhansu, days: int, **engine_options) -> advanced.CSP:
+    csp = advanced.CSP(cac_tacvu, cac_nhansu, START, datetime(2024, 1, days, 17))
+    advanced.initialize_domains(csp)
+    if advanced.ac3_preprocess(csp):
+        engine = advanced.SearchEngine(csp, optimize=True, **engine_options)
+        engine.run()
+        assert engine.proven_optimal
+    return csp
+
+
+def test_branch_and_bound_matches_exhaustive_optimum():
+    # Cận trên vô cực: không nhánh nào bị cắt, nhánh cận duyệt hết mọi lời giải
+    feasible = 0
+    for seed in range(30):
+        cac_tacvu, cac_nhansu = random_instance(seed, days=1, min_tasks=4, max_tasks=5)
+        bounded = branch_and_bound(cac_tacvu, cac_nhansu, 1)
+        exhaustive = branch_and_bound(cac_tacvu, cac_nhansu, 1, objective_bound=lambda csp: math.inf)
+        assert bounded.solution_found == exhaustive.solution_found, seed
+        if exhaustive.solution_found:
+            feasible += 1
+            assert bounded.best_score == pytest.approx(exhaustive.best_score), seed
+    assert feasible > 0
+
+
+def test_symmetry_breaking_keeps_feasibility_and_optimum():
+    pruned = 0
+    for seed in range(30):
+        cac_tacvu, cac_nhansu = random_instance(seed, days=2, twin=True)
+        expected = brute_force_feasible(cac_tacvu, cac_nhansu, days=2)
+        for symmetry_breaking in (True, False):
+            csp = solve(cac_tacvu, cac_nhansu, 2, advanced.SolverConfig(symmetry_breaking=symmetry_breaking))
+            assert csp.solution_found == expected, (seed, symmetry_breaking)
+
+        cac_tacvu, cac_nhansu = random_instance(seed, days=1, min_tasks=4, max_tasks=5, twin=True)
+        broken = solve(cac_tacvu, cac_nhansu, 1, advanced.SolverConfig(symmetry_breaking=True), optimize=True)
+        full = solve(cac_tacvu, cac_nhansu, 1, advanced.SolverConfig(symmetry_breaking=False), optimize=True)
+        assert broken.solution_found == full.solution_found, seed
+        if full.solution_found:
+            assert broken.best_score == pytest.approx(full.best_score), seed
+        pruned += broken.symmetry_pruned_count
+    assert pruned > 0
+
+
+def test_disjunctive_propagation_keeps_feasibility_and_optimum():
+    # Kỹ năng chỉ một nhân sự có thường gặp ở các bài toán sinh ra: tác vụ của nó bị ghim vào nhân sự đó
+    pruned = 0
+    for seed in range(30):
+        cac_tacvu, cac_nhansu = random_instance(seed, days=2)
+        expected = brute_force_feasible(cac_tacvu, cac_nhansu, days=2)
+        for disjunctive in (True, False):
+            csp = solve(cac_tacvu, cac_nhansu, 2, advanced.SolverConfig(disjunctive=disjunctive))
+            assert csp.solution_found == expected, (seed, disjunctive)
+            pruned += csp.disjunctive_pruned_count
+
+        cac_tacvu, cac_nhansu = random_instance(seed, days=1, min_tasks=4, max_tasks=5)
+        propagated = solve(cac_tacvu, cac_nhansu, 1, advanced.SolverConfig(disjunctive=True), optimize=True)
+        plain = solve(cac_tacvu, cac_nhansu, 1, advanced.SolverConfig(disjunctive=False), optimize=True)
+        assert propagated.solution_found == plain.solution_found, seed
+        if plain.solution_found:
+            assert propagated.best_score == pytest.approx(plain.best_score), seed
+        pruned += propagated.disjunctive_pruned_count
+    assert pruned > 0
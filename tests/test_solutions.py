@@ -0,0 +1,135 @@
+# Kiểm thử lời giải của các mô hình: mọi ràng buộc cứng được kiểm tra lại độc lập với bộ giải
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import pytest
+
+import advanced
+import greedy
+import lns
+import local_search
+import parallel
+
+DATASETS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "datasets")
+START = datetime(2024, 1, 1, 8)
+END = datetime(2024, 1, 31, 17)
+TASKS_HEADER = "ID,TenTask,YeuCauKyNang,ThoiLuong (gio),PhuThuoc,Deadline (ngay),DoUuTien\n"
+EMPLOYEES_HEADER = "ID,Ten,KyNang,SucChua (gio/ngay)\n"
+# Tác vụ 10 giờ không vừa khung 8h - 17h của một ngày, dù sức chứa ngày (12 giờ) đủ
+LONG_TASK = ("A,Di chuyển dữ liệu,Backend,10,,5,3\n", "NV01,Nguyễn Văn An,Backend,12\n")
+# A phụ thuộc vào tác vụ Z không có trong dữ liệu: Advanced và Baseline không bao giờ xếp A
+UNKNOWN_DEPENDENCY = ("A,Viết API,Backend,4,Z,5,3\nB,Kiểm thử API,Backend,2,A,5,2\n",
+                      "NV01,Nguyễn Văn An,Backend,8\n")
+
+
+def assert_valid_schedule(csp: advanced.CSP):
+    """Kiểm tra lời giải trên dữ liệu gốc: kỹ năng, giờ làm việc, hạn chót, phụ thuộc, trùng lịch, sức chứa ngày"""
+    assert csp.solution_found
+    assert set(csp.assignment) == {tacvu.id for tacvu in csp.cac_tacvu}
+    day_hours = defaultdict(int)
+    intervals = defaultdict(list)
+    for tacvu in csp.cac_tacvu:
+        a = csp.assignment[tacvu.id]
+        assert tacvu.required_skill in a.nhansu.skills, tacvu.id
+        # Giờ làm việc: đúng thời lượng, nằm trọn trong 8h - 17h của một ngày
+        assert a.end - a.start == tacvu.duration, tacvu.id
+        assert a.start_time.date() == a.end_time.date(), tacvu.id
+        assert a.start_time.hour >= 8 and (a.end_time.hour, a.end_time.minute) <= (17, 0), tacvu.id
+        # Hạn chót và khung dự án
+        assert a.start_time >= csp.project_start_date, tacvu.id
+        assert a.end_time <= min(csp.project_start_date + timedelta(days=tacvu.deadline),
+                                 csp.project_end_date), tacvu.id
+        for dep_id in tacvu.dependencies:
+            assert a.start_time >= csp.assignment[dep_id].end_time, (dep_id, tacvu.id)
+        day_hours[a.nhansu.id, a.start_time.date()] += tacvu.duration
+        intervals[a.nhansu.id].append((a.start_time, a.end_time, tacvu.id))
+    # Không trùng lịch
+    for emp_id, spans in intervals.items():
+        spans.sort()
+        for (_, prev_end, prev_id), (start, _, task_id) in zip(spans, spans[1:]):
+            assert start >= prev_end, (emp_id, prev_id, task_id)
+    # Sức chứa theo ngày
+    capacity = {nhansu.id: nhansu.daily_capacity for nhansu in csp.cac_nhansu}
+    for (emp_id, day), hours in day_hours.items():
+        assert hours <= capacity[emp_id], (emp_id, day, hours)
+
+
+def write_dataset(tmp_path, tasks: str, employees: str) -> str:
+    """Ghi một bộ dữ liệu nhỏ vào thư mục tạm (tên thư mục phải được load_data nhận dạng)"""
+    dataset = tmp_path / "small_project_case"
+    dataset.mkdir()
+    (dataset / "congviec.csv").write_text(TASKS_HEADER + tasks, encoding="utf-8")
+    (dataset / "nhanvien.csv").write_text(EMPLOYEES_HEADER + employees, encoding="utf-8")
+    return str(dataset)
+
+
+@pytest.mark.parametrize("dataset", ["small_project", "medium_project", "large_project"])
+def test_advanced(dataset):
+    assert_valid_schedule(advanced.solve_csp(os.path.join(DATASETS, dataset), START, END))
+
+
+def test_parallel_portfolio():
+    configs = parallel.default_portfolio(2)
+    csp = parallel.solve_portfolio(os.path.join(DATASETS, "small_project"), START, END,
+                                   configs=configs, processes=2)
+    assert_valid_schedule(csp)
+
+
+def test_parallel_subtrees():
+    csp = parallel.solve_parallel_subtrees(os.path.join(DATASETS, "small_project"), START, END, processes=2)
+    assert_valid_schedule(csp)
+
+
+def test_lns():
+    csp = advanced.solve_csp(os.path.join(DATASETS, "small_project"), START, END)
+    lns.improve_lns(csp, iterations=20, neighborhood_size=5, seed=0)
+    assert_valid_schedule(csp)
+
+
+def test_local_search():
+    csp = local_search.solve_csp(os.path.join(DATASETS, "small_project"), START, END, time_limit=10)
+    assert_valid_schedule(csp)
+
+
+@pytest.mark.parametrize("dataset", ["small_project", "medium_project"])
+def test_greedy(dataset):
+    assert_valid_schedule(greedy.solve_csp(os.path.join(DATASETS, dataset), START, END))
+
+
+def test_decompose():
+    csp = advanced.solve_csp(os.path.join(DATASETS, "large_project"), START, END, decompose=True)
+    assert_valid_schedule(csp)
+
+
+def test_parallel_components():
+    csp = parallel.solve_components_parallel(os.path.join(DATASETS, "large_project"), START, END, processes=2)
+    assert_valid_schedule(csp)
+
+
+def test_greedy_rejects_task_longer_than_a_day(tmp_path):
+    dataset = write_dataset(tmp_path, *LONG_TASK)
+    assert not advanced.solve_csp(dataset, START, END).solution_found
+    csp = greedy.solve_csp(dataset, START, END)
+    assert not csp.solution_found
+    assert "A" not in csp.assignment
+
+
+def test_local_search_rejects_task_longer_than_a_day(tmp_path):
+    csp = local_search.solve_csp(write_dataset(tmp_path, *LONG_TASK), START, END, time_limit=5)
+    assert not csp.solution_found
+    assert not csp.assignment
+
+
+def test_greedy_rejects_unknown_dependency(tmp_path):
+    dataset = write_dataset(tmp_path, *UNKNOWN_DEPENDENCY)
+    assert not advanced.solve_csp(dataset, START, END).solution_found
+    csp = greedy.solve_csp(dataset, START, END)
+    assert not csp.solution_found
+    assert not csp.assignment
+
+
+def test_local_search_rejects_unknown_dependency(tmp_path):
+    csp = local_search.solve_csp(write_dataset(tmp_path, *UNKNOWN_DEPENDENCY), START, END, time_limit=5)
+    assert not csp.solution_found
+    assert not csp.assignment
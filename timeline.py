@@ -0,0 +1,85 @@
+# Trục thời gian giờ làm việc và chỉ mục lịch bận dùng chung cho các mô hình
+from datetime import datetime, timedelta
+from typing import List
+import math
+
+# Khung giờ làm việc trong ngày (8h - 17h)
+WORK_START_HOUR = 8
+WORK_END_HOUR = 17
+HOURS_PER_DAY = WORK_END_HOUR - WORK_START_HOUR
+
+class TimeAxis:
+    """
+    Trục thời gian số nguyên theo giờ làm việc
+    Mốc 0 = 8h ngày bắt đầu dự án, mỗi ngày chiếm HOURS_PER_DAY mốc liên tiếp
+    (17h ngày k và 8h ngày k+1 là cùng một mốc vì không có giờ làm việc xen giữa).
+    Bộ giải chỉ so sánh số nguyên, datetime chỉ được dựng lại khi hiển thị/xuất.
+    """
+    def __init__(self, project_start_date: datetime):
+        self.origin = project_start_date.replace(hour=WORK_START_HOUR, minute=0, second=0, microsecond=0)
+        # Độ lệch (giờ lịch) giữa mốc 0 và thời điểm bắt đầu dự án thực tế
+        self.start_offset = (project_start_date - self.origin).total_seconds() / 3600
+    
+    def to_slot(self, moment: datetime, round_up: bool = False) -> int:
+        """Đổi datetime sang mốc giờ làm việc (mặc định làm tròn xuống)"""
+        day = (moment.date() - self.origin.date()).days
+        day_start = moment.replace(hour=WORK_START_HOUR, minute=0, second=0, microsecond=0)
+        hours = (moment - day_start).total_seconds() / 3600
+        if hours <= 0:
+            offset = 0
+        elif hours >= HOURS_PER_DAY:
+            offset = HOURS_PER_DAY
+        else:
+            offset = math.ceil(hours) if round_up else math.floor(hours)
+        return day * HOURS_PER_DAY + offset
+    
+    def to_datetime(self, slot: int, is_end: bool = False) -> datetime:
+        """Đổi mốc giờ làm việc về datetime (mốc kết thúc đầu ngày = 17h ngày hôm trước)"""
+        day, offset = divmod(slot, HOURS_PER_DAY)
+        if is_end and offset == 0 and slot > 0:
+            day, offset = day - 1, HOURS_PER_DAY
+        return self.origin + timedelta(days=day, hours=offset)
+    
+    def calendar_hours(self, slot: int) -> int:
+        """Số giờ lịch (tính cả ngoài giờ làm việc) từ gốc trục (8h ngày bắt đầu) tới mốc slot"""
+        day, offset = divmod(slot, HOURS_PER_DAY)
+        return day * 24 + offset
+    
+    def elapsed_hours(self, slot: int) -> float:
+        """Số giờ lịch (tính cả ngoài giờ làm việc) từ lúc bắt đầu dự án tới mốc slot"""
+        return self.calendar_hours(slot) - self.start_offset
+
+class OccupancyIndex:
+    """
+    Chỉ mục lịch bận theo nhân sự: mỗi nhân sự một bitmap trên trục giờ làm việc,
+    bit t = 1 nếu nhân sự đang bận trong giờ [t, t+1).
+    Kiểm tra trùng lịch và tìm khoảng trống chỉ cần vài phép toán bit, không phải
+    duyệt toàn bộ assignment.
+    """
+    def __init__(self, num_employees: int):
+        self.busy: List[int] = [0] * num_employees
+    
+    @staticmethod
+    def span_mask(start: int, end: int) -> int:
+        """Mặt nạ các giờ trong khoảng [start, end)"""
+        start = max(start, 0)
+        if end <= start:
+            return 0
+        return ((1 << (end - start)) - 1) << start
+    
+    def is_free(self, emp_idx: int, start: int, end: int) -> bool:
+        """Nhân sự rảnh trong suốt khoảng [start, end)?"""
+        return not (self.busy[emp_idx] & self.span_mask(start, end))
+    
+    def occupy(self, emp_idx: int, start: int, end: int):
+        """Đánh dấu nhân sự bận trong khoảng [start, end)"""
+        self.busy[emp_idx] |= self.span_mask(start, end)
+    
+    def release(self, emp_idx: int, start: int, end: int):
+        """Giải phóng khoảng [start, end) của nhân sự"""
+        self.busy[emp_idx] &= ~self.span_mask(start, end)
+    
+    def next_free_slot(self, emp_idx: int, slot: int) -> int:
+        """Giờ rảnh đầu tiên của nhân sự tính từ slot (chính slot nếu đang rảnh)"""
+        free = ~(self.busy[emp_idx] >> max(slot, 0))
+        return max(slot, 0) + ((free & -free).bit_length() - 1)